@@ -1,18 +1,46 @@
-from pydantic import BaseConfig
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ArgumentError, NoSuchModuleError
 
 
-class Settings(BaseConfig):
+class Settings(BaseSettings):
+    """应用配置，从环境变量和 .env 文件读取（字段名即环境变量名）"""
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
     PROJECT_NAME: str = "FastAPI Book Manager"
     DEBUG: bool = True
     SQLALCHEMY_DATABASE_URI: str = "sqlite+aiosqlite:///./bookstore.db"
+    # 数据库连接池（仅对 PostgreSQL 等服务端数据库生效）
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = Field(5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(30, gt=0)
+    DB_POOL_RECYCLE: int = Field(1800, ge=-1)  # -1 表示不回收
+    DB_POOL_PRE_PING: bool = True
     # JWT
     SECRET_KEY: str = "change-me-to-a-random-secret"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
 
-
-class Config:
-    env_file = ".env"
+    @field_validator("SQLALCHEMY_DATABASE_URI")
+    @classmethod
+    def check_database_uri(cls, value: str) -> str:
+        """必须是异步驱动；postgres:// 和 postgresql:// 使用 asyncpg"""
+        try:
+            url = make_url(value)
+        except ArgumentError:
+            raise ValueError("无法解析的数据库连接地址")
+        if url.drivername in ("postgres", "postgresql"):
+            url = url.set(drivername="postgresql+asyncpg")
+        try:
+            is_async = url.get_dialect().is_async
+        except NoSuchModuleError:
+            raise ValueError(f"不支持的数据库类型: {url.drivername}")
+        if not is_async:
+            raise ValueError(f"{url.drivername} 不是异步驱动（可使用 sqlite+aiosqlite 或 postgresql+asyncpg）")
+        return url.render_as_string(hide_password=False)
 
 
 settings = Settings()
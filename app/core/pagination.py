@@ -0,0 +1,33 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+# 下一页游标的响应头名称（响应体保持列表结构，兼容 skip/limit 分页）
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """将排序键值 (sort_key, id) 编码为不透明的游标字符串"""
+    raw = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[int]:
+    """解码游标字符串（键值均为整数），格式无效时返回 400"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, int) for v in values):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def next_cursor(items: list, limit: int, *keys: str) -> Optional[str]:
+    """查询多取一行：超过 limit 时截断列表并返回下一页游标，否则返回 None"""
+    if len(items) <= limit:
+        return None
+    del items[limit:]
+    return encode_cursor([getattr(items[-1], key) for key in keys])
@@ -1,20 +1,84 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
+from fastapi import HTTPException, status
+import os
+import threading
 import jwt
 from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt 是 CPU 密集型操作，放到固定大小的进程池中执行，并限制排队任务数（背压）
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+PASSWORD_QUEUE_DEPTH = int(os.getenv("PASSWORD_QUEUE_DEPTH", str(PASSWORD_POOL_SIZE * 4)))
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+_password_pool: Optional[ProcessPoolExecutor] = None
+_password_pool_lock = threading.Lock()
+_password_slots = threading.BoundedSemaphore(PASSWORD_QUEUE_DEPTH)
 
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _get_password_pool() -> ProcessPoolExecutor:
+    global _password_pool
+    if _password_pool is None:
+        with _password_pool_lock:
+            if _password_pool is None:
+                _password_pool = ProcessPoolExecutor(max_workers=PASSWORD_POOL_SIZE)
+    return _password_pool
+
+
+def _noop() -> None:
+    return None
+
+
+async def _run_password_task(fn, *args):
+    """在密码进程池中执行任务（不阻塞事件循环），排队已满时返回 503"""
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_event_loop().run_in_executor(_get_password_pool(), fn, *args)
+    finally:
+        _password_slots.release()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_task(_verify, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    return await _run_password_task(_hash, password)
+
+
+def start_password_pool():
+    """预先启动密码进程池的全部子进程（应用启动时调用）"""
+    pool = _get_password_pool()
+    for future in [pool.submit(_noop) for _ in range(PASSWORD_POOL_SIZE)]:
+        future.result()
+
+
+def shutdown_password_pool():
+    """关闭密码进程池"""
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown(wait=False)
+            _password_pool = None
+
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = {"sub": str(subject)}
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -1,27 +1,46 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from models.book import Book
-from schemas.book import BookCreate, BookUpdate
+from app.core.pagination import decode_cursor, next_cursor
+from app.models.book import Book
+from app.schemas.book import BookCreate, BookUpdate
 
 
-def get_book(db: Session, book_id: int, owner_id: int) -> Optional[Book]:
+async def get_book(db: AsyncSession, book_id: int, owner_id: int) -> Optional[Book]:
     """根据ID获取用户的图书"""
-    return db.query(Book).filter(Book.id == book_id, Book.owner_id == owner_id).first()
+    result = await db.execute(select(Book).where(Book.id == book_id, Book.owner_id == owner_id))
+    return result.scalar_one_or_none()
 
 
-def get_books(db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[Book]:
-    """获取用户的所有图书（分页）"""
-    return db.query(Book).filter(Book.owner_id == owner_id).offset(skip).limit(limit).all()
+async def get_books(
+        db: AsyncSession, owner_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[Book], Optional[str]]:
+    """
+    获取用户的所有图书（分页），返回 (图书列表, 下一页游标)
 
+    按 id 排序；传入 cursor 时从游标位置继续读取（忽略 skip），
+    由 (owner_id, bid) 索引直接定位，深页与第一页耗时相同
+    """
+    query = select(Book).where(Book.owner_id == owner_id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.where(Book.id > last_id)
+    elif skip:
+        query = query.offset(skip)
 
-def create_book(db: Session, book_create: BookCreate, owner_id: int) -> Book:
+    # 多取一行，用于判断是否还有下一页
+    result = await db.execute(query.order_by(Book.id).limit(limit + 1))
+    books = list(result.scalars().all())
+    return books, next_cursor(books, limit, "id")
+
+
+async def create_book(db: AsyncSession, book_create: BookCreate, owner_id: int) -> Book:
     """创建新图书"""
     # 检查ISBN是否已存在（如果提供了ISBN）
     if book_create.isbn:
-        existing_book = db.query(Book).filter(Book.isbn == book_create.isbn).first()
+        existing_book = await db.scalar(select(Book.id).where(Book.isbn == book_create.isbn))
         if existing_book:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,14 +52,14 @@ def create_book(db: Session, book_create: BookCreate, owner_id: int) -> Book:
 
     # 保存到数据库
     db.add(db_book)
-    db.commit()
-    db.refresh(db_book)
+    await db.commit()
+    await db.refresh(db_book)
     return db_book
 
 
-def update_book(db: Session, book_id: int, book_update: BookUpdate, owner_id: int) -> Optional[Book]:
+async def update_book(db: AsyncSession, book_id: int, book_update: BookUpdate, owner_id: int) -> Optional[Book]:
     """更新图书信息"""
-    db_book = get_book(db, book_id, owner_id)
+    db_book = await get_book(db, book_id, owner_id)
     if not db_book:
         return None
 
@@ -50,29 +69,32 @@ def update_book(db: Session, book_id: int, book_update: BookUpdate, owner_id: in
         setattr(db_book, field, value)
 
     # 保存更改
-    db.commit()
-    db.refresh(db_book)
+    await db.commit()
+    await db.refresh(db_book)
     return db_book
 
 
-def delete_book(db: Session, book_id: int, owner_id: int) -> bool:
+async def delete_book(db: AsyncSession, book_id: int, owner_id: int) -> bool:
     """删除图书"""
-    db_book = get_book(db, book_id, owner_id)
+    db_book = await get_book(db, book_id, owner_id)
     if not db_book:
         return False
 
-    db.delete(db_book)
-    db.commit()
+    await db.delete(db_book)
+    await db.commit()
     return True
 
 
-def search_books(db: Session, owner_id: int, query: str, skip: int = 0, limit: int = 100) -> List[Book]:
+async def search_books(db: AsyncSession, owner_id: int, query: str, skip: int = 0, limit: int = 100) -> List[Book]:
     """搜索图书（按标题或作者）"""
     search_pattern = f"%{query}%"
-    return db.query(Book).filter(
-        Book.owner_id == owner_id,
-        or_(
-            Book.title.ilike(search_pattern),
-            Book.author.ilike(search_pattern)
-        )
-    ).offset(skip).limit(limit).all()
+    result = await db.execute(
+        select(Book).where(
+            Book.owner_id == owner_id,
+            or_(
+                Book.title.ilike(search_pattern),
+                Book.author.ilike(search_pattern)
+            )
+        ).order_by(Book.id).offset(skip).limit(limit)
+    )
+    return list(result.scalars().all())
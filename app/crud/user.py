@@ -1,44 +1,45 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select
 from fastapi import HTTPException, status
 from typing import Optional
-import bcrypt
 
+from app.core.security import get_password_hash, verify_password
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.exceptions import DuplicateEntryException
 
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
     """根据ID获取用户"""
-    return db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    result = await db.execute(select(User).where(User.id == user_id, User.is_active == True))
+    return result.scalar_one_or_none()
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """根据邮箱获取用户"""
-    return db.query(User).filter(User.email == email, User.is_active == True).first()
+    result = await db.execute(select(User).where(User.email == email, User.is_active == True))
+    return result.scalar_one_or_none()
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """根据用户名获取用户"""
-    return db.query(User).filter(User.username == username, User.is_active == True).first()
+    result = await db.execute(select(User).where(User.username == username, User.is_active == True))
+    return result.scalar_one_or_none()
 
 
-def create_user(db: Session, user_create: UserCreate) -> User:
+async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
     """创建新用户"""
     # 检查邮箱是否已存在
-    if get_user_by_email(db, user_create.email):
+    if await get_user_by_email(db, user_create.email):
         raise DuplicateEntryException("Email already registered")
 
     # 检查用户名是否已存在
-    if get_user_by_username(db, user_create.username):
+    if await get_user_by_username(db, user_create.username):
         raise DuplicateEntryException("Username already taken")
 
-    # 哈希密码
-    hashed_password = bcrypt.hashpw(
-        user_create.password.encode('utf-8'),
-        bcrypt.gensalt()
-    ).decode('utf-8')
+    # 哈希密码（在进程池中执行）
+    hashed_password = await get_password_hash(user_create.password)
 
     # 创建用户对象
     db_user = User(
@@ -51,21 +52,21 @@ def create_user(db: Session, user_create: UserCreate) -> User:
     # 保存到数据库
     try:
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise DuplicateEntryException("User with this email or username already exists")
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """验证用户凭据"""
-    user = get_user_by_username(db, username)
+    user = await get_user_by_username(db, username)
     if not user:
         return None
 
-    if not bcrypt.checkpw(password.encode('utf-8'), user.hashed_password.encode('utf-8')):
+    if not await verify_password(password, user.hashed_password):
         return None
 
     return user
@@ -1,16 +1,32 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import make_url
 import asyncio
 
-# 异步 SQLite 数据库 URL (使用 aiosqlite)
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./bookstore.db"
+from app.core.config import settings
+
+# 数据库 URL（默认 SQLite + aiosqlite，通过 SQLALCHEMY_DATABASE_URI 环境变量切换）
+SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
+
+# 服务端数据库使用配置的连接池参数；SQLite 使用默认连接池
+if make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite":
+    pool_options = {}
+else:
+    pool_options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
 
 # 创建异步数据库引擎
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    echo=True,  # 生产环境应设为 False
-    future=True
+    echo=settings.DB_ECHO,
+    future=True,
+    **pool_options
 )
 
 # 创建异步会话本地类
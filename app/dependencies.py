@@ -1,20 +1,20 @@
 from typing_extensions import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
-from database import get_db
-from models.user import User
-from crud.user import get_user
-from core.config import settings
+from app.database import get_db
+from app.models.user import User
+from app.crud.user import get_user
+from app.core.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 
 async def get_current_user(
         token: Annotated[str, Depends(oauth2_scheme)],
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ) -> User:
     """获取当前用户（通过JWT令牌）"""
     credentials_exception = HTTPException(
@@ -31,7 +31,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = get_user(db, int(user_id))
+    user = await get_user(db, int(user_id))
     if user is None:
         raise credentials_exception
     return user
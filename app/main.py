@@ -4,11 +4,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
 
-from database import create_tables
+from app.database import create_tables, engine
+from app.core.security import start_password_pool, shutdown_password_pool
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.routers.auth import router as auth_router
 from app.routers.books import router as books_router
 from app.routers.users import router as users_router
-from exceptions import (
+from app.exceptions import (
     DuplicateEntryException,
     integrity_error_handler,
     http_exception_handler,
@@ -19,11 +21,13 @@ from exceptions import (
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    # 启动时创建数据库表
-    create_tables()
-    print("Database tables created successfully")
+    # 启动时预先启动密码哈希进程池，并创建数据库表
+    start_password_pool()
+    await create_tables()
     yield
     # 关闭时清理资源
+    shutdown_password_pool()
+    await engine.dispose()
     print("Shutting down application")
 
 
@@ -42,6 +46,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # 添加自定义异常处理器
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -10,9 +10,14 @@ class Book(Base):
     图书模型
     """
     __tablename__ = "books"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # 按用户列出图书时的游标分页索引
+        Index("ix_books_owner_bid", "owner_id", "bid"),
+        {'extend_existing': True},
+    )
 
-    bid = Column(Integer, primary_key=True, index=True)
+    # 数据库列名为 bid，ORM 属性名为 id（与 schemas 一致）
+    id = Column("bid", Integer, primary_key=True, index=True)
     title = Column(String(200), index=True, nullable=False)
     author = Column(String(100), index=True, nullable=False)
     image_url = Column(String(500), nullable=True)  # 图片URL字段
@@ -22,7 +27,7 @@ class Book(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     # 外键关联用户
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    owner_id = Column(Integer, ForeignKey("users.uid", ondelete="CASCADE"))
     # 定义与用户的关系
     owner = relationship("User", back_populates="books")
 
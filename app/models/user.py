@@ -11,10 +11,12 @@ class User(Base):
     __tablename__ = "users"
     __table_args__ = {'extend_existing': True}
 
-    uid = Column(Integer, primary_key=True, index=True)
+    # 数据库列名为 uid，ORM 属性名为 id（与 schemas、JWT sub 一致）
+    id = Column("uid", Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(256), unique=True, index=True, nullable=False)
     hashed_password = Column(String(256), nullable=False)
+    full_name = Column(String(100), nullable=True)
 
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
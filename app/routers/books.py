@@ -1,46 +1,51 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.schemas.book import Book, BookCreate, BookUpdate
 from app.schemas.user import User
 from app.crud.book import get_book, get_books, create_book, update_book, delete_book, search_books
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.dependencies import get_current_active_user
 
 router = APIRouter(prefix="/books", tags=["books"])
 
 
 @router.get("/", response_model=List[Book])
-def read_books(
+async def read_books(
+        response: Response,
         skip: int = Query(0, ge=0, description="跳过的记录数"),
         limit: int = Query(100, ge=1, le=1000, description="返回的最大记录数"),
-        db: Session = Depends(get_db),
+        cursor: Optional[str] = Query(None, description="分页游标（取自上一页响应头 X-Next-Cursor，传入时忽略 skip）"),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
-    """获取当前用户的所有图书（分页）"""
-    books = get_books(db, owner_id=current_user.id, skip=skip, limit=limit)
+    """获取当前用户的所有图书（分页），下一页游标通过响应头 X-Next-Cursor 返回"""
+    books, next_page = await get_books(db, owner_id=current_user.id, skip=skip, limit=limit, cursor=cursor)
+    if next_page:
+        response.headers[NEXT_CURSOR_HEADER] = next_page
     return books
 
 
 @router.post("/", response_model=Book, status_code=status.HTTP_201_CREATED)
-def create_new_book(
+async def create_new_book(
         book: BookCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """创建新图书"""
-    return create_book(db, book, current_user.id)
+    return await create_book(db, book, current_user.id)
 
 
 @router.get("/{book_id}", response_model=Book)
-def read_book(
+async def read_book(
         book_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """根据ID获取图书详情"""
-    db_book = get_book(db, book_id, current_user.id)
+    db_book = await get_book(db, book_id, current_user.id)
     if not db_book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,14 +55,14 @@ def read_book(
 
 
 @router.put("/{book_id}", response_model=Book)
-def update_book_info(
+async def update_book_info(
         book_id: int,
         book_update: BookUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """更新图书信息"""
-    db_book = update_book(db, book_id, book_update, current_user.id)
+    db_book = await update_book(db, book_id, book_update, current_user.id)
     if not db_book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -67,13 +72,13 @@ def update_book_info(
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_book(
+async def remove_book(
         book_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """删除图书"""
-    if not delete_book(db, book_id, current_user.id):
+    if not await delete_book(db, book_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
@@ -81,13 +86,13 @@ def remove_book(
 
 
 @router.get("/search/", response_model=List[Book])
-def search_books_by_query(
+async def search_books_by_query(
         query: str = Query(..., min_length=1, max_length=100, description="搜索关键词（标题或作者）"),
         skip: int = Query(0, ge=0, description="跳过的记录数"),
         limit: int = Query(100, ge=1, le=1000, description="返回的最大记录数"),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """搜索图书（按标题或作者）"""
-    books = search_books(db, current_user.id, query, skip, limit)
+    books = await search_books(db, current_user.id, query, skip, limit)
     return books
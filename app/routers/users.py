@@ -1,25 +1,26 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.schemas.user import User, UserCreate, UserUpdate
 from app.crud.user import get_user, create_user, get_user_by_username
+from app.core.security import get_password_hash
 from app.dependencies import get_current_active_user
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
-def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_new_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """创建新用户"""
-    return create_user(db, user)
+    return await create_user(db, user)
 
 
 @router.get("/{user_id}", response_model=User)
-def read_user(
+async def read_user(
         user_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """根据ID获取用户信息"""
@@ -29,7 +30,7 @@ def read_user(
             detail="Not enough permissions"
         )
 
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,10 +40,10 @@ def read_user(
 
 
 @router.put("/{user_id}", response_model=User)
-def update_user(
+async def update_user(
         user_id: int,
         user_update: UserUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """更新用户信息"""
@@ -52,7 +53,7 @@ def update_user(
             detail="Not enough permissions"
         )
 
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,7 +62,7 @@ def update_user(
 
     # 检查用户名是否已被其他用户使用
     if user_update.username and user_update.username != db_user.username:
-        existing_user = get_user_by_username(db, user_update.username)
+        existing_user = await get_user_by_username(db, user_update.username)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,13 +73,11 @@ def update_user(
     update_data = user_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         if field == "password" and value:
-            # 哈希新密码
-            import bcrypt
-            hashed_password = bcrypt.hashpw(value.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            setattr(db_user, "hashed_password", hashed_password)
+            # 哈希新密码（在进程池中执行）
+            setattr(db_user, "hashed_password", await get_password_hash(value))
         elif field != "password":
             setattr(db_user, field, value)
 
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
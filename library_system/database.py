@@ -4,54 +4,257 @@
 负责配置 SQLAlchemy 数据库连接和会话管理
 
 技术要点：
-- 使用 SQLite 作为开发数据库（轻量级，无需额外服务）
-- SQLAlchemy ORM 进行数据库操作
+- 使用 SQLite 作为开发数据库（轻量级，无需额外服务），通过 aiosqlite 异步访问
+- 生产环境可通过 DATABASE_URL 切换到 PostgreSQL（asyncpg 驱动），postgres:// 和 postgresql:// 自动使用 asyncpg
+- 配置由 pydantic-settings 从环境变量和 .env 文件读取并校验，配置无效时服务启动失败并指出具体字段
+- SQLAlchemy 异步 ORM 进行数据库操作，数据库 I/O 不阻塞事件循环
 - 依赖注入模式提供数据库会话
+- SQLite 读写分离：写连接池只有一个连接（单写者，写事务在连接池排队，不会互相等待 SQLite 写锁），
+  只读连接池供 GET 接口使用；WAL 模式下读不阻塞写、写也不阻塞读
+- SQLite 连接建立时应用 PRAGMA 配置；连接池复用连接，PRAGMA 和已编译的语句缓存只需准备一次
+- 其他数据库（PostgreSQL 等）自身支持并发读写，读写使用同一个引擎，连接池参数由 DB_POOL_* 配置
+
+配置（环境变量，也可写在当前目录的 .env 文件中）：
+- DATABASE_URL: 数据库连接地址（默认 sqlite+aiosqlite:///./library.db）
+- DB_ECHO: 是否输出 SQL 日志（默认 false）
+- DB_POOL_SIZE: 服务端数据库连接池常驻连接数（默认 5）
+- DB_MAX_OVERFLOW: 连接池满时允许额外创建的连接数（默认 10）
+- DB_POOL_TIMEOUT: 等待空闲连接的超时时间（秒，默认 30）
+- DB_POOL_RECYCLE: 连接的最长复用时间（秒，默认 1800，-1 表示不回收；应小于数据库 / 连接代理的空闲超时）
+- DB_POOL_PRE_PING: 从连接池取出连接时先检测是否可用（默认 true，数据库重启后自动替换失效连接）
+- SQLITE_PRAGMA_PROFILE: production（默认，应用下列 PRAGMA）或 default（保持 SQLite 默认配置）
+- SQLITE_JOURNAL_MODE: 日志模式（默认 WAL）
+- SQLITE_SYNCHRONOUS: 同步级别（默认 NORMAL，WAL 模式下不会损坏数据库，只可能丢失最近的事务）
+- SQLITE_MMAP_SIZE: 内存映射读取的大小（字节，默认 256MB）
+- SQLITE_CACHE_SIZE: 每个连接的页缓存（负数表示 KiB，默认 -65536 即 64MB）
+- SQLITE_BUSY_TIMEOUT: 数据库被锁定时的等待时间（毫秒，默认 5000）
+- SQLITE_TEMP_STORE: 临时表和排序的存储位置（默认 MEMORY）
+- SQLITE_STATEMENT_CACHE_SIZE: 每个连接缓存的预编译语句数（默认 256）
+- DB_READ_POOL_SIZE: SQLite 只读连接池大小（默认 5）
 """
 
+# 导入第三方库
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing_extensions import Literal
+
 # 导入 SQLAlchemy 核心组件
-from sqlalchemy import create_engine           # 数据库引擎
-from sqlalchemy.ext.declarative import declarative_base  # 模型基类
-from sqlalchemy.orm import sessionmaker        # 会话工厂
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ArgumentError, NoSuchModuleError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession  # 异步引擎和会话
+from sqlalchemy.orm import declarative_base    # 模型基类
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+def normalize_database_url(value: str) -> str:
+    """
+    校验并规范化数据库连接地址
+
+    参数：
+        value: 数据库连接地址
+
+    返回：
+        str: 规范化后的地址（postgres:// 和 postgresql:// 使用 asyncpg 驱动）
+
+    异常：
+        ValueError: 地址无法解析、数据库不受支持或驱动不是异步驱动
+    """
+    try:
+        url = make_url(value)
+    except ArgumentError:
+        raise ValueError("无法解析的数据库连接地址")
+
+    if url.drivername in ("postgres", "postgresql"):
+        url = url.set(drivername="postgresql+asyncpg")
+    try:
+        dialect = url.get_dialect()
+    except NoSuchModuleError:
+        raise ValueError(f"不支持的数据库类型: {url.drivername}")
+    if not dialect.is_async:
+        raise ValueError(f"{url.drivername} 不是异步驱动（可使用 sqlite+aiosqlite 或 postgresql+asyncpg）")
+    return url.render_as_string(hide_password=False)
+
+
+class DatabaseSettings(BaseSettings):
+    """数据库配置（字段名即环境变量名）"""
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    # SQLite 数据库文件路径，./library.db 表示当前目录下的 library.db 文件
+    DATABASE_URL: str = "sqlite+aiosqlite:///./library.db"
+    DB_ECHO: bool = False
+
+    # 服务端数据库连接池（SQLite 使用下方的读写连接池）
+    DB_POOL_SIZE: int = Field(5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(30, gt=0)
+    DB_POOL_RECYCLE: int = Field(1800, ge=-1)
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite（取值在拼接 PRAGMA 语句之前校验）
+    SQLITE_PRAGMA_PROFILE: Literal["production", "default"] = "production"
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = Field(256 * 1024 * 1024, ge=0)
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_BUSY_TIMEOUT: int = Field(5000, ge=0)
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    SQLITE_STATEMENT_CACHE_SIZE: int = Field(256, ge=0)
+    DB_READ_POOL_SIZE: int = Field(5, ge=1)
+
+    @field_validator("DATABASE_URL")
+    @classmethod
+    def _check_url(cls, value: str) -> str:
+        return normalize_database_url(value)
+
+    @field_validator("SQLITE_PRAGMA_PROFILE", mode="before")
+    @classmethod
+    def _lower(cls, value):
+        return value.lower() if isinstance(value, str) else value
+
+    @field_validator("SQLITE_JOURNAL_MODE", "SQLITE_SYNCHRONOUS", "SQLITE_TEMP_STORE", mode="before")
+    @classmethod
+    def _upper(cls, value):
+        return value.upper() if isinstance(value, str) else value
+
+
+settings = DatabaseSettings()
 
 # 数据库连接 URL
-# SQLite 数据库文件路径，./library.db 表示当前目录下的 library.db 文件
-SQLALCHEMY_DATABASE_URL = "sqlite:///./library.db"
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+
+# 文件数据库才能使用连接池和读写分离（内存数据库每个连接都是独立的库）
+IS_SQLITE_FILE = _url.get_backend_name() == "sqlite" and _url.database not in (None, "", ":memory:")
 
-# 创建数据库引擎
-# connect_args={"check_same_thread": False}: SQLite 特有配置，允许多线程访问
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
 
-# 创建会话工厂
-# autocommit=False: 禁用自动提交，需要手动 commit
+def sqlite_pragmas(read_only: bool = False) -> list:
+    """
+    连接建立时执行的 PRAGMA 语句
+
+    参数：
+        read_only: 是否为只读连接（不修改日志模式，并禁止写入）
+
+    返回：
+        list: PRAGMA 语句列表
+    """
+    # busy_timeout 在任何配置下都设置，避免偶发的锁冲突直接报错
+    pragmas = [f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT}"]
+    if settings.SQLITE_PRAGMA_PROFILE == "production":
+        # 日志模式写入数据库文件，由写连接设置一次即对所有连接生效
+        if not read_only:
+            pragmas.append(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        pragmas += [
+            f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+            f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+            f"PRAGMA cache_size = {settings.SQLITE_CACHE_SIZE}",
+            f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE}",
+        ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def _install_pragmas(async_engine, read_only: bool):
+    """在引擎每次建立新连接时执行 PRAGMA"""
+    statements = sqlite_pragmas(read_only)
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+
+def _create_sqlite_engine(pool_size: int, read_only: bool):
+    async_engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        echo=settings.DB_ECHO,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        connect_args={"cached_statements": settings.SQLITE_STATEMENT_CACHE_SIZE},
+    )
+    _install_pragmas(async_engine, read_only)
+    return async_engine
+
+
+def _create_server_engine():
+    """服务端数据库（PostgreSQL 等）引擎，使用配置的连接池参数"""
+    return create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+# 创建异步数据库引擎
+# engine: 读写引擎（写操作、迁移、后台任务）；read_engine: 只读引擎（GET 接口）
+if IS_SQLITE_FILE:
+    engine = _create_sqlite_engine(pool_size=1, read_only=False)
+    read_engine = _create_sqlite_engine(pool_size=settings.DB_READ_POOL_SIZE, read_only=True)
+elif _url.get_backend_name() == "sqlite":
+    # 内存数据库：保持默认连接池
+    engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=settings.DB_ECHO)
+    read_engine = engine
+else:
+    engine = _create_server_engine()
+    read_engine = engine
+
+# 创建异步会话工厂
 # autoflush=False: 禁用自动刷新，提高性能
-# bind=engine: 绑定到上面创建的数据库引擎
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: 提交后不使对象过期，避免异步环境下访问属性触发隐式查询
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # 创建模型基类
 # 所有 SQLAlchemy 模型都需要继承这个基类
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
     数据库会话依赖函数
     
-    使用生成器模式（yield）提供数据库会话，确保连接正确释放
+    使用异步生成器模式（yield）提供数据库会话，确保连接正确释放
     
     使用方式：
-    def some_route(db: Session = Depends(get_db)):
-        # 使用 db 进行数据库操作
+    async def some_route(db: AsyncSession = Depends(get_db)):
+        # 使用 await db.execute(...) 进行数据库操作
     
     执行流程：
     1. 创建新的数据库会话
     2. yield 返回会话给调用者
-    3. 调用者使用完毕后，finally 块确保关闭连接
+    3. 调用者使用完毕后，async with 确保关闭连接
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db  # 将会话提供给依赖注入的函数使用
-    finally:
-        db.close()  # 确保会话关闭，释放数据库连接
+
+
+async def get_read_db():
+    """
+    只读数据库会话依赖函数
+
+    供只查询数据的 GET 接口使用：SQLite 下使用只读连接池，不会在写连接池排队；
+    其他数据库与 get_db 使用同一个引擎
+
+    使用方式：
+    async def some_route(db: AsyncSession = Depends(get_read_db)):
+        # 只执行查询
+    """
+    async with ReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines():
+    """关闭连接池中的全部连接（应用关闭时调用）"""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
@@ -0,0 +1,87 @@
+"""
+图书批量导入工具
+
+从 CSV / JSONL 文件导入图书目录，与 POST /api/v1/books/import 使用相同的校验和写入逻辑，
+适合一次导入数十万条记录（不受 HTTP 请求超时和上传大小的限制）
+
+用法：
+    python import_books.py catalog.csv
+    python import_books.py catalog.jsonl --on-conflict skip
+    python import_books.py export.txt --format csv --batch-size 5000 --errors errors.jsonl
+
+数据库连接与服务相同（DATABASE_URL 环境变量）；导入前按 DB_AUTO_MIGRATE 执行迁移。
+服务使用进程内缓存时，已缓存的图书列表最多在 BOOK_CACHE_TTL 秒后更新（配置 CACHE_REDIS_URL 时立即失效）
+"""
+
+# 导入标准库
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+# 导入项目模块
+from database import SessionLocal, engine, dispose_engines
+from utils.book_import import (
+    import_books, detect_format, BOOK_IMPORT_BATCH_SIZE, ON_CONFLICT_UPDATE, ON_CONFLICT_SKIP
+)
+from utils.migrations import upgrade_database, DB_AUTO_MIGRATE
+
+
+async def run(path: str, fmt: str, batch_size: int, on_conflict: str) -> dict:
+    """执行迁移后导入文件，返回导入结果"""
+    try:
+        if DB_AUTO_MIGRATE:
+            await upgrade_database(engine)
+        with open(path, "rb") as stream:
+            async with SessionLocal() as db:
+                return await import_books(
+                    db, stream, fmt, batch_size=batch_size, on_conflict=on_conflict, max_errors=sys.maxsize
+                )
+    finally:
+        await dispose_engines()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="从 CSV / JSONL 文件批量导入图书")
+    parser.add_argument("path", help="导入文件（.csv / .jsonl / .ndjson）")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="文件格式（默认按扩展名识别）")
+    parser.add_argument("--batch-size", type=int, default=BOOK_IMPORT_BATCH_SIZE, help="每批写入并提交的行数")
+    parser.add_argument(
+        "--on-conflict", default=ON_CONFLICT_UPDATE, choices=[ON_CONFLICT_UPDATE, ON_CONFLICT_SKIP],
+        help="ISBN 已存在时更新或跳过"
+    )
+    parser.add_argument("--errors", help="将错误明细写入该文件（JSONL），默认输出到标准错误")
+    args = parser.parse_args(argv)
+
+    if args.batch_size < 1:
+        parser.error("--batch-size 必须大于 0")
+    try:
+        fmt = detect_format(args.path, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    result = asyncio.run(run(args.path, fmt, args.batch_size, args.on_conflict))
+    elapsed = time.perf_counter() - started
+
+    errors = result["errors"]
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as output:
+            for error in errors:
+                output.write(json.dumps(error, ensure_ascii=False) + "\n")
+    else:
+        for error in errors:
+            print(f"❌ 第 {error['line']} 行 {error['isbn'] or ''}: {error['error']}", file=sys.stderr)
+
+    print(
+        f"✅ 共 {result['total']} 行（{elapsed:.1f} 秒）：新增 {result['created']}，更新 {result['updated']}，"
+        f"跳过 {result['skipped']}，失败 {result['failed']}"
+    )
+    if result["aborted"]:
+        print(f"❌ 导入中止: {result['aborted']}", file=sys.stderr)
+    return 1 if result["failed"] or result["aborted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
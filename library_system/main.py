@@ -6,12 +6,12 @@
 - 图书信息管理（books）
 - 借阅与归还管理（borrows）
 - 用户管理（users）
-- 逾期检查与罚款计算
+- 逾期检查与罚款计算（后台定时任务）
 
 技术栈：
 - FastAPI: 高性能 Web 框架
-- SQLAlchemy: ORM 数据库操作
-- SQLite: 轻量级数据库
+- SQLAlchemy: 异步 ORM 数据库操作（AsyncSession）
+- SQLite: 轻量级数据库（aiosqlite 驱动）
 - OAuth2 + JWT: 身份认证
 """
 
@@ -21,39 +21,60 @@ from fastapi.middleware.cors import CORSMiddleware  # 跨域中间件
 from contextlib import asynccontextmanager  # 异步上下文管理器
 
 # 导入数据库相关模块
-from database import engine, Base
+from database import engine
 from routers import auth_router, users_router, books_router, borrows_router
 
 # 导入认证工具和用户模型
-from utils.auth import get_password_hash
+from utils.auth import require_role
+from utils.passwords import get_password_hashes, password_pool
+from utils.images import image_pool
+from utils.http_cache import file_cache
+from utils.book_cache import book_cache_stats
+from utils.search import init_search_index
+from utils.borrow import init_borrow_counter, check_active_borrow_index
+from utils.migrations import upgrade_database, DB_AUTO_MIGRATE
+from utils.scheduler import overdue_scheduler, cover_sweeper, OVERDUE_SCHEDULER_ENABLED, COVER_SWEEP_INTERVAL
+from utils.pagination import NEXT_CURSOR_HEADER
 from models.user import User, UserRole
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import SessionLocal, get_read_db, dispose_engines
 
 
-def init_db():
+async def init_db():
     """
     初始化数据库，创建表结构和默认管理员账号
     
     执行流程：
-    1. 创建所有表（如果不存在）
-    2. 检查是否已存在默认管理员
-    3. 如果不存在，创建管理员、图书管理员、普通读者三个测试账号
+    1. 执行数据库迁移（alembic upgrade head），创建缺失的表和索引
+    2. 检测图书全文索引、借阅计数触发器和防重复借阅唯一索引（由迁移创建）是否可用
+    3. 检查是否已存在默认管理员
+    4. 如果不存在，创建管理员、图书管理员、普通读者三个测试账号
     """
-    # 创建数据库表
-    Base.metadata.create_all(bind=engine)
+    # 执行版本化迁移：创建缺失的表，为已有的表补建新增的索引
+    if DB_AUTO_MIGRATE:
+        await upgrade_database(engine)
+
+    # 检测图书全文索引和借阅计数触发器，不可用时搜索和统计使用回退查询
+    await init_search_index(engine)
+    await init_borrow_counter(engine)
+    # 防止重复借阅的唯一索引因历史数据重复而未创建时记录警告
+    await check_active_borrow_index(engine)
     
     # 创建数据库会话
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         # 检查是否已存在管理员账号
-        admin = db.query(User).filter(User.username == "admin").first()
+        result = await db.execute(select(User).where(User.username == "admin"))
+        admin = result.scalar_one_or_none()
         if not admin:
+            # 在进程池中并行生成三个默认账号的密码哈希
+            admin_hash, librarian_hash, reader_hash = await get_password_hashes("admin123", "lib123", "reader123")
+
             # 创建系统管理员
             admin_user = User(
                 username="admin",
                 email="admin@library.com",
-                hashed_password=get_password_hash("admin123"),  # 密码哈希加密
+                hashed_password=admin_hash,  # 密码哈希加密
                 full_name="系统管理员",
                 role=UserRole.ADMIN,  # 管理员角色
                 is_active=True
@@ -64,7 +85,7 @@ def init_db():
             librarian = User(
                 username="librarian",
                 email="librarian@library.com",
-                hashed_password=get_password_hash("lib123"),
+                hashed_password=librarian_hash,
                 full_name="图书管理员",
                 role=UserRole.LIBRARIAN,  # 图书管理员角色
                 is_active=True
@@ -75,7 +96,7 @@ def init_db():
             reader = User(
                 username="reader",
                 email="reader@library.com",
-                hashed_password=get_password_hash("reader123"),
+                hashed_password=reader_hash,
                 full_name="普通读者",
                 role=UserRole.READER,  # 普通读者角色
                 is_active=True
@@ -83,14 +104,11 @@ def init_db():
             db.add(reader)
 
             # 提交事务
-            db.commit()
+            await db.commit()
             print("✅ 默认用户创建成功！")
             print("   管理员: admin / admin123")
             print("   图书管理员: librarian / lib123")
             print("   读者: reader / reader123")
-    finally:
-        # 确保关闭数据库连接
-        db.close()
 
 
 @asynccontextmanager
@@ -104,14 +122,26 @@ async def lifespan(app: FastAPI):
         app: FastAPI 应用实例
         
     执行流程：
-        1. 启动时：调用 init_db() 初始化数据库
+        1. 启动时：启动密码哈希和图片处理进程池，调用 init_db() 初始化数据库，启动逾期检查和封面清理定时任务
         2. yield：应用运行期间
-        3. 关闭时：可以在这里添加资源清理逻辑
+        3. 关闭时：停止定时任务，关闭进程池，释放数据库连接
     """
     # 启动时执行
-    init_db()
+    password_pool.start()
+    image_pool.start()
+    await init_db()
+    if OVERDUE_SCHEDULER_ENABLED:
+        overdue_scheduler.start()
+    if COVER_SWEEP_INTERVAL > 0:
+        cover_sweeper.start()
     yield
-    # 关闭时执行（如需清理资源可在此添加）
+    # 关闭时执行
+    await overdue_scheduler.stop()
+    await cover_sweeper.stop()
+    password_pool.shutdown()
+    image_pool.shutdown()
+    # 释放连接池中的数据库连接（读写和只读连接池）
+    await dispose_engines()
 
 
 # 创建 FastAPI 应用实例
@@ -129,6 +159,7 @@ app.add_middleware(
     allow_credentials=True,             # 允许携带凭证（cookies等）
     allow_methods=["*"],                # 允许所有 HTTP 方法
     allow_headers=["*"],                # 允许所有请求头
+    expose_headers=[NEXT_CURSOR_HEADER],  # 允许前端读取分页游标响应头
 )
 
 # 注册路由（模块化管理）
@@ -139,7 +170,7 @@ app.include_router(borrows_router, prefix="/api/v1")   # 借阅管理路由
 
 
 @app.get("/")
-def root():
+async def root():
     """
     根路径接口
     
@@ -154,7 +185,7 @@ def root():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """
     健康检查接口
     
@@ -163,6 +194,21 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", dependencies=[Depends(require_role("admin"))])
+async def metrics(db: AsyncSession = Depends(get_read_db)):
+    """
+    运行指标接口（仅管理员）
+    
+    返回后台定时任务的运行情况（最近运行时间、耗时、更新行数、最近一次错误等）和各缓存的命中情况；
+    其中包含异常信息和主机 / 进程标识，因此需要管理员权限
+    """
+    return {
+        "overdue_scheduler": await overdue_scheduler.metrics(db),
+        "file_cache": file_cache.stats(),
+        "book_cache": book_cache_stats()
+    }
+
+
 # 开发环境运行入口
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,89 @@
+"""
+封面存储迁移工具
+
+将已有封面从一个存储后端复制到另一个（如从本地目录迁移到 S3 兼容对象存储），
+切换 COVER_STORAGE 之前运行；可重复执行，目标中已存在的对象会跳过
+
+用法：
+    python migrate_covers.py --source local --target s3
+    python migrate_covers.py --source local --target s3 --delete-source
+    python migrate_covers.py --source local --target s3 --dry-run
+
+对象存储的连接参数与服务相同（COVER_S3_BUCKET、COVER_S3_ENDPOINT_URL 等环境变量）
+"""
+
+# 导入标准库
+import argparse
+import os
+import sys
+import tempfile
+
+# 导入项目模块
+from utils.storage import create_storage
+
+
+def migrate(source, target, delete_source: bool = False, dry_run: bool = False) -> dict:
+    """
+    复制源存储中的全部对象到目标存储
+
+    每个对象先下载到本地临时文件再上传，内存占用与文件大小无关
+
+    参数：
+        source: 源存储后端
+        target: 目标存储后端
+        delete_source: 复制成功后是否删除源对象
+        dry_run: 只统计，不实际复制
+
+    返回：
+        dict: {"copied", "skipped", "failed"}
+    """
+    result = {"copied": 0, "skipped": 0, "failed": 0}
+    for key in source.list_keys():
+        if target.exists(key):
+            result["skipped"] += 1
+            if delete_source and not dry_run:
+                source.delete(key)
+            continue
+        if dry_run:
+            result["copied"] += 1
+            continue
+
+        fd, path = tempfile.mkstemp(suffix=".migrate")
+        os.close(fd)
+        try:
+            source.get_file(key, path)
+            target.put_file(path, key)
+        except Exception as e:
+            print(f"❌ {key}: {e}", file=sys.stderr)
+            result["failed"] += 1
+            continue
+        finally:
+            os.remove(path)
+
+        result["copied"] += 1
+        if delete_source:
+            source.delete(key)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="迁移封面存储")
+    parser.add_argument("--source", default="local", choices=["local", "s3"], help="源存储后端")
+    parser.add_argument("--target", default="s3", choices=["local", "s3"], help="目标存储后端")
+    parser.add_argument("--delete-source", action="store_true", help="复制成功后删除源对象")
+    parser.add_argument("--dry-run", action="store_true", help="只统计需要复制的对象")
+    args = parser.parse_args(argv)
+
+    if args.source == args.target:
+        parser.error("源存储和目标存储不能相同")
+
+    result = migrate(
+        create_storage(args.source), create_storage(args.target),
+        delete_source=args.delete_source, dry_run=args.dry_run
+    )
+    print(f"✅ 复制 {result['copied']} 个，跳过 {result['skipped']} 个，失败 {result['failed']} 个")
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
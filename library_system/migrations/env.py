@@ -0,0 +1,77 @@
+"""
+Alembic 迁移环境
+
+- 服务启动时由 utils.migrations 传入已打开的连接（config.attributes["connection"]），直接在该连接上执行
+- 命令行执行 alembic 时，根据 DATABASE_URL 创建异步引擎执行（与服务使用同一驱动）
+- --sql 离线模式只输出 SQL 脚本
+"""
+
+# 导入标准库
+import asyncio
+from logging.config import fileConfig
+
+# 导入 Alembic / SQLAlchemy 组件
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# 导入项目模块（导入 models 以注册全部模型，供 autogenerate 比较）
+import models  # noqa: F401
+from database import Base, SQLALCHEMY_DATABASE_URL
+from utils.migrations import include_name
+
+config = context.config
+
+# 命令行执行时使用 alembic.ini 中的日志配置；在服务内执行时不覆盖服务的日志配置
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+
+def run_migrations_offline():
+    """离线模式：只生成 SQL"""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection):
+    """在给定的同步连接上执行迁移（render_as_batch: SQLite 修改列时自动使用重建表的方式）"""
+    context.configure(
+        connection=connection, target_metadata=target_metadata, render_as_batch=True, include_name=include_name
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations():
+    engine = create_async_engine(_database_url())
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+
+def run_migrations_online():
+    """在线模式：优先使用调用方传入的连接"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+    else:
+        asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,100 @@
+"""
+基线表结构：users / books / borrow_records
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+只创建缺失的表：引入迁移之前由 Base.metadata.create_all 创建的数据库没有版本记录，
+执行本迁移时已存在的表保持不变，随后由 0002 补建新增的表和索引
+"""
+
+# 导入迁移组件
+from alembic import context, op
+import sqlalchemy as sa
+
+# 版本标识（由 Alembic 使用）
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# 枚举按名称存储（与 SQLAlchemy Enum 映射 Python 枚举的方式一致）
+user_role = sa.Enum("ADMIN", "LIBRARIAN", "READER", name="userrole")
+borrow_status = sa.Enum("BORROWED", "RETURNED", "OVERDUE", "RENEWED", name="borrowstatus")
+
+
+def upgrade() -> None:
+    # 离线模式（--sql）无法查询数据库，输出完整的建表语句
+    existing = set() if context.is_offline_mode() else set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("username", sa.String(length=50), nullable=False),
+            sa.Column("email", sa.String(length=100), nullable=False),
+            sa.Column("hashed_password", sa.String(length=255), nullable=False),
+            sa.Column("full_name", sa.String(length=100), nullable=True),
+            sa.Column("role", user_role, nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "books" not in existing:
+        op.create_table(
+            "books",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("isbn", sa.String(length=20), nullable=False),
+            sa.Column("title", sa.String(length=200), nullable=False),
+            sa.Column("author", sa.String(length=100), nullable=False),
+            sa.Column("publisher", sa.String(length=100), nullable=True),
+            sa.Column("publish_year", sa.Integer(), nullable=True),
+            sa.Column("category", sa.String(length=50), nullable=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("total_copies", sa.Integer(), nullable=True),
+            sa.Column("available_copies", sa.Integer(), nullable=True),
+            sa.Column("location", sa.String(length=50), nullable=True),
+            sa.Column("cover_image", sa.String(length=255), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_books_id", "books", ["id"])
+        op.create_index("ix_books_isbn", "books", ["isbn"], unique=True)
+        op.create_index("ix_books_title", "books", ["title"])
+        op.create_index("ix_books_author", "books", ["author"])
+        op.create_index("ix_books_category", "books", ["category"])
+        op.create_index("idx_book_title_author", "books", ["title", "author"])
+
+    if "borrow_records" not in existing:
+        op.create_table(
+            "borrow_records",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("book_id", sa.Integer(), nullable=False),
+            sa.Column("borrow_date", sa.DateTime(), nullable=True),
+            sa.Column("due_date", sa.DateTime(), nullable=False),
+            sa.Column("return_date", sa.DateTime(), nullable=True),
+            sa.Column("status", borrow_status, nullable=True),
+            sa.Column("renew_count", sa.Integer(), nullable=True),
+            sa.Column("fine_amount", sa.Integer(), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.ForeignKeyConstraint(["book_id"], ["books.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_borrow_records_id", "borrow_records", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("borrow_records")
+    op.drop_table("books")
+    op.drop_table("users")
+    user_role.drop(op.get_bind(), checkfirst=True)
+    borrow_status.drop(op.get_bind(), checkfirst=True)
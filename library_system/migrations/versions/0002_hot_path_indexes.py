@@ -0,0 +1,118 @@
+"""
+借阅 / 图书热点查询的索引，借阅计数表和定时任务租约表
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+只创建缺失的表和索引：此前由启动时补建索引的数据库可能已有其中一部分
+
+部分唯一索引 uq_borrow_active_user_book 在已有数据存在重复的未归还记录时无法创建，
+此时记录警告并跳过（服务每次启动时也会检查并给出重复记录的数量）；
+清理重复数据后执行 alembic stamp 0001 && alembic upgrade head 补建
+"""
+
+# 导入标准库
+import logging
+
+# 导入迁移组件
+from alembic import context, op
+import sqlalchemy as sa
+
+# 版本标识（由 Alembic 使用）
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# 不使用 alembic 日志器：它带有 NullHandler，在服务内执行迁移时警告不会输出
+logger = logging.getLogger("migrations")
+
+# 未归还状态（与 models.borrow.UNRETURNED_STATUSES 一致，按名称存储）
+_UNRETURNED = sa.text("status IN ('BORROWED', 'RENEWED', 'OVERDUE')")
+
+# (索引名, 表名, 列)
+_INDEXES = (
+    ("idx_book_cover_image", "books", ["cover_image"]),
+    # 统计、逾期标记：只扫描未归还的记录
+    ("idx_borrow_status_due", "borrow_records", ["status", "due_date"]),
+    # 借阅记录列表按 (borrow_date, id) 倒序的游标分页
+    ("idx_borrow_date_id", "borrow_records", ["borrow_date", "id"]),
+    # 借阅资格检查：是否有逾期未还、是否已借阅该图书
+    ("idx_borrow_user_status_due", "borrow_records", ["user_id", "status", "due_date"]),
+    ("idx_borrow_user_book_status", "borrow_records", ["user_id", "book_id", "status"]),
+    # 按用户 / 图书 / 状态筛选并按借阅日期排序
+    ("idx_borrow_user_date", "borrow_records", ["user_id", "borrow_date", "id"]),
+    ("idx_borrow_book_date", "borrow_records", ["book_id", "borrow_date", "id"]),
+    ("idx_borrow_status_date", "borrow_records", ["status", "borrow_date", "id"]),
+)
+
+
+def _index_names(inspector, table: str) -> set:
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def _create_active_borrow_index():
+    op.create_index(
+        "uq_borrow_active_user_book", "borrow_records", ["user_id", "book_id"],
+        unique=True, sqlite_where=_UNRETURNED, postgresql_where=_UNRETURNED
+    )
+
+
+def upgrade() -> None:
+    offline = context.is_offline_mode()
+    bind = op.get_bind()
+    # 离线模式（--sql）无法查询数据库，输出完整的建表和建索引语句
+    inspector = None if offline else sa.inspect(bind)
+    existing_tables = set() if offline else set(inspector.get_table_names())
+
+    if "borrow_counters" not in existing_tables:
+        op.create_table(
+            "borrow_counters",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("total_borrows", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "scheduler_leases" not in existing_tables:
+        op.create_table(
+            "scheduler_leases",
+            sa.Column("name", sa.String(length=50), nullable=False),
+            sa.Column("owner", sa.String(length=100), nullable=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=True),
+            sa.Column("last_run_at", sa.DateTime(), nullable=True),
+            sa.Column("last_duration_ms", sa.Integer(), nullable=True),
+            sa.Column("last_rows_overdue", sa.Integer(), nullable=True),
+            sa.Column("last_rows_fined", sa.Integer(), nullable=True),
+            sa.Column("last_error", sa.String(length=255), nullable=True),
+            sa.PrimaryKeyConstraint("name"),
+        )
+
+    existing_indexes = {
+        table: set() if offline else _index_names(inspector, table)
+        for table in ("books", "borrow_records")
+    }
+    for name, table, columns in _INDEXES:
+        if name not in existing_indexes[table]:
+            op.create_index(name, table, columns)
+
+    # 同一用户对同一图书最多只有一条未归还记录（在保存点中创建，失败不影响其他迁移）
+    if "uq_borrow_active_user_book" in existing_indexes["borrow_records"]:
+        return
+    if offline:
+        _create_active_borrow_index()
+        return
+    try:
+        with bind.begin_nested():
+            _create_active_borrow_index()
+    except sa.exc.IntegrityError as e:
+        logger.warning("索引 uq_borrow_active_user_book 创建失败（已有数据不满足唯一约束）: %s", e.orig)
+
+
+def downgrade() -> None:
+    # 唯一索引可能因历史数据重复而未创建
+    op.drop_index("uq_borrow_active_user_book", table_name="borrow_records", if_exists=True)
+    for name, table, _columns in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_table("scheduler_leases")
+    op.drop_table("borrow_counters")
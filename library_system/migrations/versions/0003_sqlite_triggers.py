@@ -0,0 +1,122 @@
+"""
+SQLite 借阅计数触发器、图书全文索引（FTS5）及其同步触发器
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+只在 SQLite 上执行（其他数据库的统计使用 COUNT(*)，搜索使用 ILIKE）：
+- borrow_counters_ai / borrow_counters_ad：新增 / 删除借阅记录时增量维护 borrow_counters，
+  并在同一事务中按当前记录数写入计数行
+- books_fts：books 的外部内容全文索引（trigram 分词），新建时从 books 重建一次；
+  books_fts_ai / _ad / _au 在图书增删改时同步索引
+
+此前由启动时创建这些对象的数据库直接沿用已有对象（IF NOT EXISTS）。
+SQLite 未编译 FTS5 或不支持 trigram 分词器（< 3.34）时跳过全文索引并记录警告，搜索回退到 LIKE 查询
+"""
+
+# 导入标准库
+import logging
+
+# 导入迁移组件
+from alembic import context, op
+import sqlalchemy as sa
+
+# 版本标识（由 Alembic 使用）
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# 不使用 alembic 日志器：它带有 NullHandler，在服务内执行迁移时警告不会输出
+logger = logging.getLogger("migrations")
+
+_COUNTER_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS borrow_counters_ai AFTER INSERT ON borrow_records BEGIN
+        UPDATE borrow_counters SET total_borrows = total_borrows + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS borrow_counters_ad AFTER DELETE ON borrow_records BEGIN
+        UPDATE borrow_counters SET total_borrows = total_borrows - 1 WHERE id = 1;
+    END
+    """,
+)
+
+_FTS_TABLE = """
+CREATE VIRTUAL TABLE books_fts USING fts5(
+    title, author, isbn, description,
+    content='books', content_rowid='id', tokenize='trigram'
+)
+"""
+
+# 更新只在被索引的列变化时触发，避免借还书修改库存时重建索引
+_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author, isbn, description)
+        VALUES (new.id, new.title, new.author, new.isbn, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn, description)
+        VALUES ('delete', old.id, old.title, old.author, old.isbn, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_au
+    AFTER UPDATE OF title, author, isbn, description ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn, description)
+        VALUES ('delete', old.id, old.title, old.author, old.isbn, old.description);
+        INSERT INTO books_fts(rowid, title, author, isbn, description)
+        VALUES (new.id, new.title, new.author, new.isbn, new.description);
+    END
+    """,
+)
+
+
+def _create_search_index(create_table: bool):
+    if create_table:
+        op.execute(_FTS_TABLE)
+        # 导入已有图书
+        op.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+    for ddl in _FTS_TRIGGERS:
+        op.execute(ddl)
+
+
+def upgrade() -> None:
+    if context.get_context().dialect.name != "sqlite":
+        return
+
+    for ddl in _COUNTER_TRIGGERS:
+        op.execute(ddl)
+    # 与触发器在同一事务中初始化计数行，避免漏计
+    op.execute(
+        "INSERT OR IGNORE INTO borrow_counters (id, total_borrows) "
+        "SELECT 1, COUNT(*) FROM borrow_records"
+    )
+
+    # 离线模式（--sql）无法查询数据库，输出完整的建表语句
+    if context.is_offline_mode():
+        _create_search_index(create_table=True)
+        return
+    bind = op.get_bind()
+    exists = "books_fts" in sa.inspect(bind).get_table_names()
+    try:
+        with bind.begin_nested():
+            _create_search_index(create_table=not exists)
+    except sa.exc.OperationalError as e:
+        logger.warning("全文索引不可用（需要 SQLite 3.34+ 且编译 FTS5），搜索将回退到 LIKE 查询: %s", e.orig)
+
+
+def downgrade() -> None:
+    if context.get_context().dialect.name != "sqlite":
+        return
+
+    for name in ("books_fts_au", "books_fts_ad", "books_fts_ai"):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS books_fts")
+    for name in ("borrow_counters_ad", "borrow_counters_ai"):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
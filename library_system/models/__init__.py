@@ -1,3 +1,4 @@
 from .user import User, UserRole
 from .book import Book
-from .borrow import BorrowRecord, BorrowStatus
+from .borrow import BorrowRecord, BorrowStatus, BorrowCounter
+from .scheduler import SchedulerLease
@@ -42,6 +42,7 @@ class Book(Base):
     
     索引：
         idx_book_title_author: 书名和作者联合索引（优化搜索性能）
+        idx_book_cover_image: 封面索引（统计封面引用数量）
     """
     __tablename__ = "books"
 
@@ -75,4 +76,5 @@ class Book(Base):
     # 联合索引：优化按书名和作者的搜索
     __table_args__ = (
         Index('idx_book_title_author', 'title', 'author'),
+        Index('idx_book_cover_image', 'cover_image'),
     )
@@ -4,13 +4,15 @@
 定义借阅相关的数据库模型：
 - BorrowStatus: 借阅状态枚举
 - BorrowRecord: 借阅记录表模型
+- BorrowCounter: 借阅计数表模型
 
 表结构：
 - borrow_records: 存储借阅记录信息
+- borrow_counters: 借阅记录总数（单行，由触发器维护）
 """
 
 # 导入 SQLAlchemy 组件
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -33,6 +35,10 @@ class BorrowStatus(str, enum.Enum):
     RENEWED = "renewed"         # 已续借
 
 
+# 未归还的状态（同一用户对同一图书最多一条）
+UNRETURNED_STATUSES = (BorrowStatus.BORROWED, BorrowStatus.RENEWED, BorrowStatus.OVERDUE)
+
+
 class BorrowRecord(Base):
     """
     借阅记录表模型
@@ -54,6 +60,15 @@ class BorrowRecord(Base):
     关系：
         user: 关联用户（多对一）
         book: 关联图书（多对一）
+    
+    索引：
+        idx_borrow_status_due: 状态和应还日期联合索引（优化逾期统计，只扫描未归还记录）
+        idx_borrow_user_status_due: 用户、状态和应还日期联合索引（借阅前检查用户是否有逾期未还）
+        idx_borrow_user_book_status: 用户、图书和状态联合索引（借阅前检查是否已借阅该图书）
+        idx_borrow_user_date: 用户和借阅日期联合索引（我的借阅、按用户筛选的借阅记录列表）
+        idx_borrow_book_date: 图书和借阅日期联合索引（按图书筛选的借阅记录列表、删除图书前的检查）
+        idx_borrow_status_date: 状态和借阅日期联合索引（按状态筛选的借阅记录列表）
+        uq_borrow_active_user_book: 部分唯一索引，同一用户对同一图书最多只有一条未归还记录
     """
     __tablename__ = "borrow_records"
 
@@ -80,3 +95,42 @@ class BorrowRecord(Base):
     # 关系定义（多对一）
     user = relationship("User", back_populates="borrow_records")
     book = relationship("Book", back_populates="borrow_records")
+
+    # 联合索引：
+    # - (status, due_date): 统计和逾期检查只需扫描未归还的记录
+    # - (borrow_date, id): 借阅记录列表按借阅日期倒序的游标分页
+    # - (user_id, status, due_date) / (user_id, book_id, status): 借阅资格检查只定位该用户的少量索引项
+    # - (user_id / book_id / status, borrow_date, id): 按用户 / 图书 / 状态筛选后按借阅日期倒序，无需排序
+    # - (user_id, book_id) WHERE 未归还: 由数据库保证不会重复借阅（并发请求也无法绕过）
+    __table_args__ = (
+        Index('idx_borrow_status_due', 'status', 'due_date'),
+        Index('idx_borrow_date_id', 'borrow_date', 'id'),
+        Index('idx_borrow_user_status_due', 'user_id', 'status', 'due_date'),
+        Index('idx_borrow_user_book_status', 'user_id', 'book_id', 'status'),
+        Index('idx_borrow_user_date', 'user_id', 'borrow_date', 'id'),
+        Index('idx_borrow_book_date', 'book_id', 'borrow_date', 'id'),
+        Index('idx_borrow_status_date', 'status', 'borrow_date', 'id'),
+        Index(
+            'uq_borrow_active_user_book', 'user_id', 'book_id',
+            unique=True,
+            sqlite_where=status.in_(UNRETURNED_STATUSES),
+            postgresql_where=status.in_(UNRETURNED_STATUSES),
+        ),
+    )
+
+
+class BorrowCounter(Base):
+    """
+    借阅计数表模型
+    
+    只有一行（id=1），由数据库触发器在借阅记录增删时增量维护，
+    使借阅统计无需对全部历史记录执行 COUNT(*)
+    
+    字段说明：
+        id: 主键（固定为 1）
+        total_borrows: 借阅记录总数
+    """
+    __tablename__ = "borrow_counters"
+
+    id = Column(Integer, primary_key=True)
+    total_borrows = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,48 @@
+"""
+定时任务模型模块
+
+定义后台定时任务相关的数据库模型：
+- SchedulerLease: 定时任务租约表模型
+
+表结构：
+- scheduler_leases: 存储定时任务的执行租约和最近一次运行信息
+"""
+
+# 导入 SQLAlchemy 组件
+from sqlalchemy import Column, Integer, String, DateTime
+from database import Base
+
+
+class SchedulerLease(Base):
+    """
+    定时任务租约表模型
+
+    多个 worker 进程同时运行时，只有成功抢到租约（expires_at 已过期）的进程执行任务，
+    保证同一任务在一个周期内只运行一次；最近一次运行结果也记录在此，
+    任意 worker 都能读取到一致的运行指标
+
+    字段说明：
+        name: 任务名称（主键）
+        owner: 当前持有租约的 worker 标识
+        expires_at: 租约到期时间（到期后其他 worker 可以抢占）
+        last_run_at: 最近一次运行开始时间
+        last_duration_ms: 最近一次运行耗时（毫秒）
+        last_rows_overdue: 最近一次运行标记为逾期的记录数
+        last_rows_fined: 最近一次运行更新罚款的记录数
+        last_error: 最近一次运行的错误信息（成功时为空）
+    """
+    __tablename__ = "scheduler_leases"
+
+    # 主键字段
+    name = Column(String(50), primary_key=True)
+
+    # 租约信息
+    owner = Column(String(100))
+    expires_at = Column(DateTime)
+
+    # 最近一次运行信息
+    last_run_at = Column(DateTime)
+    last_duration_ms = Column(Integer)
+    last_rows_overdue = Column(Integer, default=0)
+    last_rows_fined = Column(Integer, default=0)
+    last_error = Column(String(255))
@@ -9,6 +9,8 @@
 - 使用 OAuth2 密码流进行认证
 - JWT 令牌用于后续请求的身份验证
 - 密码使用 bcrypt 算法加密存储
+- 查询用户使用只读会话，并在计算 bcrypt 之前结束事务、归还连接；
+  注册只在插入新用户时使用写会话，密码校验和哈希不会占用（SQLite 下唯一的）写连接
 """
 
 # 导入标准库
@@ -17,10 +19,12 @@ from datetime import timedelta
 # 导入 FastAPI 组件
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # 导入项目模块
-from database import get_db
+from database import get_db, get_read_db
 from models.user import User
 from schemas.user import UserCreate, UserResponse, Token
 from utils.auth import (
@@ -37,7 +41,11 @@ router = APIRouter(prefix="/auth", tags=["认证"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(
+    user: UserCreate,
+    read_db: AsyncSession = Depends(get_read_db),
+    db: AsyncSession = Depends(get_db)
+):
     """
     用户注册接口
     
@@ -56,19 +64,21 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     异常：
         HTTPException(400): 用户名或邮箱已存在
     """
-    # 检查用户名是否已存在
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
+    # 检查用户名是否已存在（只读会话）
+    result = await read_db.execute(select(User.id).where(User.username == user.username))
+    if result.first() is not None:
         raise HTTPException(status_code=400, detail="用户名已存在")
 
     # 检查邮箱是否已注册
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+    result = await read_db.execute(select(User.id).where(User.email == user.email))
+    if result.first() is not None:
         raise HTTPException(status_code=400, detail="邮箱已注册")
 
-    # 创建新用户
-    # 对密码进行哈希加密
-    hashed_password = get_password_hash(user.password)
+    # 结束只读事务，哈希密码期间不占用连接
+    await read_db.rollback()
+
+    # 对密码进行哈希加密（此时写会话尚未获取连接）
+    hashed_password = await get_password_hash(user.password)
     
     # 创建用户对象
     db_user = User(
@@ -82,18 +92,22 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     # 添加到数据库会话
     db.add(db_user)
     
-    # 提交事务
-    db.commit()
+    # 提交事务（并发注册同一用户名 / 邮箱时由唯一索引拒绝）
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="用户名或邮箱已存在")
     
     # 刷新对象，获取数据库生成的 ID 等字段
-    db.refresh(db_user)
+    await db.refresh(db_user)
     
     # 返回用户信息（response_model 会自动过滤敏感字段）
     return db_user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_read_db)):
     """
     用户登录接口
     
@@ -110,11 +124,18 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         HTTPException(401): 用户名或密码错误
         HTTPException(400): 用户已被禁用
     """
-    # 根据用户名查询用户
-    user = db.query(User).filter(User.username == form_data.username).first()
+    # 根据用户名查询用户（只取校验需要的列）
+    result = await db.execute(
+        select(User.username, User.hashed_password, User.is_active)
+        .where(User.username == form_data.username)
+    )
+    user = result.first()
+
+    # 结束只读事务，校验密码期间不占用连接
+    await db.rollback()
     
     # 验证用户是否存在且密码正确
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -3,44 +3,72 @@
 
 提供图书的 CRUD 操作和封面上传功能：
 - POST /api/v1/books: 添加图书（管理员/图书管理员）
+- POST /api/v1/books/import: 从 CSV / JSONL 文件批量导入图书（管理员/图书管理员）
 - POST /api/v1/books/upload-cover: 上传封面图片
-- GET /api/v1/books/covers/{filename}: 获取封面图片
+- GET /api/v1/books/upload-cover/{job_id}: 查询封面处理任务状态
+- GET /api/v1/books/covers/{filename}: 获取封面图片（按 ?w= 和 Accept 选择缩略图）
 - GET /api/v1/books: 获取图书列表（支持筛选和搜索）
 - GET /api/v1/books/search: 高级搜索
+- GET /api/v1/books/export: 导出图书目录（CSV / NDJSON / Parquet，管理员/图书管理员）
 - GET /api/v1/books/{book_id}: 获取图书详情
 - PUT /api/v1/books/{book_id}: 更新图书信息（管理员/图书管理员）
 - DELETE /api/v1/books/{book_id}: 删除图书（仅管理员）
 
 技术要点：
-- 文件上传使用 UploadFile
-- 图片处理使用 PIL 进行压缩
+- 文件上传使用 UploadFile，分块写入临时文件并限制大小
+- 封面按内容的 SHA-256 命名，重复上传的图片不再重复存储和处理；删除图书时仅在封面不再被引用、
+  且超过宽限期（可能有尚未保存的上传复用了该封面）时删除文件，保存图书时确认封面仍然存在
+- 图片处理使用 PIL 进行压缩（在独立进程池中执行，支持等待结果或轮询任务状态）
+- 上传时生成多个宽度的 AVIF/WebP/JPEG 缩略图，列表页无需下载原尺寸封面
+- 封面响应带强 ETag 和 immutable 缓存头，支持 304 条件请求和 Range 请求
+- 封面保存在可替换的存储后端（本地目录或 S3 兼容对象存储），对象存储可通过预签名 URL 重定向下载
+- 使用 AsyncSession 异步访问数据库
 - SQLAlchemy 查询支持复杂条件筛选
+- 关键词搜索使用 SQLite FTS5 全文索引，按 bm25 相关度排序
+- 图书列表支持游标分页（cursor），下一页游标通过响应头 X-Next-Cursor 返回
+- 图书详情、列表和搜索结果按规范化的查询参数缓存，图书增删改及借还书后失效
+- 导出使用服务端游标分批读取并流式发送，内存占用与图书数量无关
+- 批量导入逐行读取上传文件，按批校验并使用多行 INSERT ... ON CONFLICT(isbn) 写入，每批提交一次
 """
 
 # 导入标准库
+import json
 import os
-import uuid
+from datetime import datetime
 from typing import List, Optional
 
 # 导入 FastAPI 组件
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select, delete, exists, func
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # 导入项目模块
-from database import get_db
+from database import get_db, get_read_db
 from models.user import User
 from models.book import Book
+from models.borrow import BorrowRecord
+from utils.borrow import FINE_STATUSES
 from schemas.book import BookCreate, BookUpdate, BookResponse, BookSearch
 from utils.auth import get_current_active_user, require_role
+from utils.search import filter_by_keyword
+from utils.pagination import paginate, split_page, set_next_cursor
+from utils.book_cache import detail_key, query_key, get_cached, set_cached, invalidate_book
+from utils.export import export_response, check_export_format
+from utils.book_import import import_books, detect_format, BOOK_IMPORT_BATCH_SIZE, ON_CONFLICT_UPDATE
+from utils.http_cache import cached_file_response
+from utils.storage import cover_storage, COVER_STORAGE_DIR
+from utils.images import (
+    save_upload, submit_cover_job, get_cover_job, select_rendition, release_cover,
+    COVER_URL_PREFIX, JOB_PENDING, JOB_FAILED
+)
 
 # 创建 APIRouter 实例
 router = APIRouter(prefix="/books", tags=["图书管理"])
 
-# 配置上传目录
-# 计算上传目录路径：项目根目录 /uploads/covers
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads", "covers")
+# 上传暂存目录（使用本地存储时同时是封面存储目录）
+UPLOAD_DIR = COVER_STORAGE_DIR
 # 确保目录存在
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -48,11 +76,105 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 MAX_WIDTH = 400
 MAX_HEIGHT = 560  # 保持 1:1.4 的图书封面比例
 
+# 上传封面时默认等待处理完成的秒数
+COVER_WAIT_TIMEOUT = float(os.getenv("COVER_WAIT_TIMEOUT", "10"))
+
+# 预签名 URL 有效期（秒）；大于 0 且存储后端支持时，读取封面重定向到对象存储，0 表示由 API 转发
+COVER_PRESIGN_EXPIRES = int(os.getenv("COVER_PRESIGN_EXPIRES", "0"))
+
+
+def _json_response(body: str, next_cursor: Optional[str] = None) -> Response:
+    """返回已序列化的 JSON 响应体（缓存命中时不再经过 ORM 和 Pydantic）"""
+    response = Response(content=body, media_type="application/json")
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+def _serialize(data) -> str:
+    """将图书（或图书列表）序列化为与 BookResponse 一致的 JSON"""
+    if isinstance(data, list):
+        content = [BookResponse.model_validate(book).model_dump(mode="json") for book in data]
+    else:
+        content = BookResponse.model_validate(data).model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+
+
+async def _release_cover(db: AsyncSession, cover_image: Optional[str]):
+    """
+    封面不再被任何图书引用时删除封面文件（在事务提交后调用）
+
+    封面按内容命名，多本图书可能共用同一个文件，引用计数即 cover_image 相同的图书数量；
+    最近上传过的封面可能正被尚未保存的图书使用，宽限期内不删除（由定时清理任务回收）
+
+    参数：
+        db: 数据库会话
+        cover_image: 被移除的封面 URL
+    """
+    if not cover_image or not cover_image.startswith(COVER_URL_PREFIX):
+        return
+    references = await db.scalar(
+        select(func.count()).select_from(Book).where(Book.cover_image == cover_image)
+    )
+    if references == 0:
+        await run_in_threadpool(release_cover, os.path.basename(cover_image))
+
+
+async def _claim_cover(cover_image: Optional[str]):
+    """
+    保存图书前确认引用的封面仍然存在，并刷新其修改时间（宽限期内不会被清理）
+
+    参数：
+        cover_image: 图书的封面 URL
+
+    异常：
+        HTTPException(400): 封面文件已被删除
+    """
+    if not cover_image or not cover_image.startswith(COVER_URL_PREFIX):
+        return
+    try:
+        found = await run_in_threadpool(cover_storage.touch, os.path.basename(cover_image))
+    except ValueError:
+        found = False
+    if not found:
+        raise HTTPException(status_code=400, detail="封面图片不存在，请重新上传")
+
+
+def filter_book_list(
+    query,
+    category: Optional[str] = None,
+    available_only: bool = False,
+    keyword: Optional[str] = None
+):
+    """
+    图书列表的筛选条件（列表接口和导出接口共用）
+
+    参数：
+        query: 图书查询语句
+        category: 按分类筛选
+        available_only: 只包含有库存的图书
+        keyword: 关键词（匹配书名、作者、ISBN，使用全文索引）
+
+    返回：
+        Select: 添加筛选条件后的查询语句
+    """
+    # 按分类筛选
+    if category:
+        query = query.where(Book.category == category)
+
+    # 只显示有库存的图书
+    if available_only:
+        query = query.where(Book.available_copies > 0)
+
+    # 关键词搜索（匹配书名、作者、ISBN，使用全文索引）
+    if keyword:
+        query = filter_by_keyword(query, keyword, columns=("title", "author", "isbn"), rank=False)
+    return query
+
 
 @router.post("", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
-def create_book(
+async def create_book(
     book: BookCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
@@ -74,13 +196,15 @@ def create_book(
         BookResponse: 创建的图书信息
     
     异常：
-        HTTPException(400): ISBN 已存在
+        HTTPException(400): ISBN 已存在，或封面图片不存在
         HTTPException(403): 权限不足
     """
     # 检查 ISBN 是否已存在
-    db_book = db.query(Book).filter(Book.isbn == book.isbn).first()
+    result = await db.execute(select(Book).where(Book.isbn == book.isbn))
+    db_book = result.scalar_one_or_none()
     if db_book:
         raise HTTPException(status_code=400, detail="ISBN已存在")
+    await _claim_cover(book.cover_image)
 
     # 创建图书对象
     db_book = Book(**book.dict())
@@ -89,207 +213,338 @@ def create_book(
     
     # 添加到数据库
     db.add(db_book)
-    db.commit()
-    db.refresh(db_book)
+    await db.commit()
+    await db.refresh(db_book)
+
+    # 新增图书影响列表和搜索结果
+    await invalidate_book()
     
     return db_book
 
 
+@router.post("/import")
+async def import_book_catalog(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$", description="文件格式（默认按扩展名识别）"),
+    on_conflict: str = Query(ON_CONFLICT_UPDATE, pattern="^(update|skip)$", description="ISBN 已存在时更新或跳过"),
+    batch_size: int = Query(BOOK_IMPORT_BATCH_SIZE, ge=1, le=10000, description="每批写入并提交的行数"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "librarian"))
+):
+    """
+    从 CSV / JSONL 文件批量导入图书（管理员/图书管理员权限）
+    
+    CSV 首行为表头，列名与添加图书的请求字段相同；JSONL 每行一个与添加图书请求体相同的 JSON 对象。
+    文件逐行读取、按批校验写入，每批提交一次；单行错误不会中断导入，在结果中按行号返回。
+    ISBN 已存在时更新该图书（可选字段为空时保留原值，总数量变化时按差值调整可用数量），
+    或在 on_conflict=skip 时跳过
+    
+    请求体：
+        file: 导入文件（.csv / .jsonl / .ndjson，UTF-8 编码）
+    
+    查询参数：
+        format: csv 或 jsonl（可选，默认按扩展名识别）
+        on_conflict: update（默认）或 skip
+        batch_size: 每批行数（默认 BOOK_IMPORT_BATCH_SIZE，范围 1-10000）
+    
+    返回：
+        {"total", "created", "updated", "skipped", "failed", "errors": [{"line", "isbn", "error"}], "aborted"}
+    
+    异常：
+        HTTPException(400): 无法识别文件格式
+        HTTPException(403): 权限不足
+    """
+    try:
+        fmt = detect_format(file.filename, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await import_books(db, file.file, fmt, batch_size=batch_size, on_conflict=on_conflict)
+
+
 @router.post("/upload-cover")
-def upload_cover(
+async def upload_cover(
+    response: Response,
     file: UploadFile = File(...),
+    wait: float = Query(COVER_WAIT_TIMEOUT, ge=0, le=60, description="等待处理完成的最长秒数，0 表示立即返回任务 ID"),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
     上传图书封面图片，返回可访问的 URL 路径
     
+    上传内容分块写入临时文件，解码和缩放在独立的进程池中执行；
+    封面按内容摘要命名，相同图片再次上传时直接返回已有封面；
+    在 wait 秒内处理完成时直接返回结果，否则返回 202 和任务 ID，
+    可通过 GET /api/v1/books/upload-cover/{job_id} 查询处理状态
+    
     请求体：
         file: 图片文件（支持 jpg/png/gif/webp）
     
+    查询参数：
+        wait: 等待处理完成的最长秒数（默认 10，范围 0-60）
+    
     返回：
-        {"url": "/api/v1/books/covers/{filename}"}
+        {"url": "/api/v1/books/covers/{filename}", "job_id": "...", "status": "done", "error": null}
+        （未在 wait 秒内完成时状态码为 202，status 为 "pending"）
     
     异常：
         HTTPException(400): 不支持的文件格式
+        HTTPException(413): 文件过大
         HTTPException(500): 图片处理失败
+        HTTPException(503): 图片处理任务排队已满
     """
     # 校验文件类型
     allowed_types = {"image/jpeg", "image/png", "image/gif", "image/webp"}
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="仅支持 jpg/png/gif/webp 格式的图片")
 
-    # 生成唯一文件名（使用 UUID 避免冲突）
     ext = os.path.splitext(file.filename)[1].lower()
     if not ext:
         ext = ".jpg"  # 默认使用 jpg 格式
-    filename = f"{uuid.uuid4().hex}{ext}"
-    filepath = os.path.join(UPLOAD_DIR, filename)
-
-    # 读取图片并进行压缩优化
-    try:
-        from PIL import Image
-        import io
 
-        # 读取图片数据
-        image_data = file.file.read()
-        img = Image.open(io.BytesIO(image_data))
+    # 分块写入临时文件，同时计算内容摘要
+    source, digest = await save_upload(file, UPLOAD_DIR)
 
-        # 获取原始尺寸
-        width, height = img.size
-
-        # 计算缩放比例（保持宽高比）
-        scale = min(MAX_WIDTH / width, MAX_HEIGHT / height)
-
-        # 如果图片小于最大尺寸，直接保存
-        if scale >= 1:
-            img.save(filepath, quality=95)
-        else:
-            # 计算新尺寸
-            new_width = int(width * scale)
-            new_height = int(height * scale)
+    # 按内容命名（扩展名决定保存格式），相同图片已存在时不再重复处理
+    filename = f"{digest}{ext}"
+    filepath = os.path.join(UPLOAD_DIR, filename)
+    job = await submit_cover_job(
+        source, filepath, f"{COVER_URL_PREFIX}{filename}", MAX_WIDTH, MAX_HEIGHT, wait=wait
+    )
 
-            # 使用高质量缩放算法（LANCZOS）
-            img = img.resize((new_width, new_height), Image.LANCZOS)
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=f"图片处理失败: {job['error']}")
+    if job["status"] == JOB_PENDING:
+        response.status_code = status.HTTP_202_ACCEPTED
 
-            # 保存压缩后的图片
-            img.save(filepath, quality=90)
+    # 返回相对路径（前端通过此 URL 访问图片）
+    return job
 
-    except ImportError:
-        # 如果没有安装 PIL，直接保存原始文件
-        import shutil
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"图片处理失败: {str(e)}")
 
-    # 返回相对路径（前端通过此 URL 访问图片）
-    return {"url": f"/api/v1/books/covers/{filename}"}
+@router.get("/upload-cover/{job_id}")
+async def get_upload_cover_status(
+    job_id: str,
+    current_user: User = Depends(require_role("admin", "librarian"))
+):
+    """
+    查询封面处理任务状态
+    
+    路径参数：
+        job_id: 上传接口返回的任务 ID
+    
+    返回：
+        {"job_id": "...", "status": "pending/done/failed", "url": "...", "error": null}
+    
+    异常：
+        HTTPException(404): 任务不存在或已过期
+    """
+    job = await get_cover_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return job
 
 
 @router.get("/covers/{filename}")
-def get_cover(filename: str):
+async def get_cover(
+    request: Request,
+    filename: str,
+    w: Optional[int] = Query(None, ge=1, description="期望的图片宽度（返回不小于该宽度的最小缩略图）"),
+    accept: Optional[str] = Header(None)
+):
     """
     获取图书封面图片
     
+    按 w 选择缩略图宽度，按 Accept 请求头选择 AVIF/WebP/JPEG 格式；
+    封面没有缩略图时返回原图。文件名为内容的 SHA-256、内容不可变，响应可被长期缓存，
+    请求带 If-None-Match / If-Modified-Since 且未变化时返回 304；
+    配置 COVER_PRESIGN_EXPIRES 且使用对象存储时，重定向到预签名 URL
+    
     路径参数：
         filename: 图片文件名
     
+    查询参数：
+        w: 期望的图片宽度（可选，默认返回最大的缩略图）
+    
     返回：
-        FileResponse: 图片文件
+        Response: 图片内容（200/206），或 304（未变化）、416（Range 无效）、307（重定向到对象存储）
     
     异常：
         HTTPException(404): 图片不存在
     """
-    filepath = os.path.join(UPLOAD_DIR, filename)
-    if not os.path.exists(filepath):
+    key, negotiated = await select_rendition(filename, w, accept)
+    # 同一 URL 按 Accept 返回不同格式，缓存需要区分
+    headers = {"vary": "Accept"} if negotiated else {}
+
+    if COVER_PRESIGN_EXPIRES > 0:
+        url = cover_storage.presigned_url(key, COVER_PRESIGN_EXPIRES)
+        if url:
+            # 重定向本身只能在预签名 URL 过期前被缓存
+            headers["cache-control"] = f"public, max-age={COVER_PRESIGN_EXPIRES // 2}"
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers=headers)
+
+    response = await cached_file_response(request, cover_storage, key, headers)
+    if response is None:
         raise HTTPException(status_code=404, detail="图片不存在")
-    return FileResponse(filepath)
+    return response
 
 
 @router.get("", response_model=List[BookResponse])
-def list_books(
+async def list_books(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（取自上一页响应头 X-Next-Cursor）"),
     category: Optional[str] = None,
     available_only: bool = False,
     keyword: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     获取图书列表，支持搜索和筛选
     
+    按图书 ID 排序，支持两种分页方式：
+    - offset 分页：skip + limit（兼容旧版本，深页较慢）
+    - 游标分页：cursor + limit，任意页耗时相同；传入 cursor 时忽略 skip
+    两种方式都会在响应头 X-Next-Cursor 中返回下一页游标（已是最后一页时不返回）
+    
     查询参数：
         skip: 跳过条数（默认 0）
         limit: 每页条数（默认 10，范围 1-100）
+        cursor: 分页游标（可选）
         category: 按分类筛选（可选）
         available_only: 是否只显示有库存的图书（默认 False）
         keyword: 搜索关键词（匹配书名、作者、ISBN）
     
     返回：
         List[BookResponse]: 图书列表
+    
+    异常：
+        HTTPException(400): 分页游标无效
     """
-    # 构建查询对象
-    query = db.query(Book)
+    # 查询缓存（缓存键在查询数据库之前生成）
+    cache_key = await query_key("list", {
+        "skip": skip, "limit": limit, "cursor": cursor, "category": category,
+        "available_only": available_only, "keyword": keyword,
+    })
+    cached = await get_cached(cache_key)
+    if cached is not None:
+        return _json_response(cached["body"], cached["next_cursor"])
 
-    # 按分类筛选
-    if category:
-        query = query.filter(Book.category == category)
+    # 构建查询语句
+    query = filter_book_list(select(Book), category, available_only, keyword)
 
-    # 只显示有库存的图书
-    if available_only:
-        query = query.filter(Book.available_copies > 0)
+    # 分页查询（按 id 排序）
+    result = await db.execute(paginate(query, [Book.id], limit, cursor=cursor, skip=skip))
+    books, next_cursor = split_page(result.scalars().all(), ["id"], limit)
 
-    # 关键词搜索（模糊匹配书名、作者、ISBN）
-    if keyword:
-        search = f"%{keyword}%"  # SQL LIKE 通配符
-        query = query.filter(
-            or_(
-                Book.title.like(search),
-                Book.author.like(search),
-                Book.isbn.like(search)
-            )
-        )
-
-    # 分页查询
-    books = query.offset(skip).limit(limit).all()
-    return books
+    body = _serialize(books)
+    await set_cached(cache_key, {"body": body, "next_cursor": next_cursor})
+    return _json_response(body, next_cursor)
 
 
 @router.get("/search", response_model=List[BookResponse])
-def search_books(
+async def search_books(
     q: Optional[str] = Query(None, description="搜索关键词"),
     category: Optional[str] = None,
     author: Optional[str] = None,
     available_only: bool = False,
-    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     高级图书搜索
     
     查询参数：
-        q: 综合搜索关键词（匹配书名、作者、ISBN、简介）
+        q: 综合搜索关键词（匹配书名、作者、ISBN、简介，按相关度排序）
         category: 按分类筛选
         author: 按作者筛选
         available_only: 是否只显示有库存的图书
+        skip: 跳过条数（默认 0）
+        limit: 每页条数（默认 10，范围 1-100）
     
     返回：
         List[BookResponse]: 匹配的图书列表
     """
-    query = db.query(Book)
-
-    # 综合搜索
+    # 查询缓存（缓存键在查询数据库之前生成）
+    cache_key = await query_key("search", {
+        "q": q, "category": category, "author": author,
+        "available_only": available_only, "skip": skip, "limit": limit,
+    })
+    cached = await get_cached(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
+    query = select(Book)
+
+    # 综合搜索（全文索引，按 bm25 相关度排序）
     if q:
-        search = f"%{q}%"
-        query = query.filter(
-            or_(
-                Book.title.like(search),
-                Book.author.like(search),
-                Book.isbn.like(search),
-                Book.description.like(search)
-            )
-        )
+        query = filter_by_keyword(query, q)
 
     # 按分类筛选
     if category:
-        query = query.filter(Book.category == category)
+        query = query.where(Book.category == category)
 
     # 按作者筛选（模糊匹配）
     if author:
-        query = query.filter(Book.author.like(f"%{author}%"))
+        query = query.where(Book.author.ilike(f"%{author}%"))
 
     # 只显示有库存的图书
     if available_only:
-        query = query.filter(Book.available_copies > 0)
+        query = query.where(Book.available_copies > 0)
+
+    # 相关度相同（或无关键词）时按 ID 排序，保证分页结果稳定
+    query = query.order_by(Book.id)
 
-    return query.all()
+    # 分页查询
+    result = await db.execute(query.offset(skip).limit(limit))
+
+    body = _serialize(list(result.scalars().all()))
+    await set_cached(cache_key, body)
+    return _json_response(body)
+
+
+@router.get("/export")
+async def export_books(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="导出格式"),
+    category: Optional[str] = None,
+    available_only: bool = False,
+    keyword: Optional[str] = None,
+    current_user: User = Depends(require_role("admin", "librarian"))
+):
+    """
+    导出图书目录（管理员/图书管理员权限）
+    
+    筛选条件与图书列表相同，按图书 ID 排序；结果通过服务端游标分批读取并流式发送，
+    导出任意数量的图书内存占用都不变。CSV 的列名与添加图书 / 批量导入的字段相同，可直接重新导入
+    
+    查询参数：
+        format: csv（默认）/ ndjson / parquet
+        category: 按分类筛选（可选）
+        available_only: 是否只导出有库存的图书（默认 False）
+        keyword: 搜索关键词（匹配书名、作者、ISBN）
+    
+    返回：
+        StreamingResponse: 文件下载（books-YYYYMMDD.<format>）
+    
+    异常：
+        HTTPException(403): 权限不足
+        HTTPException(501): 导出 Parquet 但服务端未安装 pyarrow
+    """
+    try:
+        check_export_format(format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    query = filter_book_list(select(*Book.__table__.columns), category, available_only, keyword).order_by(Book.id)
+    return export_response(query, format, f"books-{datetime.now():%Y%m%d}")
 
 
 @router.get("/{book_id}", response_model=BookResponse)
-def get_book(
+async def get_book(
     book_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -304,17 +559,26 @@ def get_book(
     异常：
         HTTPException(404): 图书不存在
     """
-    book = db.query(Book).filter(Book.id == book_id).first()
+    # 查询缓存（缓存键在查询数据库之前生成）
+    cache_key = await detail_key(book_id)
+    cached = await get_cached(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="图书不存在")
-    return book
+
+    body = _serialize(book)
+    await set_cached(cache_key, body)
+    return _json_response(body)
 
 
 @router.put("/{book_id}", response_model=BookResponse)
-def update_book(
+async def update_book(
     book_id: int,
     book_update: BookUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
@@ -332,36 +596,46 @@ def update_book(
     
     异常：
         HTTPException(404): 图书不存在
+        HTTPException(400): 封面图片不存在
         HTTPException(403): 权限不足
     """
     # 查询图书
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="图书不存在")
 
     # 获取更新数据（只包含传入的字段）
     update_data = book_update.dict(exclude_unset=True)
+    if 'cover_image' in update_data:
+        await _claim_cover(update_data['cover_image'])
 
     # 如果更新了总数量，同步更新可用数量
+    # （赋值为 SQL 表达式，基于数据库中的当前值调整，不会覆盖并发借还书对库存的修改）
     if 'total_copies' in update_data:
         diff = update_data['total_copies'] - book.total_copies
-        book.available_copies += diff
+        book.available_copies = Book.available_copies + diff
 
     # 应用更新
+    old_cover = book.cover_image
     for field, value in update_data.items():
         setattr(book, field, value)
 
     # 提交事务
-    db.commit()
-    db.refresh(book)
+    await db.commit()
+    await db.refresh(book)
+    await invalidate_book(book_id)
+
+    # 更换封面后，旧封面没有其他图书引用时删除
+    if book.cover_image != old_cover:
+        await _release_cover(db, old_cover)
     
     return book
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_book(
+async def delete_book(
     book_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("admin"))
 ):
     """
@@ -379,25 +653,30 @@ def delete_book(
         HTTPException(403): 权限不足
     """
     # 查询图书
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="图书不存在")
 
-    # 检查是否有未归还的借阅记录
-    active_borrows = [b for b in book.borrow_records if b.status.value in ['borrowed', 'overdue', 'renewed']]
-    if active_borrows:
+    # 检查是否有未归还的借阅记录（借出、续借、逾期）
+    has_active_borrows = await db.scalar(
+        select(
+            exists().where(
+                BorrowRecord.book_id == book_id,
+                BorrowRecord.status.in_(FINE_STATUSES)
+            )
+        )
+    )
+    if has_active_borrows:
         raise HTTPException(status_code=400, detail="该图书有未归还记录，无法删除")
 
-    # 删除封面图片（如果存在）
-    if book.cover_image:
-        cover_filename = os.path.basename(book.cover_image)
-        cover_path = os.path.join(UPLOAD_DIR, cover_filename)
-        if os.path.exists(cover_path):
-            os.remove(cover_path)
-
     # 删除图书记录
-    db.delete(book)
-    db.commit()
+    cover_image = book.cover_image
+    await db.execute(delete(Book).where(Book.id == book_id))
+    await db.commit()
+    await invalidate_book(book_id)
+
+    # 封面没有其他图书引用时删除封面文件
+    await _release_cover(db, cover_image)
     
     # 返回 None，状态码 204
     return None
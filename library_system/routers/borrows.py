@@ -3,10 +3,13 @@
 
 提供图书借阅、归还、续借等功能：
 - POST /api/v1/borrows/borrow: 借阅图书
+- POST /api/v1/borrows/borrow/batch: 批量借阅图书（借阅台为同一位读者借出多本）
 - POST /api/v1/borrows/return: 归还图书
+- POST /api/v1/borrows/return/batch: 批量归还图书
 - POST /api/v1/borrows/renew: 续借图书
 - GET /api/v1/borrows/my-borrows: 获取当前用户的借阅记录
 - GET /api/v1/borrows/all: 获取所有借阅记录（管理员/图书管理员）
+- GET /api/v1/borrows/export: 导出借阅记录（CSV / NDJSON / Parquet，管理员/图书管理员）
 - GET /api/v1/borrows/statistics: 获取借阅统计信息（管理员/图书管理员）
 - POST /api/v1/borrows/check-overdue: 检查并标记逾期记录（管理员/图书管理员）
 
@@ -14,27 +17,43 @@
 - 逾期检查和罚款计算逻辑
 - 续借次数限制（最多2次）
 - 权限验证（管理员可操作所有记录）
+- 使用 AsyncSession 异步访问数据库
+- 库存增减使用带条件的原子 UPDATE，重复借阅由部分唯一索引保证，并发请求不会超借
+- 借阅记录列表支持游标分页（按 (borrow_date, id) 倒序），下一页游标通过响应头 X-Next-Cursor 返回
+- 批量借阅 / 归还在一个事务中完成，库存按图书汇总后用一条 UPDATE 修改，返回逐项结果
+- 借阅记录导出使用服务端游标分批读取并流式发送，内存占用与记录数量无关
 """
 
 # 导入标准库
+from collections import Counter
 from typing import List, Optional
 from datetime import datetime, timedelta
 
 # 导入 FastAPI 组件
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import func, case, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # 导入项目模块
-from database import get_db
+from database import get_db, get_read_db
 from models.user import User
 from models.book import Book
 from models.borrow import BorrowRecord, BorrowStatus
 from schemas.borrow import (
     BorrowCreate, BorrowReturn, BorrowRenew,
-    BorrowRecordResponse, BorrowRecordDetail, BorrowStatistics
+    BorrowRecordResponse, BorrowRecordDetail, BorrowStatistics,
+    BorrowBatchCreate, BorrowBatchReturn, BorrowBatchItem, BorrowBatchResponse
 )
 from utils.auth import get_current_active_user, require_role
+from utils.pagination import paginate, split_page, set_next_cursor
+from utils.book_cache import invalidate_book, invalidate_books
+from utils.export import export_response, check_export_format
+from utils.borrow import (
+    ACTIVE_STATUSES, FINE_STATUSES, OVERDUE_BATCH_SIZE, overdue_condition, effective_status, fine_expression,
+    total_borrows_expression, borrow_eligibility_query, batch_borrow_eligibility_query, overdue_check_query,
+    mark_overdue_records
+)
 
 # 创建 APIRouter 实例
 router = APIRouter(prefix="/borrows", tags=["借阅管理"])
@@ -79,10 +98,99 @@ def calculate_fine(record: BorrowRecord) -> int:
     return max(0, overdue_days * 100)  # 每天1元 = 100分
 
 
+def borrow_detail_query(
+    now: datetime,
+    with_user: bool = True,
+    resolve_overdue: bool = False
+):
+    """
+    构建借阅详情查询
+
+    通过 LEFT JOIN 一次性取出借阅记录及关联的图书、用户信息，
+    且只投影 BorrowRecordDetail 需要的列，避免加载完整 ORM 对象；
+    罚款金额（及逾期状态）由 SQL 表达式在数据库中计算
+
+    参数：
+        now: 计算逾期和罚款使用的当前时间
+        with_user: 是否关联用户表（查询当前用户记录时无需关联）
+        resolve_overdue: 是否将逾期记录的状态显示为 OVERDUE
+
+    返回：
+        Select: 结果行字段名与 BorrowRecordDetail 一致
+    """
+    columns = [
+        BorrowRecord.id,
+        BorrowRecord.user_id,
+        BorrowRecord.book_id,
+        BorrowRecord.borrow_date,
+        BorrowRecord.due_date,
+        BorrowRecord.return_date,
+        effective_status(now).label("status") if resolve_overdue else BorrowRecord.status,
+        BorrowRecord.renew_count,
+        fine_expression(now).label("fine_amount"),
+        BorrowRecord.notes,
+        Book.title.label("book_title"),
+        Book.author.label("book_author"),
+    ]
+    if with_user:
+        columns += [User.username.label("user_name"), User.email.label("user_email")]
+
+    query = select(*columns).outerjoin(Book, Book.id == BorrowRecord.book_id)
+    if with_user:
+        query = query.outerjoin(User, User.id == BorrowRecord.user_id)
+    return query
+
+
+def _batch_response(results: List[BorrowBatchItem]) -> BorrowBatchResponse:
+    """汇总批量操作的逐项结果"""
+    succeeded = sum(1 for item in results if item.success)
+    return BorrowBatchResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+def filter_borrow_list(
+    query,
+    now: datetime,
+    status: Optional[BorrowStatus] = None,
+    user_id: Optional[int] = None,
+    book_id: Optional[int] = None,
+    overdue_only: bool = False
+):
+    """
+    借阅记录列表的筛选条件（列表接口和导出接口共用）
+
+    参数：
+        query: 借阅记录查询语句
+        now: 判断逾期使用的当前时间
+        status: 按状态筛选
+        user_id: 按用户 ID 筛选
+        book_id: 按图书 ID 筛选
+        overdue_only: 只包含逾期记录
+
+    返回：
+        Select: 添加筛选条件后的查询语句
+    """
+    # 按状态筛选
+    if status:
+        query = query.where(BorrowRecord.status == status)
+
+    # 按用户 ID 筛选
+    if user_id:
+        query = query.where(BorrowRecord.user_id == user_id)
+
+    # 按图书 ID 筛选
+    if book_id:
+        query = query.where(BorrowRecord.book_id == book_id)
+
+    # 只显示逾期记录（在分页之前由数据库筛选，保证每页数据完整）
+    if overdue_only:
+        query = query.where(overdue_condition(now))
+    return query
+
+
 @router.post("/borrow", response_model=BorrowRecordResponse, status_code=status.HTTP_201_CREATED)
-def borrow_book(
+async def borrow_book(
     borrow_data: BorrowCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -99,59 +207,184 @@ def borrow_book(
         HTTPException(404): 图书不存在
         HTTPException(400): 图书无可用副本/有逾期图书/已借阅该图书
     """
-    # 检查图书是否存在
-    book = db.query(Book).filter(Book.id == borrow_data.book_id).first()
-    if not book:
+    # 一次查询完成全部借阅资格检查：图书库存、是否有逾期未还、是否已借阅该图书
+    now = datetime.now()
+    result = await db.execute(borrow_eligibility_query(current_user.id, borrow_data.book_id, now))
+    eligibility = result.first()
+    if eligibility is None:
         raise HTTPException(status_code=404, detail="图书不存在")
-
-    # 检查是否有可用副本
-    if book.available_copies <= 0:
+    # 快速失败：明显没有库存时直接返回（最终以下面的原子扣减为准）
+    if eligibility.available_copies <= 0:
         raise HTTPException(status_code=400, detail="该图书暂无可用副本")
-
-    # 检查用户是否有逾期未还图书
-    overdue_borrows = db.query(BorrowRecord).filter(
-        BorrowRecord.user_id == current_user.id,
-        BorrowRecord.status.in_([BorrowStatus.BORROWED, BorrowStatus.RENEWED])
-    ).all()
-
-    for record in overdue_borrows:
-        if check_overdue(record):
-            raise HTTPException(status_code=400, detail="您有逾期未还的图书，请先归还")
-
-    # 检查用户是否已借阅该图书
-    existing = db.query(BorrowRecord).filter(
-        BorrowRecord.user_id == current_user.id,
-        BorrowRecord.book_id == borrow_data.book_id,
-        BorrowRecord.status.in_([BorrowStatus.BORROWED, BorrowStatus.RENEWED])
-    ).first()
-
-    if existing:
+    if eligibility.has_overdue:
+        raise HTTPException(status_code=400, detail="您有逾期未还的图书，请先归还")
+    if eligibility.already_borrowed:
         raise HTTPException(status_code=400, detail="您已借阅该图书，请勿重复借阅")
 
-    # 创建借阅记录
-    due_date = datetime.now() + timedelta(days=borrow_data.days)
+    # 创建借阅记录（所有字段显式赋值，提交后无需再 refresh 查询一次）
+    due_date = now + timedelta(days=borrow_data.days)
     borrow_record = BorrowRecord(
         user_id=current_user.id,
         book_id=borrow_data.book_id,
+        borrow_date=now,
         due_date=due_date,
-        status=BorrowStatus.BORROWED
+        return_date=None,
+        status=BorrowStatus.BORROWED,
+        renew_count=0,
+        fine_amount=0,
+        notes=None
     )
 
-    # 减少可用副本
-    book.available_copies -= 1
+    # 原子扣减可用副本：条件和扣减在同一条 UPDATE 中完成，并发借阅不会把库存扣成负数
+    result = await db.execute(
+        update(Book)
+        .where(Book.id == borrow_data.book_id, Book.available_copies > 0)
+        .values(available_copies=Book.available_copies - 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="该图书暂无可用副本")
 
-    # 保存到数据库
+    # 保存到数据库（部分唯一索引拒绝并发的重复借阅，回滚时扣减一并撤销）
     db.add(borrow_record)
-    db.commit()
-    db.refresh(borrow_record)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="您已借阅该图书，请勿重复借阅")
+
+    # 可用数量变化，使图书缓存失效
+    await invalidate_book(borrow_data.book_id)
     
     return borrow_record
 
 
+@router.post("/borrow/batch", response_model=BorrowBatchResponse)
+async def borrow_books_batch(
+    batch: BorrowBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    批量借阅图书（借阅台一次为同一位读者借出多本图书）
+    
+    所有图书在一个事务中处理：一次查询完成全部资格检查，一条带条件的 UPDATE 扣减全部库存，
+    借阅记录批量插入；单本图书不满足条件时只在该项返回错误，不影响其他图书
+    
+    请求体：
+        book_ids: 图书 ID 列表（1-100 个）
+        days: 借阅天数
+        user_id: 借阅读者 ID（可选，默认为当前用户；为他人借阅需要管理员/图书管理员权限）
+    
+    返回：
+        BorrowBatchResponse: 与 book_ids 顺序一致的逐项结果
+        （失败项的 status_code 与单本借阅接口相同：404 图书不存在，400 无可用副本/已借阅/重复）
+    
+    异常：
+        HTTPException(403): 无权为其他用户借阅
+        HTTPException(404): 借阅读者不存在或已停用
+        HTTPException(400): 读者有逾期未还的图书 / 并发的重复借阅（整批回滚）
+    """
+    # 借阅读者：默认为当前用户
+    user_id = current_user.id
+    if batch.user_id is not None and batch.user_id != current_user.id:
+        if current_user.role.value not in ["admin", "librarian"]:
+            raise HTTPException(status_code=403, detail="无权为其他用户借阅")
+        borrower = await db.get(User, batch.user_id)
+        if borrower is None or not borrower.is_active:
+            raise HTTPException(status_code=404, detail="用户不存在或已停用")
+        user_id = borrower.id
+
+    # 借阅读者有逾期未还的图书时整批拒绝（在逐项检查之前，与批次中的图书是否存在无关）
+    now = datetime.now()
+    if await db.scalar(overdue_check_query(user_id, now)):
+        detail = "您有逾期未还的图书，请先归还" if user_id == current_user.id else "该读者有逾期未还的图书，请先归还"
+        raise HTTPException(status_code=400, detail=detail)
+
+    # 一次查询完成全部图书的借阅资格检查
+    result = await db.execute(batch_borrow_eligibility_query(user_id, batch.book_ids, now))
+    eligibility = {row.id: row for row in result.all()}
+
+    # 逐项检查，errors 记录失败项的 (状态码, 原因)
+    errors = {}
+    candidates = []
+    for index, book_id in enumerate(batch.book_ids):
+        row = eligibility.get(book_id)
+        if book_id in batch.book_ids[:index]:
+            errors[index] = (400, "同一批次中重复的图书")
+        elif row is None:
+            errors[index] = (404, "图书不存在")
+        elif row.available_copies <= 0:
+            errors[index] = (400, "该图书暂无可用副本")
+        elif row.already_borrowed:
+            errors[index] = (400, "您已借阅该图书，请勿重复借阅")
+        else:
+            candidates.append(book_id)
+
+    # 一条带条件的 UPDATE 原子扣减全部库存，RETURNING 返回扣减成功的图书（并发借走最后一本的图书不在其中）
+    reserved = set()
+    if candidates:
+        result = await db.execute(
+            update(Book)
+            .where(Book.id.in_(candidates), Book.available_copies > 0)
+            .values(available_copies=Book.available_copies - 1)
+            .returning(Book.id)
+            .execution_options(synchronize_session=False)
+        )
+        reserved = set(result.scalars().all())
+
+    # 一条多行 INSERT 写入全部借阅记录；同一批次中图书不重复，按 book_id 对应 RETURNING 的行
+    records = {}
+    if reserved:
+        due_date = now + timedelta(days=batch.days)
+        result = await db.execute(
+            insert(BorrowRecord)
+            .values([
+                {
+                    "user_id": user_id,
+                    "book_id": book_id,
+                    "borrow_date": now,
+                    "due_date": due_date,
+                    "status": BorrowStatus.BORROWED,
+                    "renew_count": 0,
+                    "fine_amount": 0,
+                }
+                for book_id in candidates if book_id in reserved
+            ])
+            .returning(*BorrowRecord.__table__.columns)
+        )
+        records = {row.book_id: row for row in result.all()}
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 部分唯一索引拒绝了并发的重复借阅，整批回滚（库存扣减一并撤销）
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="您已借阅该图书，请勿重复借阅")
+
+    # 可用数量变化，使图书缓存失效
+    if reserved:
+        await invalidate_books(reserved)
+
+    results = []
+    for index, book_id in enumerate(batch.book_ids):
+        if index in errors:
+            code, error = errors[index]
+            results.append(BorrowBatchItem(id=book_id, success=False, status_code=code, error=error))
+        elif book_id in records:
+            results.append(BorrowBatchItem(
+                id=book_id, success=True, status_code=201,
+                record=BorrowRecordResponse.model_validate(records[book_id])
+            ))
+        else:
+            results.append(BorrowBatchItem(id=book_id, success=False, status_code=400, error="该图书暂无可用副本"))
+    return _batch_response(results)
+
+
 @router.post("/return", response_model=BorrowRecordResponse)
-def return_book(
+async def return_book(
     return_data: BorrowReturn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -170,7 +403,7 @@ def return_book(
         HTTPException(400): 图书已归还
     """
     # 查询借阅记录
-    record = db.query(BorrowRecord).filter(BorrowRecord.id == return_data.record_id).first()
+    record = await db.get(BorrowRecord, return_data.record_id)
     if not record:
         raise HTTPException(status_code=404, detail="借阅记录不存在")
 
@@ -182,29 +415,140 @@ def return_book(
     if record.status not in [BorrowStatus.BORROWED, BorrowStatus.RENEWED, BorrowStatus.OVERDUE]:
         raise HTTPException(status_code=400, detail="该图书已归还")
 
-    # 更新借阅记录
-    record.return_date = datetime.now()
-    record.status = BorrowStatus.RETURNED
-    record.notes = return_data.notes
-
-    # 计算罚款
-    record.fine_amount = calculate_fine(record)
+    # 更新借阅记录：只有仍处于未归还状态时才更新，并发的重复归还只有一个成功
+    result = await db.execute(
+        update(BorrowRecord)
+        .where(BorrowRecord.id == record.id, BorrowRecord.status.in_(FINE_STATUSES))
+        .values(
+            return_date=datetime.now(),
+            status=BorrowStatus.RETURNED,
+            notes=return_data.notes,
+            fine_amount=calculate_fine(record),  # 计算罚款
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="该图书已归还")
 
-    # 增加可用副本
-    book = db.query(Book).filter(Book.id == record.book_id).first()
-    book.available_copies += 1
+    # 原子增加可用副本
+    await db.execute(
+        update(Book)
+        .where(Book.id == record.book_id)
+        .values(available_copies=Book.available_copies + 1)
+        .execution_options(synchronize_session=False)
+    )
 
     # 提交事务
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
+
+    # 可用数量变化，使图书缓存失效
+    await invalidate_book(record.book_id)
     
     return record
 
 
+@router.post("/return/batch", response_model=BorrowBatchResponse)
+async def return_books_batch(
+    batch: BorrowBatchReturn,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    批量归还图书（借阅台一次归还一车图书）
+    
+    所有记录在一个事务中处理：一次查询取出全部记录，一条带条件的 UPDATE 标记归还并计算罚款，
+    一条 UPDATE 按图书汇总增加库存（同一本书归还多册时一次加上）；
+    单条记录不满足条件时只在该项返回错误，不影响其他记录
+    
+    请求体：
+        record_ids: 借阅记录 ID 列表（1-100 个）
+        notes: 备注（可选，写入每一条归还的记录）
+    
+    返回：
+        BorrowBatchResponse: 与 record_ids 顺序一致的逐项结果
+        （失败项的 status_code 与单条归还接口相同：404 记录不存在，403 无权操作，400 已归还/重复）
+    """
+    # 一次查询取出全部记录的归属和状态
+    result = await db.execute(
+        select(BorrowRecord.id, BorrowRecord.user_id, BorrowRecord.status)
+        .where(BorrowRecord.id.in_(batch.record_ids))
+    )
+    found = {row.id: row for row in result.all()}
+    is_staff = current_user.role.value in ["admin", "librarian"]
+
+    # 逐项检查，errors 记录失败项的 (状态码, 原因)
+    errors = {}
+    candidates = []
+    for index, record_id in enumerate(batch.record_ids):
+        row = found.get(record_id)
+        if record_id in batch.record_ids[:index]:
+            errors[index] = (400, "同一批次中重复的借阅记录")
+        elif row is None:
+            errors[index] = (404, "借阅记录不存在")
+        elif row.user_id != current_user.id and not is_staff:
+            errors[index] = (403, "无权操作此借阅记录")
+        elif row.status not in FINE_STATUSES:
+            errors[index] = (400, "该图书已归还")
+        else:
+            candidates.append(record_id)
+
+    returned = {}
+    if candidates:
+        # 一条 UPDATE 归还全部记录：只更新仍处于未归还状态的记录（并发的重复归还不会再次生效），
+        # 罚款由 SQL 表达式按每条记录的应还日期计算
+        now = datetime.now()
+        result = await db.execute(
+            update(BorrowRecord)
+            .where(BorrowRecord.id.in_(candidates), BorrowRecord.status.in_(FINE_STATUSES))
+            .values(
+                return_date=now,
+                status=BorrowStatus.RETURNED,
+                notes=batch.notes,
+                fine_amount=fine_expression(now),
+            )
+            .returning(*BorrowRecord.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        returned = {row.id: row for row in result.all()}
+
+    # 按图书汇总归还数量，一条 UPDATE 增加全部库存
+    increments = Counter(row.book_id for row in returned.values())
+    if increments:
+        await db.execute(
+            update(Book)
+            .where(Book.id.in_(increments))
+            .values(available_copies=Book.available_copies + case(increments, value=Book.id))
+            .execution_options(synchronize_session=False)
+        )
+
+    # 提交事务
+    await db.commit()
+
+    # 可用数量变化，使图书缓存失效
+    if increments:
+        await invalidate_books(increments)
+
+    results = []
+    for index, record_id in enumerate(batch.record_ids):
+        if index in errors:
+            code, error = errors[index]
+            results.append(BorrowBatchItem(id=record_id, success=False, status_code=code, error=error))
+        elif record_id in returned:
+            results.append(BorrowBatchItem(
+                id=record_id, success=True, status_code=200,
+                record=BorrowRecordResponse.model_validate(returned[record_id])
+            ))
+        else:
+            results.append(BorrowBatchItem(id=record_id, success=False, status_code=400, error="该图书已归还"))
+    return _batch_response(results)
+
+
 @router.post("/renew", response_model=BorrowRecordResponse)
-def renew_book(
+async def renew_book(
     renew_data: BorrowRenew,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -223,7 +567,7 @@ def renew_book(
         HTTPException(400): 无法续借/已逾期/达到最大续借次数
     """
     # 查询借阅记录
-    record = db.query(BorrowRecord).filter(BorrowRecord.id == renew_data.record_id).first()
+    record = await db.get(BorrowRecord, renew_data.record_id)
     if not record:
         raise HTTPException(status_code=404, detail="借阅记录不存在")
 
@@ -249,16 +593,16 @@ def renew_book(
     record.status = BorrowStatus.RENEWED
 
     # 提交事务
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
     
     return record
 
 
 @router.get("/my-borrows", response_model=List[BorrowRecordDetail])
-def get_my_borrows(
+async def get_my_borrows(
     status: Optional[BorrowStatus] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -270,57 +614,52 @@ def get_my_borrows(
     返回：
         List[BorrowRecordDetail]: 借阅记录列表（含图书和用户信息）
     """
-    # 查询当前用户的借阅记录
-    query = db.query(BorrowRecord).filter(BorrowRecord.user_id == current_user.id)
+    # 单条 JOIN 查询获取借阅记录及图书信息（避免逐条查询图书的 N+1 问题）
+    query = borrow_detail_query(datetime.now(), with_user=False).where(
+        BorrowRecord.user_id == current_user.id
+    )
 
     if status:
-        query = query.filter(BorrowRecord.status == status)
+        query = query.where(BorrowRecord.status == status)
 
     # 按借阅日期倒序排列
-    records = query.order_by(BorrowRecord.borrow_date.desc()).all()
-
-    # 补充图书和用户信息
-    result = []
-    for record in records:
-        book = db.query(Book).filter(Book.id == record.book_id).first()
-        detail = BorrowRecordDetail(
-            id=record.id,
-            user_id=record.user_id,
-            book_id=record.book_id,
-            borrow_date=record.borrow_date,
-            due_date=record.due_date,
-            return_date=record.return_date,
-            status=record.status,
-            renew_count=record.renew_count,
-            fine_amount=calculate_fine(record),
-            notes=record.notes,
-            book_title=book.title if book else None,
-            book_author=book.author if book else None,
+    result = await db.execute(query.order_by(BorrowRecord.borrow_date.desc()))
+    rows = result.all()
+
+    # 补充用户信息（即当前用户）
+    return [
+        BorrowRecordDetail(
+            **row._asdict(),
             user_name=current_user.username,
             user_email=current_user.email
         )
-        result.append(detail)
-
-    return result
+        for row in rows
+    ]
 
 
 @router.get("/all", response_model=List[BorrowRecordDetail])
-def get_all_borrows(
+async def get_all_borrows(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（取自上一页响应头 X-Next-Cursor）"),
     status: Optional[BorrowStatus] = None,
     user_id: Optional[int] = None,
     book_id: Optional[int] = None,
     overdue_only: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
     获取所有借阅记录（管理员/图书管理员权限）
     
+    按借阅日期倒序（借阅日期相同时按 id 倒序）；传入 cursor 时使用游标分页（忽略 skip），
+    下一页游标通过响应头 X-Next-Cursor 返回
+    
     查询参数：
         skip: 跳过条数（默认 0）
         limit: 每页条数（默认 10，范围 1-100）
+        cursor: 分页游标（可选）
         status: 按状态筛选（可选）
         user_id: 按用户 ID 筛选（可选）
         book_id: 按图书 ID 筛选（可选）
@@ -330,60 +669,70 @@ def get_all_borrows(
         List[BorrowRecordDetail]: 借阅记录列表
     
     异常：
+        HTTPException(400): 分页游标无效
         HTTPException(403): 权限不足
     """
-    # 构建查询对象
-    query = db.query(BorrowRecord)
+    # 构建查询对象（单条 JOIN 查询同时获取图书和用户信息，逾期状态和罚款在 SQL 中计算）
+    now = datetime.now()
+    query = filter_borrow_list(
+        borrow_detail_query(now, resolve_overdue=True), now, status, user_id, book_id, overdue_only
+    )
 
-    # 按状态筛选
-    if status:
-        query = query.filter(BorrowRecord.status == status)
+    # 按 (borrow_date, id) 倒序分页，由 idx_borrow_date_id 索引直接定位
+    result = await db.execute(
+        paginate(query, [BorrowRecord.borrow_date, BorrowRecord.id], limit,
+                 cursor=cursor, skip=skip, descending=True)
+    )
+    rows, next_cursor = split_page(result.all(), ["borrow_date", "id"], limit)
+    set_next_cursor(response, next_cursor)
+
+    return [BorrowRecordDetail(**row._asdict()) for row in rows]
+
+
+@router.get("/export")
+async def export_borrows(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="导出格式"),
+    status: Optional[BorrowStatus] = None,
+    user_id: Optional[int] = None,
+    book_id: Optional[int] = None,
+    overdue_only: bool = False,
+    current_user: User = Depends(require_role("admin", "librarian"))
+):
+    """
+    导出借阅记录（管理员/图书管理员权限）
     
-    # 按用户 ID 筛选
-    if user_id:
-        query = query.filter(BorrowRecord.user_id == user_id)
+    字段、筛选条件和排序（借阅日期倒序）与借阅记录列表相同；结果通过服务端游标分批读取并流式发送，
+    导出任意数量的记录内存占用都不变
     
-    # 按图书 ID 筛选
-    if book_id:
-        query = query.filter(BorrowRecord.book_id == book_id)
-
-    # SQLAlchemy 要求必须先排序（order_by()），再分页（offset()/limit()）
-    records = query.order_by(BorrowRecord.borrow_date.desc()).offset(skip).limit(limit).all()
-
-    # 构建返回结果
-    result = []
-    for record in records:
-        book = db.query(Book).filter(Book.id == record.book_id).first()
-        user = db.query(User).filter(User.id == record.user_id).first()
-
-        # 如果只显示逾期记录，跳过非逾期的
-        if overdue_only and not check_overdue(record):
-            continue
-
-        detail = BorrowRecordDetail(
-            id=record.id,
-            user_id=record.user_id,
-            book_id=record.book_id,
-            borrow_date=record.borrow_date,
-            due_date=record.due_date,
-            return_date=record.return_date,
-            status=BorrowStatus.OVERDUE if check_overdue(record) else record.status,
-            renew_count=record.renew_count,
-            fine_amount=calculate_fine(record),
-            notes=record.notes,
-            book_title=book.title if book else None,
-            book_author=book.author if book else None,
-            user_name=user.username if user else None,
-            user_email=user.email if user else None
-        )
-        result.append(detail)
+    查询参数：
+        format: csv（默认）/ ndjson / parquet
+        status: 按状态筛选（可选）
+        user_id: 按用户 ID 筛选（可选）
+        book_id: 按图书 ID 筛选（可选）
+        overdue_only: 是否只导出逾期记录（默认 False）
+    
+    返回：
+        StreamingResponse: 文件下载（borrows-YYYYMMDD.<format>）
+    
+    异常：
+        HTTPException(403): 权限不足
+        HTTPException(501): 导出 Parquet 但服务端未安装 pyarrow
+    """
+    try:
+        check_export_format(format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
 
-    return result
+    now = datetime.now()
+    query = filter_borrow_list(
+        borrow_detail_query(now, resolve_overdue=True), now, status, user_id, book_id, overdue_only
+    ).order_by(BorrowRecord.borrow_date.desc(), BorrowRecord.id.desc())
+    return export_response(query, format, f"borrows-{now:%Y%m%d}")
 
 
 @router.get("/statistics", response_model=BorrowStatistics)
-def get_borrow_statistics(
-    db: Session = Depends(get_db),
+async def get_borrow_statistics(
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
@@ -395,58 +744,58 @@ def get_borrow_statistics(
     异常：
         HTTPException(403): 权限不足
     """
-    # 总借阅记录数
-    total = db.query(BorrowRecord).count()
-    
-    # 活跃借阅数（借阅中或续借状态）
-    active = db.query(BorrowRecord).filter(
-        BorrowRecord.status.in_([BorrowStatus.BORROWED, BorrowStatus.RENEWED])
-    ).count()
-
-    # 计算逾期数量
-    all_active = db.query(BorrowRecord).filter(
-        BorrowRecord.status.in_([BorrowStatus.BORROWED, BorrowStatus.RENEWED])
-    ).all()
-    overdue_count = sum(1 for r in all_active if check_overdue(r))
-
-    # 计算总罚款
-    total_fines = sum(calculate_fine(r) for r in db.query(BorrowRecord).all())
-
-    return BorrowStatistics(
-        total_borrows=total,
-        active_borrows=active,
-        overdue_count=overdue_count,
-        total_fines=total_fines
+    now = datetime.now()
+
+    # 单条聚合查询：
+    # - 总借阅数读取触发器维护的计数，不扫描历史记录
+    # - 其余指标只聚合未归还的记录（借阅中/续借/逾期），由 (status, due_date) 索引定位
+    # - 活跃借阅数只统计借阅中和续借的记录（不含已标记逾期的记录）
+    result = await db.execute(
+        select(
+            total_borrows_expression().label("total_borrows"),
+            func.coalesce(
+                func.sum(case((BorrowRecord.status.in_(ACTIVE_STATUSES), 1), else_=0)), 0
+            ).label("active_borrows"),
+            func.coalesce(func.sum(case((overdue_condition(now), 1), else_=0)), 0).label("overdue_count"),
+            func.coalesce(func.sum(fine_expression(now)), 0).label("total_fines")
+        ).where(BorrowRecord.status.in_(FINE_STATUSES))
     )
+    stats = result.one()
+
+    return BorrowStatistics(**stats._asdict())
 
 
 @router.post("/check-overdue")
-def check_all_overdue(
-    db: Session = Depends(get_db),
+async def check_all_overdue(
+    batch_size: int = Query(OVERDUE_BATCH_SIZE, ge=1, le=50000),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
     检查所有借阅记录，标记逾期状态（管理员/图书管理员权限）
     
+    使用分批的集合式 UPDATE 完成，每批提交一次，批次之间释放数据库写锁，
+    处理进度输出到日志
+    
+    查询参数：
+        batch_size: 每批更新的记录数（默认 1000）
+    
     返回：
-        {"message": "已更新 X 条逾期记录"}
+        {"message": "已更新 X 条逾期记录", "updated": X, "batches": N}
     
     异常：
         HTTPException(403): 权限不足
     """
-    # 查询所有活跃的借阅记录
-    active_records = db.query(BorrowRecord).filter(
-        BorrowRecord.status.in_([BorrowStatus.BORROWED, BorrowStatus.RENEWED])
-    ).all()
-
-    # 检查并更新逾期状态
-    updated_count = 0
-    for record in active_records:
-        if check_overdue(record):
-            record.status = BorrowStatus.OVERDUE
-            updated_count += 1
+    batches = 0
 
-    # 提交事务
-    db.commit()
+    def on_progress(batch_no: int, updated: int):
+        nonlocal batches
+        batches = batch_no
+
+    updated_count = await mark_overdue_records(db, datetime.now(), batch_size=batch_size, progress=on_progress)
     
-    return {"message": f"已更新 {updated_count} 条逾期记录"}
+    return {
+        "message": f"已更新 {updated_count} 条逾期记录",
+        "updated": updated_count,
+        "batches": batches
+    }
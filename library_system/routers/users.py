@@ -11,27 +11,31 @@
 技术要点：
 - 支持按角色和活跃状态筛选
 - 删除采用软删除（标记 is_active=False）
+- 修改或删除用户后使该用户的认证缓存失效
+- 用户列表支持游标分页（cursor），下一页游标通过响应头 X-Next-Cursor 返回
 """
 
 # 导入标准库
 from typing import List, Optional
 
 # 导入 FastAPI 组件
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # 导入项目模块
-from database import get_db
+from database import get_db, get_read_db
 from models.user import User, UserRole
 from schemas.user import UserCreate, UserUpdate, UserResponse
-from utils.auth import get_current_active_user, require_role, get_password_hash
+from utils.auth import get_current_active_user, require_role, get_password_hash, invalidate_user
+from utils.pagination import paginate, split_page, set_next_cursor
 
 # 创建 APIRouter 实例
 router = APIRouter(prefix="/users", tags=["用户管理"])
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """
     获取当前登录用户信息
     
@@ -44,20 +48,26 @@ def get_current_user_info(current_user: User = Depends(get_current_active_user))
 
 
 @router.get("", response_model=List[UserResponse])
-def list_users(
+async def list_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（取自上一页响应头 X-Next-Cursor）"),
     role: Optional[UserRole] = None,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
     获取用户列表（管理员/图书管理员权限）
     
+    按用户 ID 排序；传入 cursor 时使用游标分页（忽略 skip），
+    下一页游标通过响应头 X-Next-Cursor 返回
+    
     查询参数：
         skip: 跳过条数（默认 0）
         limit: 每页条数（默认 10，范围 1-100）
+        cursor: 分页游标（可选）
         role: 按角色筛选（可选）
         is_active: 按活跃状态筛选（可选）
     
@@ -65,28 +75,31 @@ def list_users(
         List[UserResponse]: 用户列表
     
     异常：
+        HTTPException(400): 分页游标无效
         HTTPException(403): 权限不足
     """
     # 构建查询对象
-    query = db.query(User)
+    query = select(User)
     
     # 按角色筛选
     if role:
-        query = query.filter(User.role == role)
+        query = query.where(User.role == role)
     
     # 按活跃状态筛选
     if is_active is not None:
-        query = query.filter(User.is_active == is_active)
+        query = query.where(User.is_active == is_active)
 
-    # 分页查询
-    users = query.offset(skip).limit(limit).all()
+    # 分页查询（按 id 排序）
+    result = await db.execute(paginate(query, [User.id], limit, cursor=cursor, skip=skip))
+    users, next_cursor = split_page(result.scalars().all(), ["id"], limit)
+    set_next_cursor(response, next_cursor)
     return users
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role("admin", "librarian"))
 ):
     """
@@ -102,17 +115,17 @@ def get_user(
         HTTPException(404): 用户不存在
         HTTPException(403): 权限不足
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     return user
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("admin"))
 ):
     """
@@ -131,7 +144,7 @@ def update_user(
         HTTPException(404): 用户不存在
         HTTPException(403): 权限不足
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
 
@@ -143,16 +156,19 @@ def update_user(
         setattr(user, field, value)
 
     # 提交事务
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+
+    # 角色、状态等可能已变化，使认证缓存失效
+    await invalidate_user(user.username)
     
     return user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("admin"))
 ):
     """
@@ -170,12 +186,15 @@ def delete_user(
         HTTPException(404): 用户不存在
         HTTPException(403): 权限不足
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
 
     # 软删除：将用户标记为不活跃
     user.is_active = False
-    db.commit()
+    await db.commit()
+
+    # 使认证缓存失效，已签发的令牌立即不可用
+    await invalidate_user(user.username)
     
     return None
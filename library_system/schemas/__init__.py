@@ -1,3 +1,6 @@
 from .user import UserCreate, UserUpdate, UserResponse, Token, TokenData
 from .book import BookCreate, BookUpdate, BookResponse, BookSearch
-from .borrow import BorrowCreate, BorrowReturn, BorrowRenew, BorrowRecordResponse, BorrowRecordDetail, BorrowStatistics
+from .borrow import (
+    BorrowCreate, BorrowReturn, BorrowRenew, BorrowRecordResponse, BorrowRecordDetail, BorrowStatistics,
+    BorrowBatchCreate, BorrowBatchReturn, BorrowBatchItem, BorrowBatchResponse
+)
@@ -12,13 +12,17 @@
 - 使用 Pydantic 进行数据验证和序列化
 - Field 用于定义字段约束和默认值
 - from_attributes = True 支持从 ORM 模型自动转换
+- computed_field 根据封面 URL 生成各宽度缩略图的 URL
 """
 
 # 导入 Pydantic 组件
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, computed_field
+from typing import Dict, Optional
 from datetime import datetime
 
+# 导入项目模块
+from utils.images import rendition_urls
+
 
 class BookBase(BaseModel):
     """
@@ -87,6 +91,12 @@ class BookResponse(BookBase):
     created_at: datetime
     updated_at: datetime
 
+    @computed_field
+    @property
+    def cover_renditions(self) -> Optional[Dict[int, str]]:
+        """各宽度封面缩略图的 URL（{宽度: URL}），列表页应使用小尺寸缩略图"""
+        return rendition_urls(self.cover_image)
+
     class Config:
         from_attributes = True
 
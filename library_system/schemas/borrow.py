@@ -6,9 +6,11 @@
 - BorrowCreate: 借阅请求结构
 - BorrowReturn: 归还请求结构
 - BorrowRenew: 续借请求结构
+- BorrowBatchCreate / BorrowBatchReturn: 批量借阅 / 批量归还请求结构
 - BorrowRecordResponse: 借阅记录响应结构
 - BorrowRecordDetail: 借阅记录详情响应结构（含图书和用户信息）
 - BorrowStatistics: 借阅统计响应结构
+- BorrowBatchResponse: 批量借阅 / 归还的逐项结果
 
 技术要点：
 - 使用 Pydantic 进行数据验证
@@ -17,7 +19,7 @@
 
 # 导入 Pydantic 组件
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timedelta
 
 # 导入枚举类型
@@ -76,6 +78,38 @@ class BorrowRenew(BaseModel):
     days: int = Field(default=15, ge=1, le=30)  # 续借天数
 
 
+# 批量借阅 / 归还一次最多处理的数量
+BORROW_BATCH_MAX = 100
+
+
+class BorrowBatchCreate(BaseModel):
+    """
+    批量借阅请求模型
+    
+    借阅台一次为同一位读者借出多本图书
+    
+    字段约束：
+        book_ids: 图书 ID 列表（1-100 个）
+        days: 借阅天数（1-90天，默认30天）
+        user_id: 借阅读者 ID（可选，默认为当前用户；为他人借阅需要管理员/图书管理员权限）
+    """
+    book_ids: List[int] = Field(..., min_length=1, max_length=BORROW_BATCH_MAX)
+    days: int = Field(default=30, ge=1, le=90)
+    user_id: Optional[int] = None
+
+
+class BorrowBatchReturn(BaseModel):
+    """
+    批量归还请求模型
+    
+    字段：
+        record_ids: 借阅记录 ID 列表（1-100 个）
+        notes: 备注（可选，写入每一条归还的记录）
+    """
+    record_ids: List[int] = Field(..., min_length=1, max_length=BORROW_BATCH_MAX)
+    notes: Optional[str] = None
+
+
 class BorrowRecordResponse(BaseModel):
     """
     借阅记录响应模型
@@ -122,11 +156,40 @@ class BorrowStatistics(BaseModel):
     
     字段说明：
         total_borrows: 总借阅次数
-        active_borrows: 当前活跃借阅数
-        overdue_count: 逾期借阅数
+        active_borrows: 借阅中或续借的借阅数（不含已标记为逾期的记录）
+        overdue_count: 逾期借阅数（含已标记为逾期的记录）
         total_fines: 总罚款金额（单位：分）
     """
     total_borrows: int
     active_borrows: int
     overdue_count: int
     total_fines: int
+
+
+class BorrowBatchItem(BaseModel):
+    """
+    批量操作中单项的结果
+    
+    字段说明：
+        id: 请求中的图书 ID（借阅）或借阅记录 ID（归还）
+        success: 是否成功
+        status_code: 与单项接口相同的状态码（成功为 201 / 200）
+        error: 失败原因
+        record: 成功时的借阅记录
+    """
+    id: int
+    success: bool
+    status_code: int
+    error: Optional[str] = None
+    record: Optional[BorrowRecordResponse] = None
+
+
+class BorrowBatchResponse(BaseModel):
+    """
+    批量借阅 / 归还响应模型
+    
+    results 与请求中的 ID 顺序一一对应
+    """
+    succeeded: int
+    failed: int
+    results: List[BorrowBatchItem]
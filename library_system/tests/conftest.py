@@ -0,0 +1,119 @@
+"""
+测试公共配置
+
+默认每次测试会话使用临时目录中的全新 SQLite 数据库；设置 TEST_DATABASE_URL 时使用该数据库
+（如 PostgreSQL，需为可随意写入的测试库）。环境变量必须在导入应用模块之前设置
+（database.py 在导入时读取配置并创建引擎）。应用通过 TestClient 启动，与服务启动流程相同
+（执行迁移、创建默认账号）
+
+运行：
+    pip install -r requirements-dev.txt
+    python -m pytest tests
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/library python -m pytest tests
+"""
+
+# 导入标准库
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+# 测试数据库（在导入应用模块之前配置）
+if os.getenv("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+else:
+    _DATA_DIR = tempfile.mkdtemp(prefix="library-tests-")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_DATA_DIR, 'library.db')}"
+os.environ["OVERDUE_SCHEDULER_ENABLED"] = "false"
+os.environ["COVER_SWEEP_INTERVAL"] = "0"
+# 封面写入临时目录，不影响 uploads/covers
+os.environ["COVER_STORAGE"] = "local"
+os.environ["COVER_STORAGE_DIR"] = tempfile.mkdtemp(prefix="library-covers-")
+
+# 项目模块使用扁平导入（与 main.py 同级）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入第三方库
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+# 导入项目模块
+import database
+import main
+
+
+@pytest.fixture(scope="session")
+def client():
+    """启动应用的测试客户端（整个测试会话共用）"""
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def unique():
+    """本次测试会话的唯一后缀（测试库可重复使用时避免 ISBN、用户名冲突）"""
+    return uuid.uuid4().hex[:8]
+
+
+@pytest.fixture(scope="session")
+def run_db(client):
+    """
+    在应用的事件循环中使用应用的数据库会话执行操作并提交（用于批量准备数据和检查结果）
+
+    使用方式：
+        book_id = run_db(lambda db: create_book(db, ...))  # create_book 为 async 函数
+    """
+    async def _run(callback):
+        async with database.SessionLocal() as db:
+            result = await callback(db)
+            await db.commit()
+            return result
+
+    def run(callback):
+        return client.portal.call(_run, callback)
+    return run
+
+
+@pytest.fixture(scope="session")
+def login(client):
+    """
+    登录并返回认证请求头
+
+    使用方式：
+        headers = login("admin", "admin123")
+    """
+    def _login(username: str, password: str) -> dict:
+        response = client.post("/api/v1/auth/login", data={"username": username, "password": password})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return _login
+
+
+@pytest.fixture
+def count_statements():
+    """
+    记录应用执行的 SQL 语句（读写引擎和只读引擎）
+
+    使用方式：
+        with count_statements() as statements:
+            client.get(...)
+        assert len(statements) <= 2
+    """
+    @contextmanager
+    def _count():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = {database.engine.sync_engine, database.read_engine.sync_engine}
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", record)
+    return _count
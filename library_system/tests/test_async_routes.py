@@ -0,0 +1,61 @@
+"""
+异步数据访问测试
+
+library_system 的路由和依赖全部为协程，数据库访问通过 AsyncSession 完成：
+同步的路由函数会被放入线程池执行，重新引入线程池和连接池互相等待的问题
+"""
+
+# 导入标准库
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+# 导入第三方库
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 导入项目模块
+import database
+import main
+
+
+def _dependencies(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency
+        yield from _dependencies(dependency)
+
+
+def test_routes_and_dependencies_are_coroutines():
+    sync = []
+    for route in main.app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        if not inspect.iscoroutinefunction(route.endpoint):
+            sync.append(f"{route.path}: {route.endpoint.__name__}")
+        for dependency in _dependencies(route.dependant):
+            call = dependency.call
+            if not (inspect.iscoroutinefunction(call) or inspect.isasyncgenfunction(call)
+                    or inspect.iscoroutinefunction(getattr(call, "__call__", None))
+                    or call.__module__.startswith("fastapi.")):
+                sync.append(f"{route.path}: 依赖 {getattr(call, '__name__', call)}")
+    assert not sync, "\n".join(sync)
+
+
+def test_session_dependencies_yield_async_sessions(client):
+    async def sessions():
+        types = []
+        for dependency in (database.get_db, database.get_read_db):
+            async for db in dependency():
+                types.append(type(db))
+        return types
+
+    assert client.portal.call(sessions) == [AsyncSession, AsyncSession]
+
+
+def test_concurrent_mixed_requests_complete(client, login):
+    headers = login("admin", "admin123")
+    paths = ["/api/v1/books", "/api/v1/borrows/my-borrows", "/api/v1/users/me", "/api/v1/borrows/statistics"] * 25
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        codes = list(executor.map(lambda path: client.get(path, headers=headers).status_code, paths))
+
+    assert codes == [200] * len(paths)
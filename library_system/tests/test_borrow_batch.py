@@ -0,0 +1,147 @@
+"""
+批量借阅 / 归还测试
+
+- 单项失败只在该项返回错误（状态码与单项接口相同），其余项照常提交
+- 借阅读者有逾期未还的图书时整批拒绝，与批次中的图书是否存在无关；错误信息针对借阅读者
+"""
+
+# 导入标准库
+from datetime import datetime, timedelta
+
+# 导入第三方库
+from sqlalchemy import insert, select
+
+# 导入项目模块
+from models.book import Book
+from models.borrow import BorrowRecord, BorrowStatus
+from models.user import User, UserRole
+from utils.passwords import get_password_hash
+
+MISSING_ID = 2_000_000_000
+
+
+async def _create_user(db, username: str, password: str = None) -> int:
+    now = datetime.now()
+    hashed_password = await get_password_hash(password) if password else "-"
+    return (await db.execute(insert(User).returning(User.id), {
+        "username": username, "email": f"{username}@example.com", "hashed_password": hashed_password,
+        "role": UserRole.READER, "is_active": True, "created_at": now, "updated_at": now,
+    })).scalar_one()
+
+
+async def _create_books(db, prefix: str, copies) -> list:
+    now = datetime.now()
+    return list((await db.execute(insert(Book).returning(Book.id), [
+        {
+            "isbn": f"{prefix}-{index}", "title": f"批量测试 {prefix} {index}", "author": "测试",
+            "total_copies": max(count, 1), "available_copies": count, "created_at": now, "updated_at": now,
+        }
+        for index, count in enumerate(copies)
+    ])).scalars().all())
+
+
+async def _create_record(db, user_id: int, book_id: int, status: BorrowStatus, due_in: timedelta) -> int:
+    now = datetime.now()
+    return (await db.execute(insert(BorrowRecord).returning(BorrowRecord.id), {
+        "user_id": user_id, "book_id": book_id, "status": status,
+        "borrow_date": now + due_in - timedelta(days=30), "due_date": now + due_in,
+        "return_date": now if status == BorrowStatus.RETURNED else None,
+        "renew_count": 0, "fine_amount": 0,
+    })).scalar_one()
+
+
+def _available(run_db, book_ids) -> list:
+    async def load(db):
+        rows = (await db.execute(select(Book.id, Book.available_copies).where(Book.id.in_(book_ids)))).all()
+        return dict(rows)
+    available = run_db(load)
+    return [available[book_id] for book_id in book_ids]
+
+
+def _codes(body: dict) -> list:
+    return [item["status_code"] for item in body["results"]]
+
+
+def test_borrow_batch_partial_failure(client, login, run_db, unique):
+    admin = login("admin", "admin123")
+
+    async def seed(db):
+        user_id = await _create_user(db, f"batch_borrow_{unique}")
+        available, empty, borrowed = await _create_books(db, f"974-{unique}", [2, 0, 2])
+        await _create_record(db, user_id, borrowed, BorrowStatus.BORROWED, timedelta(days=10))
+        return user_id, available, empty, borrowed
+    user_id, available, empty, borrowed = run_db(seed)
+
+    response = client.post("/api/v1/borrows/borrow/batch", headers=admin, json={
+        "user_id": user_id, "book_ids": [available, empty, MISSING_ID, available, borrowed],
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert _codes(body) == [201, 400, 404, 400, 400]
+    assert (body["succeeded"], body["failed"]) == (1, 4)
+    assert [item["id"] for item in body["results"]] == [available, empty, MISSING_ID, available, borrowed]
+    assert body["results"][0]["record"]["user_id"] == user_id
+    assert all(item["error"] for item in body["results"][1:])
+    # 只有成功项扣减库存
+    assert _available(run_db, [available, empty, borrowed]) == [1, 0, 2]
+
+
+def test_return_batch_partial_failure(client, login, run_db, unique):
+    admin = login("admin", "admin123")
+
+    async def seed(db):
+        user_id = await _create_user(db, f"batch_return_{unique}")
+        first, second = await _create_books(db, f"973-{unique}", [0, 0])
+        active = await _create_record(db, user_id, first, BorrowStatus.BORROWED, timedelta(days=10))
+        overdue = await _create_record(db, user_id, second, BorrowStatus.OVERDUE, timedelta(days=-3))
+        returned = await _create_record(db, user_id, second, BorrowStatus.RETURNED, timedelta(days=-20))
+        return first, second, active, overdue, returned
+    first, second, active, overdue, returned = run_db(seed)
+
+    # 读者不能归还他人的借阅记录
+    response = client.post(
+        "/api/v1/borrows/return/batch", headers=login("reader", "reader123"), json={"record_ids": [active]}
+    )
+    assert response.status_code == 200, response.text
+    assert _codes(response.json()) == [403]
+
+    response = client.post("/api/v1/borrows/return/batch", headers=admin, json={
+        "record_ids": [active, returned, MISSING_ID, active, overdue],
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert _codes(body) == [200, 400, 404, 400, 200]
+    assert (body["succeeded"], body["failed"]) == (2, 3)
+    assert body["results"][0]["record"]["status"] == BorrowStatus.RETURNED.value
+    assert body["results"][4]["record"]["fine_amount"] > 0
+    assert _available(run_db, [first, second]) == [1, 1]
+
+
+def test_borrow_batch_rejects_overdue_borrower(client, login, run_db, unique):
+    admin = login("admin", "admin123")
+    password = f"pw-{unique}"
+
+    async def seed(db):
+        other_id = await _create_user(db, f"batch_overdue_{unique}")
+        self_id = await _create_user(db, f"batch_overdue_self_{unique}", password)
+        overdue_book, book = await _create_books(db, f"972-{unique}", [2, 2])
+        await _create_record(db, other_id, overdue_book, BorrowStatus.BORROWED, timedelta(days=-1))
+        await _create_record(db, self_id, overdue_book, BorrowStatus.BORROWED, timedelta(days=-1))
+        return other_id, book
+    other_id, book = run_db(seed)
+
+    # 为他人借阅：批次中的图书都不存在时同样拒绝，错误信息指向借阅读者
+    for book_ids in ([MISSING_ID], [book]):
+        response = client.post(
+            "/api/v1/borrows/borrow/batch", headers=admin, json={"user_id": other_id, "book_ids": book_ids}
+        )
+        assert response.status_code == 400, response.text
+        assert response.json()["detail"] == "该读者有逾期未还的图书，请先归还"
+
+    # 为自己借阅
+    reader = login(f"batch_overdue_self_{unique}", password)
+    response = client.post("/api/v1/borrows/borrow/batch", headers=reader, json={"book_ids": [book]})
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "您有逾期未还的图书，请先归还"
+
+    assert _available(run_db, [book]) == [2]
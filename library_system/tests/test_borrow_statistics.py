@@ -0,0 +1,74 @@
+"""
+借阅统计测试
+
+统计由一条聚合查询完成，各指标的含义与逐条计算时一致：
+- total_borrows: 全部借阅记录数
+- active_borrows: 借阅中或续借的记录数（不含已标记为逾期的记录）
+- overdue_count: 已过应还日期的未归还记录数（含已标记为逾期的记录）
+- total_fines: 未归还记录按逾期天数累计的罚款
+"""
+
+# 导入标准库
+from datetime import datetime, timedelta
+
+# 导入第三方库
+from sqlalchemy import insert
+
+# 导入项目模块
+from models.book import Book
+from models.borrow import BorrowRecord, BorrowStatus
+from models.user import User, UserRole
+from utils.borrow import FINE_PER_DAY
+
+
+def _statistics(client, headers) -> dict:
+    response = client.get("/api/v1/borrows/statistics", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_statistics_aggregate(client, login, run_db, unique, count_statements):
+    admin = login("admin", "admin123")
+    before = _statistics(client, admin)
+    now = datetime.now()
+    # (状态, 距应还日期已过去的时间)：负数表示尚未到期
+    records = [
+        (BorrowStatus.BORROWED, timedelta(days=-5)),
+        (BorrowStatus.RENEWED, timedelta(days=2, hours=1)),
+        (BorrowStatus.OVERDUE, timedelta(days=3, hours=1)),
+        (BorrowStatus.RETURNED, timedelta(days=10)),
+    ]
+
+    async def seed(db):
+        username = f"stats_{unique}"
+        user_id = (await db.execute(insert(User).returning(User.id), {
+            "username": username, "email": f"{username}@example.com", "hashed_password": "-",
+            "role": UserRole.READER, "is_active": True, "created_at": now, "updated_at": now,
+        })).scalar_one()
+        book_ids = (await db.execute(insert(Book).returning(Book.id), [
+            {
+                "isbn": f"975-{unique}-{index}", "title": f"统计测试 {index}", "author": "测试",
+                "total_copies": 1, "available_copies": 1, "created_at": now, "updated_at": now,
+            }
+            for index in range(len(records))
+        ])).scalars().all()
+        await db.execute(insert(BorrowRecord), [
+            {
+                "user_id": user_id, "book_id": book_id, "status": status,
+                "borrow_date": now - elapsed - timedelta(days=30), "due_date": now - elapsed,
+                "return_date": now if status == BorrowStatus.RETURNED else None,
+                "renew_count": 0, "fine_amount": 0,
+            }
+            for book_id, (status, elapsed) in zip(book_ids, records)
+        ])
+    run_db(seed)
+
+    with count_statements() as statements:
+        after = _statistics(client, admin)
+
+    assert after["total_borrows"] - before["total_borrows"] == 4
+    assert after["active_borrows"] - before["active_borrows"] == 2
+    assert after["overdue_count"] - before["overdue_count"] == 2
+    assert after["total_fines"] - before["total_fines"] == (2 + 3) * FINE_PER_DAY
+    # 当前用户 + 统计查询
+    assert len(statements) <= 2, "\n\n".join(statements)
@@ -0,0 +1,108 @@
+"""
+并发借阅压力测试
+
+多个线程同时通过 ASGI 应用借阅同一本图书（TestClient 的请求在同一个事件循环中并发执行）：
+- 库存由带条件的原子 UPDATE 扣减，成功借阅数恰好等于副本数，不会超借
+- 同一用户并发借阅同一图书时由部分唯一索引拒绝，只有一次成功
+
+SQLite 只有一个写连接，借阅请求在写连接上排队执行；
+设置 TEST_DATABASE_URL 指向 PostgreSQL 时请求真正并发，检查与扣减之间的竞争才会出现
+"""
+
+# 导入标准库
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# 导入第三方库
+import pytest
+from sqlalchemy import func, insert, select
+
+# 导入项目模块
+from models.book import Book
+from models.borrow import BorrowRecord, UNRETURNED_STATUSES
+from models.user import User, UserRole
+from utils.auth import create_access_token
+
+# 并发借阅的读者数量和图书副本数
+READERS = 30
+COPIES = 5
+
+
+def _create_book(run_db, isbn: str, copies: int) -> int:
+    now = datetime.now()
+
+    async def create(db):
+        return (await db.execute(insert(Book).returning(Book.id), {
+            "isbn": isbn, "title": f"并发借阅测试 {isbn}", "author": "测试",
+            "total_copies": copies, "available_copies": copies,
+            "created_at": now, "updated_at": now,
+        })).scalar_one()
+    return run_db(create)
+
+
+def _borrow_concurrently(client, book_id: int, tokens: list) -> list:
+    """所有线程就绪后同时发起借阅请求，返回各请求的状态码"""
+    barrier = threading.Barrier(len(tokens))
+
+    def borrow(token: str) -> int:
+        barrier.wait()
+        response = client.post(
+            "/api/v1/borrows/borrow",
+            json={"book_id": book_id, "days": 7},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=len(tokens)) as executor:
+        return list(executor.map(borrow, tokens))
+
+
+def _state(run_db, book_id: int):
+    """(图书可用数量, 未归还的借阅记录数)"""
+    async def state(db):
+        available = (await db.execute(select(Book.available_copies).where(Book.id == book_id))).scalar_one()
+        active = (await db.execute(
+            select(func.count()).select_from(BorrowRecord)
+            .where(BorrowRecord.book_id == book_id, BorrowRecord.status.in_(UNRETURNED_STATUSES))
+        )).scalar_one()
+        return available, active
+    return run_db(state)
+
+
+@pytest.fixture(scope="module")
+def reader_tokens(run_db, unique):
+    """直接创建一批读者账号并签发令牌（不经过 bcrypt 登录）"""
+    now = datetime.now()
+    usernames = [f"stress_{unique}_{index}" for index in range(READERS)]
+
+    async def create(db):
+        await db.execute(insert(User), [
+            {
+                "username": username, "email": f"{username}@example.com", "hashed_password": "-",
+                "role": UserRole.READER, "is_active": True, "created_at": now, "updated_at": now,
+            }
+            for username in usernames
+        ])
+    run_db(create)
+    return [create_access_token(data={"sub": username}) for username in usernames]
+
+
+def test_concurrent_borrows_do_not_oversell(client, run_db, unique, reader_tokens):
+    book_id = _create_book(run_db, f"979-{unique}-001", COPIES)
+
+    codes = _borrow_concurrently(client, book_id, reader_tokens)
+
+    assert codes.count(201) == COPIES, codes
+    assert codes.count(400) == READERS - COPIES, codes
+    assert _state(run_db, book_id) == (0, COPIES)
+
+
+def test_concurrent_duplicate_borrow_succeeds_once(client, run_db, unique, reader_tokens):
+    book_id = _create_book(run_db, f"979-{unique}-002", READERS)
+
+    codes = _borrow_concurrently(client, book_id, [reader_tokens[0]] * 10)
+
+    assert codes.count(201) == 1, codes
+    assert codes.count(400) == 9, codes
+    assert _state(run_db, book_id) == (READERS - 1, 1)
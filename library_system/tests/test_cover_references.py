@@ -0,0 +1,99 @@
+"""
+封面引用与清理测试
+
+封面按内容命名，多本图书和多次上传共用同一个文件：
+- 复用已有封面的上传会刷新宽限期，期间引用该封面的图书被删除也不会删除文件
+- 保存图书时封面文件必须仍然存在
+- 定时清理只删除没有引用且超过宽限期的封面（连同缩略图）
+"""
+
+# 导入标准库
+import hashlib
+import io
+import os
+import time
+
+# 导入第三方库
+import pytest
+
+# 导入项目模块
+from utils.images import COVER_URL_PREFIX, rendition_path, sweep_orphan_covers
+from utils.storage import cover_storage
+
+PIL = pytest.importorskip("PIL.Image")
+
+# 超过宽限期的修改时间
+STALE = time.time() - 7 * 86400
+
+
+def _png(seed: str) -> bytes:
+    """按 seed 生成内容不同的小图片"""
+    image = PIL.new("RGB", (40, 56), tuple(hashlib.sha256(seed.encode()).digest()[:3]))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _upload(client, headers, content: bytes) -> str:
+    response = client.post(
+        "/api/v1/books/upload-cover",
+        files={"file": ("cover.png", content, "image/png")},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["url"]
+
+
+def _create_book(client, headers, isbn: str, cover_image: str):
+    return client.post("/api/v1/books", json={
+        "isbn": isbn, "title": f"封面测试 {isbn}", "author": "测试", "cover_image": cover_image,
+    }, headers=headers)
+
+
+def _age(key: str):
+    os.utime(os.path.join(cover_storage.directory, key), (STALE, STALE))
+
+
+@pytest.fixture(scope="module")
+def admin(login):
+    return login("admin", "admin123")
+
+
+def test_reupload_survives_deleting_the_only_referencing_book(client, admin, unique):
+    content = _png(unique)
+    url = _upload(client, admin, content)
+    filename = os.path.basename(url)
+    book_a = _create_book(client, admin, f"977-{unique}-1", url)
+    assert book_a.status_code == 201, book_a.text
+    _age(filename)
+
+    # 另一位管理员上传了相同图片（复用已有文件），尚未保存图书时图书 A 被删除
+    assert _upload(client, admin, content) == url
+    assert client.delete(f"/api/v1/books/{book_a.json()['id']}", headers=admin).status_code == 204
+
+    assert cover_storage.exists(filename)
+    book_b = _create_book(client, admin, f"977-{unique}-2", url)
+    assert book_b.status_code == 201, book_b.text
+
+
+def test_saving_a_missing_cover_is_rejected(client, admin, unique):
+    response = _create_book(client, admin, f"977-{unique}-3", f"{COVER_URL_PREFIX}{'f' * 64}.png")
+    assert response.status_code == 400
+    assert "封面" in response.json()["detail"]
+
+
+def test_sweep_removes_only_stale_unreferenced_covers(client, admin, unique):
+    stale = os.path.basename(_upload(client, admin, _png(unique + "stale")))
+    fresh = os.path.basename(_upload(client, admin, _png(unique + "fresh")))
+    kept = os.path.basename(_upload(client, admin, _png(unique + "kept")))
+    for key in (stale, kept):
+        _age(key)
+
+    removed = sweep_orphan_covers({kept})
+
+    assert removed >= 1
+    assert not cover_storage.exists(stale)
+    assert not any(key.startswith(os.path.splitext(stale)[0]) for key in cover_storage.list_keys())
+    assert cover_storage.exists(fresh)
+    assert cover_storage.exists(kept)
+    assert cover_storage.exists(rendition_path(kept, 80, ".jpg"))
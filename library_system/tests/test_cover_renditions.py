@@ -0,0 +1,44 @@
+"""
+封面缩略图选择测试
+
+select_rendition 只缓存找到缩略图的结果：
+- 缩略图生成完成前的请求返回原图，生成完成后立即返回缩略图
+- 删除封面后清除选择结果，不会再返回已删除的缩略图
+"""
+
+# 导入标准库
+import os
+import tempfile
+
+# 导入第三方库
+import pytest
+
+# 导入项目模块
+from utils.images import COVER_FORMATS, COVER_WIDTHS, remove_cover, rendition_path, select_rendition
+from utils.storage import cover_storage
+
+pytestmark = pytest.mark.skipif(not COVER_FORMATS or not COVER_WIDTHS, reason="需要 Pillow 生成缩略图")
+
+
+def _put(key: str):
+    fd, path = tempfile.mkstemp()
+    with os.fdopen(fd, "wb") as out:
+        out.write(b"cover")
+    cover_storage.put_file(path, key, move=True)
+
+
+def test_rendition_selected_once_generated_and_forgotten_on_remove(client, unique):
+    filename = f"{unique}{'0' * 56}.png"
+    width = COVER_WIDTHS[-1]
+    rendition = rendition_path(filename, width, ".jpg")
+    _put(filename)
+
+    # 缩略图尚未生成：返回原图，且不缓存该结果
+    assert client.portal.call(select_rendition, filename, width, "image/jpeg") == (filename, False)
+
+    _put(rendition)
+    assert client.portal.call(select_rendition, filename, width, "image/jpeg") == (rendition, True)
+
+    remove_cover(filename)
+    assert not cover_storage.exists(rendition)
+    assert client.portal.call(select_rendition, filename, width, "image/jpeg") == (filename, False)
@@ -0,0 +1,15 @@
+"""
+运行指标接口的权限测试
+
+/metrics 包含定时任务的异常信息和主机 / 进程标识，只允许管理员访问
+"""
+
+
+def test_metrics_requires_admin(client, login):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=login("reader", "reader123")).status_code == 403
+    assert client.get("/metrics", headers=login("librarian", "lib123")).status_code == 403
+
+    response = client.get("/metrics", headers=login("admin", "admin123"))
+    assert response.status_code == 200
+    assert {"overdue_scheduler", "file_cache", "book_cache"} <= set(response.json())
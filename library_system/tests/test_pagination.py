@@ -0,0 +1,131 @@
+"""
+游标分页测试
+
+- 游标编码后可还原为原排序键值（日期时间按列类型还原）
+- 格式错误、列数不符或类型不符的游标返回 400
+- 按游标逐页读取的结果与一次性读取的顺序一致，排序键相同时按 id 决胜，不重不漏
+"""
+
+# 导入标准库
+from datetime import datetime, timedelta
+
+# 导入第三方库
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+# 导入项目模块
+from models.book import Book
+from models.borrow import BorrowRecord, BorrowStatus
+from models.user import User, UserRole
+from utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+# 借阅记录条数（借阅日期两两相同，检验 id 决胜）
+RECORDS = 23
+PAGE_SIZE = 5
+
+
+@pytest.fixture(scope="module")
+def admin(login):
+    return login("admin", "admin123")
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 1, 2, 3, 4, 5, 678000), 42]
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, [BorrowRecord.borrow_date, BorrowRecord.id]) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    encode_cursor([1]),
+    encode_cursor(["x", 1]),
+    encode_cursor([datetime(2026, 1, 1), "1"]),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, [BorrowRecord.borrow_date, BorrowRecord.id])
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/api/v1/books", "/api/v1/users", "/api/v1/borrows/all"])
+def test_invalid_cursor_returns_400(client, admin, path):
+    response = client.get(path, params={"cursor": "not-a-cursor!"}, headers=admin)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "无效的分页游标"
+
+
+def _walk(client, headers, path: str, params: dict) -> list:
+    """沿 X-Next-Cursor 读取全部页，返回各页 id"""
+    ids, cursor = [], None
+    while True:
+        response = client.get(path, params={**params, "limit": PAGE_SIZE, "cursor": cursor}, headers=headers)
+        assert response.status_code == 200, response.text
+        page = [item["id"] for item in response.json()]
+        assert len(page) <= PAGE_SIZE
+        ids += page
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids
+
+
+def test_borrow_pages_follow_offset_order(client, admin, run_db, unique):
+    now = datetime.now()
+
+    async def seed(db):
+        username = f"pages_{unique}"
+        user_id = (await db.execute(insert(User).returning(User.id), {
+            "username": username, "email": f"{username}@example.com", "hashed_password": "-",
+            "role": UserRole.READER, "is_active": True, "created_at": now, "updated_at": now,
+        })).scalar_one()
+        book_ids = (await db.execute(insert(Book).returning(Book.id), [
+            {
+                "isbn": f"974-{unique}-{index:02d}", "title": f"分页测试 {index}", "author": "测试",
+                "total_copies": 1, "available_copies": 1, "created_at": now, "updated_at": now,
+            }
+            for index in range(RECORDS)
+        ])).scalars().all()
+        await db.execute(insert(BorrowRecord), [
+            {
+                "user_id": user_id, "book_id": book_id, "status": BorrowStatus.RETURNED,
+                "borrow_date": now - timedelta(days=index // 2), "due_date": now,
+                "return_date": now, "renew_count": 0, "fine_amount": 0,
+            }
+            for index, book_id in enumerate(book_ids)
+        ])
+        return user_id
+    user_id = run_db(seed)
+
+    everything = client.get("/api/v1/borrows/all", params={"user_id": user_id, "limit": 100}, headers=admin)
+    expected = [item["id"] for item in everything.json()]
+    assert len(expected) == RECORDS
+
+    assert _walk(client, admin, "/api/v1/borrows/all", {"user_id": user_id}) == expected
+
+
+def test_book_pages_walk_catalog_and_ignore_skip(client, admin, run_db, unique):
+    category = f"分页{unique}"
+    now = datetime.now()
+
+    async def seed(db):
+        return (await db.execute(insert(Book).returning(Book.id), [
+            {
+                "isbn": f"973-{unique}-{index:02d}", "title": f"分页图书 {index}", "author": "测试",
+                "category": category, "total_copies": 1, "available_copies": 1,
+                "created_at": now, "updated_at": now,
+            }
+            for index in range(RECORDS)
+        ])).scalars().all()
+    book_ids = sorted(run_db(seed))
+
+    assert _walk(client, admin, "/api/v1/books", {"category": category}) == book_ids
+
+    # 游标分页时 skip 不生效
+    first = client.get("/api/v1/books", params={"category": category, "limit": PAGE_SIZE}, headers=admin)
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    second = client.get("/api/v1/books", params={
+        "category": category, "limit": PAGE_SIZE, "cursor": cursor, "skip": 3,
+    }, headers=admin)
+    assert [book["id"] for book in second.json()] == book_ids[PAGE_SIZE:2 * PAGE_SIZE]
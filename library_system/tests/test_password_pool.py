@@ -0,0 +1,54 @@
+"""
+密码进程池背压测试
+
+bcrypt 在有界进程池中执行，排队任务数达到上限时立即返回 503（带 Retry-After），
+而不是让请求无限堆积；名额归还后恢复正常
+"""
+
+# 导入标准库
+import asyncio
+import time
+
+# 导入第三方库
+import pytest
+from fastapi import HTTPException
+
+# 导入项目模块
+from utils.passwords import password_pool
+from utils.process_pool import BoundedProcessPool
+
+
+def test_pool_rejects_tasks_beyond_queue_depth():
+    pool = BoundedProcessPool(size=1, queue_depth=1)
+
+    async def scenario():
+        busy = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as excinfo:
+            await pool.run(time.sleep, 0)
+        await busy
+        # 名额归还后可以继续提交
+        await pool.run(time.sleep, 0)
+        return excinfo.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+
+
+def test_login_returns_503_when_password_pool_is_saturated(client):
+    form = {"username": "admin", "password": "admin123"}
+    for _ in range(password_pool.queue_depth):
+        password_pool.acquire()
+    try:
+        response = client.post("/api/v1/auth/login", data=form)
+    finally:
+        for _ in range(password_pool.queue_depth):
+            password_pool.release()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert client.post("/api/v1/auth/login", data=form).status_code == 200
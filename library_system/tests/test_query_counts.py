@@ -0,0 +1,92 @@
+"""
+借阅记录列表的 SQL 语句数量测试
+
+借阅记录列表通过一条 JOIN 查询同时取出图书和用户信息（borrow_detail_query），
+语句数量与记录条数无关；逐条查询图书 / 用户的 N+1 问题回归时测试失败
+"""
+
+# 导入标准库
+from datetime import datetime, timedelta
+
+# 导入第三方库
+import pytest
+from sqlalchemy import insert
+
+# 导入项目模块
+from models.book import Book
+from models.borrow import BorrowRecord, BorrowStatus
+from models.user import User, UserRole
+from utils.auth import create_access_token, invalidate_user
+
+# 准备的借阅记录条数
+BORROW_ROWS = 100
+
+# 每个请求允许的语句数：查询当前用户 + 查询借阅记录列表
+MAX_STATEMENTS = 2
+
+
+@pytest.fixture(scope="module")
+def reader(run_db, unique):
+    """
+    创建一个读者，为其准备 100 本图书和 100 条借阅记录（借阅中、已归还各占一部分）
+
+    返回：
+        Tuple[str, dict]: (用户名, 认证请求头)
+    """
+    username = f"count_reader_{unique}"
+    now = datetime.now()
+
+    async def seed(db):
+        user_id = (await db.execute(insert(User).returning(User.id), {
+            "username": username, "email": f"{username}@example.com", "hashed_password": "-",
+            "role": UserRole.READER, "is_active": True, "created_at": now, "updated_at": now,
+        })).scalar_one()
+        book_ids = (await db.execute(insert(Book).returning(Book.id), [
+            {
+                "isbn": f"978-{unique}-{index:03d}",
+                "title": f"查询数量测试图书 {index}",
+                "author": "测试",
+                "total_copies": 1,
+                "available_copies": 1,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index in range(BORROW_ROWS)
+        ])).scalars().all()
+        await db.execute(insert(BorrowRecord), [
+            {
+                "user_id": user_id,
+                "book_id": book_id,
+                "borrow_date": now - timedelta(days=index),
+                "due_date": now - timedelta(days=index) + timedelta(days=30),
+                "return_date": now if index % 3 == 0 else None,
+                "status": BorrowStatus.RETURNED if index % 3 == 0 else BorrowStatus.BORROWED,
+                "renew_count": 0,
+                "fine_amount": 0,
+            }
+            for index, book_id in enumerate(book_ids)
+        ])
+
+    run_db(seed)
+    return username, {"Authorization": f"Bearer {create_access_token(data={'sub': username})}"}
+
+
+@pytest.mark.parametrize("path, as_admin", [
+    ("/api/v1/borrows/my-borrows", False),
+    ("/api/v1/borrows/all?limit=100", True),
+])
+def test_borrow_list_statement_count(client, login, count_statements, reader, path, as_admin):
+    username, headers = reader
+    if as_admin:
+        username, headers = "admin", login("admin", "admin123")
+    # 清除用户缓存，计入查询当前用户的语句
+    client.portal.call(invalidate_user, username)
+
+    with count_statements() as statements:
+        response = client.get(path, headers=headers)
+
+    assert response.status_code == 200, response.text
+    records = response.json()
+    assert len(records) == BORROW_ROWS
+    assert all(record["book_title"] and record["user_name"] for record in records)
+    assert len(statements) <= MAX_STATEMENTS, "\n\n".join(statements)
@@ -0,0 +1,157 @@
+"""
+迁移与热点查询执行计划测试
+
+在临时 SQLite 数据库上执行全部迁移，然后：
+1. 比较迁移得到的表结构与模型定义，索引或列不一致时失败（新增索引忘记写迁移）
+2. 对借阅 / 图书的热点查询执行 EXPLAIN QUERY PLAN，退化为全表扫描或分页查询需要额外排序时失败
+
+查询语句与路由使用相同的构建函数和筛选条件；使用独立的数据库，与 TEST_DATABASE_URL 无关
+"""
+
+# 导入标准库
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+# 导入第三方库
+import pytest
+from sqlalchemy import create_engine, event, exists, func, case, select
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+# 导入项目模块
+import models  # noqa: F401
+from database import Base
+from models.book import Book
+from models.borrow import BorrowRecord, BorrowStatus
+from routers.borrows import borrow_detail_query
+from utils.borrow import (
+    ACTIVE_STATUSES, FINE_STATUSES, borrow_eligibility_query, batch_borrow_eligibility_query, overdue_check_query,
+    overdue_condition, fine_expression
+)
+from utils.migrations import include_name, run_migrations
+from utils.pagination import encode_cursor, paginate
+
+# 执行计划中的全表扫描（SCAN <表名>，SQLite 3.36 之前为 SCAN TABLE <表名>）
+_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+# 需要额外排序（索引无法提供结果顺序）
+_SORT_PATTERN = re.compile(r"USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY")
+
+
+def hot_queries():
+    """
+    热点查询列表
+
+    返回：
+        list: (名称, 查询语句, 是否为排序分页查询, 允许扫描的表)；
+        排序分页查询不允许额外排序（结果顺序必须由索引提供）；
+        不带筛选条件的分页查询允许按索引 / 主键顺序扫描主表（取到 LIMIT 行即停止）
+    """
+    now = datetime(2026, 1, 1)
+    cursor = encode_cursor([now, 100])
+    borrow_order = [BorrowRecord.borrow_date, BorrowRecord.id]
+    all_borrows = borrow_detail_query(now, resolve_overdue=True)
+
+    return [
+        # 借阅
+        ("借阅资格检查", borrow_eligibility_query(1, 1, now), False, None),
+        ("批量借阅资格检查", batch_borrow_eligibility_query(1, [1, 2, 3], now), False, None),
+        ("逾期检查", overdue_check_query(1, now), False, None),
+        ("批量归还记录查询", select(BorrowRecord.id, BorrowRecord.user_id, BorrowRecord.status)
+            .where(BorrowRecord.id.in_([1, 2, 3])), False, None),
+        ("我的借阅", borrow_detail_query(now, with_user=False)
+            .where(BorrowRecord.user_id == 1)
+            .order_by(BorrowRecord.borrow_date.desc()), True, None),
+        ("借阅记录列表", paginate(all_borrows, borrow_order, 10, descending=True), True, "borrow_records"),
+        ("借阅记录列表（游标）", paginate(all_borrows, borrow_order, 10, cursor=cursor, descending=True),
+         True, "borrow_records"),
+        ("借阅记录列表（按用户）", paginate(all_borrows.where(BorrowRecord.user_id == 1), borrow_order, 10,
+                                   descending=True), True, None),
+        ("借阅记录列表（按图书）", paginate(all_borrows.where(BorrowRecord.book_id == 1), borrow_order, 10,
+                                   descending=True), True, None),
+        ("借阅记录列表（按状态）", paginate(all_borrows.where(BorrowRecord.status == BorrowStatus.BORROWED),
+                                   borrow_order, 10, descending=True), True, None),
+        ("借阅统计", select(
+            func.sum(case((BorrowRecord.status.in_(ACTIVE_STATUSES), 1), else_=0)),
+            func.sum(case((overdue_condition(now), 1), else_=0)),
+            func.sum(fine_expression(now))
+        ).where(BorrowRecord.status.in_(FINE_STATUSES)), False, None),
+        ("逾期标记", select(BorrowRecord.id).where(
+            BorrowRecord.status.in_(ACTIVE_STATUSES), BorrowRecord.due_date < now
+        ).limit(1000), False, None),
+        ("罚款累计", select(BorrowRecord.id).where(
+            BorrowRecord.status.in_(FINE_STATUSES),
+            BorrowRecord.due_date < now,
+            func.coalesce(BorrowRecord.fine_amount, 0) != fine_expression(now)
+        ).limit(1000), False, None),
+        ("删除图书前检查未归还记录", select(exists().where(
+            BorrowRecord.book_id == 1, BorrowRecord.status.in_(FINE_STATUSES)
+        )), False, None),
+        # 图书
+        ("图书列表", paginate(select(Book), [Book.id], 10), True, "books"),
+        ("图书列表（按分类）", paginate(select(Book).where(Book.category == "计算机"), [Book.id], 10), True, None),
+        ("封面引用计数", select(func.count(Book.id)).where(Book.cover_image == "/covers/a.jpg"), False, None),
+    ]
+
+
+def explain(connection, statement) -> list:
+    """
+    返回查询计划的每一行描述
+
+    在即将执行查询时（此时 IN 列表已展开、参数已按列类型转换）先对同一条 SQL 执行 EXPLAIN QUERY PLAN
+    """
+    plan = []
+
+    def capture(conn, cursor, sql, parameters, context, executemany):
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+        plan.extend(row[-1] for row in cursor.fetchall())
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        connection.execute(statement).fetchall()
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    return plan
+
+
+def check_plan(plan: list, ordered: bool, scan_table: Optional[str]) -> list:
+    """
+    检查执行计划
+
+    返回：
+        list: 问题描述（为空表示通过）
+    """
+    problems = []
+    for line in plan:
+        match = _SCAN_PATTERN.match(line)
+        if match and match.group(1) not in ("CONSTANT", scan_table):
+            problems.append(f"全表扫描: {line}")
+        if ordered and _SORT_PATTERN.search(line):
+            problems.append(f"分页查询需要额外排序: {line}")
+    return problems
+
+
+@pytest.fixture(scope="module")
+def connection(tmp_path_factory):
+    """执行全部迁移后的临时 SQLite 数据库连接"""
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path_factory.mktemp('plans'), 'plans.db')}")
+    with engine.begin() as conn:
+        run_migrations(conn)
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+def test_migrations_match_models(connection):
+    context = MigrationContext.configure(connection, opts={"include_name": include_name})
+    drift = [repr(diff) for diff in compare_metadata(context, Base.metadata)]
+    assert not drift, "迁移与模型定义不一致（需要新增迁移）:\n" + "\n".join(drift)
+
+
+@pytest.mark.parametrize("name, statement, ordered, scan_table", hot_queries(), ids=[q[0] for q in hot_queries()])
+def test_hot_query_plan(connection, name, statement, ordered, scan_table):
+    plan = explain(connection, statement)
+    problems = check_plan(plan, ordered, scan_table)
+    assert not problems, "\n".join(problems + ["执行计划:"] + plan)
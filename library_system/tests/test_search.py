@@ -0,0 +1,91 @@
+"""
+图书搜索测试
+
+- SQLite 上关键词通过 FTS5 全文索引检索，按 bm25 相关度排序（书名 > 作者 > ISBN > 简介）
+- 关键词不足 3 个字符（trigram 无法索引）时回退到 LIKE 查询
+- 修改图书后索引由触发器同步
+"""
+
+# 导入标准库
+from datetime import datetime
+
+# 导入第三方库
+import pytest
+from sqlalchemy import insert
+
+# 导入项目模块
+from models.book import Book
+from utils import search
+from utils.search import MIN_FTS_QUERY_LENGTH, build_match_expression
+
+# 只出现在本测试图书中的两字关键词
+SHORT_KEYWORD = "鳐鲼"
+
+
+@pytest.fixture(scope="module")
+def admin(login):
+    return login("admin", "admin123")
+
+
+@pytest.fixture(scope="module")
+def books(run_db, unique):
+    """
+    创建关键词分别出现在简介、作者、书名中的三本图书（ID 顺序与相关度顺序相反）
+
+    返回：
+        dict: {匹配的列: 图书 ID}
+    """
+    token = f"kw{unique}"
+    now = datetime.now()
+    rows = [
+        ("description", {"title": "简介匹配", "author": "测试", "description": f"简介中提到 {token}"}),
+        ("author", {"title": "作者匹配", "author": f"作者 {token}"}),
+        ("title", {"title": f"书名 {token} {SHORT_KEYWORD}", "author": "测试"}),
+    ]
+
+    async def seed(db):
+        ids = {}
+        for index, (name, fields) in enumerate(rows):
+            ids[name] = (await db.execute(insert(Book).returning(Book.id), {
+                "isbn": f"976-{unique}-{index}", "total_copies": 1, "available_copies": 1,
+                "created_at": now, "updated_at": now, **fields,
+            })).scalar_one()
+        return ids
+    return token, run_db(seed)
+
+
+def _search(client, headers, q: str) -> list:
+    response = client.get("/api/v1/books/search", params={"q": q}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [book["id"] for book in response.json()]
+
+
+def test_search_ranks_title_over_author_over_description(client, admin, books):
+    token, ids = books
+    found = _search(client, admin, token)
+
+    assert sorted(found) == sorted(ids.values())
+    if not search._fts_enabled:
+        pytest.skip("数据库不支持 FTS5，结果按 ID 排序")
+    assert found == [ids["title"], ids["author"], ids["description"]]
+
+
+def test_short_keyword_falls_back_to_like(client, admin, books, count_statements):
+    _, ids = books
+    assert len(SHORT_KEYWORD) < MIN_FTS_QUERY_LENGTH
+    assert build_match_expression(SHORT_KEYWORD) is None
+
+    with count_statements() as statements:
+        found = _search(client, admin, SHORT_KEYWORD)
+
+    assert found == [ids["title"]]
+    assert not any("MATCH" in statement for statement in statements)
+
+
+def test_index_follows_title_updates(client, admin, books, unique):
+    _, ids = books
+    renamed = f"renamed{unique}"
+    response = client.put(f"/api/v1/books/{ids['author']}", json={"title": renamed}, headers=admin)
+    assert response.status_code == 200, response.text
+
+    assert _search(client, admin, renamed) == [ids["author"]]
@@ -0,0 +1,53 @@
+"""
+SQLite 读写连接分离测试
+
+文件数据库使用单连接的写连接池和只读连接池：
+- 只读连接设置 query_only，误用只读会话写入时立即报错，而不是占用写锁
+- 写连接被占用、写事务未提交时，读取使用只读连接池，不在写连接池排队（WAL 模式下读写互不阻塞）
+"""
+
+# 导入标准库
+import asyncio
+
+# 导入第三方库
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# 导入项目模块
+import database
+
+pytestmark = pytest.mark.skipif(not database.IS_SQLITE_FILE, reason="只适用于 SQLite 文件数据库")
+
+
+def test_read_engine_is_query_only(client):
+    async def check():
+        async with database.read_engine.connect() as conn:
+            query_only = (await conn.exec_driver_sql("PRAGMA query_only")).scalar()
+            with pytest.raises(OperationalError, match="readonly"):
+                await conn.exec_driver_sql("CREATE TEMP TABLE t (x)")
+        async with database.engine.connect() as conn:
+            writer_query_only = (await conn.exec_driver_sql("PRAGMA query_only")).scalar()
+        return query_only, writer_query_only
+
+    assert client.portal.call(check) == (1, 0)
+    assert database.engine.pool.size() == 1
+
+
+def test_reads_do_not_wait_for_the_writer(client):
+    async def check():
+        async with database.engine.connect() as writer:
+            # 写连接被占用并持有未提交的写事务
+            await writer.execute(text("UPDATE borrow_counters SET total_borrows = total_borrows WHERE id = 1"))
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(database.engine.connect().__aenter__(), 0.2)
+            async with database.read_engine.connect() as reader:
+                count = await asyncio.wait_for(reader.exec_driver_sql("SELECT COUNT(*) FROM books"), 2)
+                journal_mode = (await reader.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            await writer.rollback()
+        return count.scalar(), journal_mode
+
+    count, journal_mode = client.portal.call(check)
+    assert count >= 0
+    if database.settings.SQLITE_PRAGMA_PROFILE == "production":
+        assert journal_mode == "wal"
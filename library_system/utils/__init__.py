@@ -1 +1 @@
-from .auth import get_password_hash, verify_password, create_access_token, get_current_user, get_current_active_user, require_role
+from .auth import get_password_hash, verify_password, create_access_token, get_current_user, get_current_active_user, require_role, CurrentUser, invalidate_user
@@ -6,28 +6,35 @@
 - JWT 令牌生成与解析
 - OAuth2 认证流程
 - 角色权限检查
+- 当前用户缓存
 
 技术要点：
-- 使用 passlib 进行密码加密（bcrypt 算法）
+- 使用 passlib 进行密码加密（bcrypt 算法，在独立进程池中执行）
 - 使用 jose 进行 JWT 令牌操作
 - 使用 FastAPI 依赖注入实现认证中间件
+- 已认证用户信息按令牌主体（用户名）缓存，避免每个请求都查询用户表
 """
 
 # 导入标准库
+import os
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from typing import Optional
 
 # 导入第三方库
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 # 导入项目模块
-from sqlalchemy.orm import Session
-from database import get_db
-from models.user import User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_read_db
+from models.user import User, UserRole
 from schemas.user import TokenData
+from utils.cache import create_cache
+# 密码哈希与校验在独立进程池中执行（带排队上限），详见 utils/passwords.py
+from utils.passwords import verify_password, get_password_hash
 
 # ==================== 配置常量 ====================
 
@@ -40,37 +47,9 @@ ALGORITHM = "HS256"
 # 访问令牌过期时间（分钟）
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# ==================== 密码处理 ====================
-
-# 创建密码上下文，使用 bcrypt 算法
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    验证密码是否正确
-    
-    参数：
-        plain_password: 用户输入的明文密码
-        hashed_password: 数据库中存储的哈希密码
-    
-    返回：
-        bool: 密码匹配返回 True，否则返回 False
-    """
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    """
-    生成密码的哈希值
-    
-    参数：
-        password: 明文密码
-    
-    返回：
-        str: 哈希后的密码字符串
-    """
-    return pwd_context.hash(password)
+# 当前用户缓存的过期时间（秒）和容量
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
 
 # ==================== JWT 令牌操作 ====================
 
@@ -102,6 +81,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# ==================== 当前用户缓存 ====================
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    已认证用户信息（缓存对象）
+
+    包含接口需要的用户字段，可直接作为 UserResponse 返回；
+    与 User 模型的属性名一致，路由中可以像使用 User 一样使用
+    """
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str]
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+    def to_cache(self) -> dict:
+        """转换为可 JSON 序列化的字典"""
+        data = asdict(self)
+        data["role"] = self.role.value
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+    @classmethod
+    def from_cache(cls, data: dict) -> "CurrentUser":
+        created_at = data.get("created_at")
+        return cls(
+            **{
+                **data,
+                "role": UserRole(data["role"]),
+                "created_at": datetime.fromisoformat(created_at) if created_at else None,
+            }
+        )
+
+
+# 按用户名（JWT sub）缓存用户信息
+user_cache = create_cache("users", maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+async def invalidate_user(username: str):
+    """
+    使指定用户的缓存失效
+
+    在修改用户信息（角色、状态等）或删除用户后调用，下一次请求会重新查询数据库
+
+    参数：
+        username: 用户名
+    """
+    await user_cache.delete(username)
+
 # ==================== OAuth2 认证流程 ====================
 
 # 创建 OAuth2 密码流的令牌 URL
@@ -111,19 +155,20 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_read_db)
+) -> CurrentUser:
     """
     获取当前登录用户
     
-    作为依赖函数，自动从请求头中提取并验证 JWT 令牌，然后查询用户
+    作为依赖函数，自动从请求头中提取并验证 JWT 令牌，然后获取用户信息；
+    用户信息优先从缓存读取，未命中时查询数据库并写入缓存
     
     参数：
         token: 从 Authorization 头获取的 Bearer 令牌
         db: 数据库会话
     
     返回：
-        User: 当前登录用户对象
+        CurrentUser: 当前登录用户信息
     
     异常：
         HTTPException(401): 令牌无效或用户不存在
@@ -150,27 +195,38 @@ async def get_current_user(
         # JWT 解码失败（签名无效、过期等）
         raise credentials_exception
     
+    # 优先从缓存获取
+    cached = await user_cache.get(token_data.username)
+    if cached is not None:
+        return CurrentUser.from_cache(cached)
+
     # 根据用户名查询用户
-    user = db.query(User).filter(User.username == token_data.username).first()
+    result = await db.execute(select(User).where(User.username == token_data.username))
+    user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
     
-    return user
+    current_user = CurrentUser.from_user(user)
+    # 结束只读事务、归还连接：否则连接会一直占用到请求结束，
+    # 写接口同时需要写连接，并发请求数超过连接池一半时会互相等待直到超时
+    await db.rollback()
+    await user_cache.set(token_data.username, current_user.to_cache())
+    return current_user
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """
     获取当前活跃用户
     
     在 get_current_user 的基础上，额外检查用户是否被禁用
     
     参数：
-        current_user: 通过 get_current_user 获取的用户对象
+        current_user: 通过 get_current_user 获取的用户信息
     
     返回：
-        User: 活跃用户对象
+        CurrentUser: 活跃用户信息
     
     异常：
         HTTPException(400): 用户已被禁用
@@ -199,7 +255,7 @@ def require_role(*roles):
     返回：
         依赖函数，检查用户角色是否在允许列表中
     """
-    async def role_checker(current_user: User = Depends(get_current_active_user)):
+    async def role_checker(current_user: CurrentUser = Depends(get_current_active_user)):
         # 检查用户角色是否在允许的角色列表中
         if current_user.role.value not in roles:
             raise HTTPException(
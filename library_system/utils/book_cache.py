@@ -0,0 +1,139 @@
+"""
+图书查询缓存模块
+
+图书详情、图书列表和图书搜索的读取量远大于图书数据的修改量，
+查询结果序列化后的响应体按规范化的查询参数缓存，命中时不访问数据库
+
+技术要点：
+- 缓存键包含版本号：图书详情使用该图书的版本号，列表和搜索使用目录版本号
+- 写操作提交后递增版本号，旧版本的缓存条目不会再被读取，随 LRU / TTL 淘汰
+- 版本号在查询数据库之前读取：查询期间发生的修改会递增版本号，
+  本次写入的（可能已过期的）结果使用的是旧版本的键，不会被后续请求读到
+- 修改某本图书只影响该图书的详情缓存；列表和搜索结果包含库存数量，图书的任何修改都会使其失效
+- 参数规范化：去除关键词首尾空白、空字符串视为未传、游标分页时忽略 skip，避免等价查询重复缓存
+- 配置 CACHE_REDIS_URL 时使用共享缓存，一个 worker 的修改对所有 worker 立即生效；
+  缓存操作均为协程，访问 Redis 时不阻塞事件循环
+
+配置（环境变量）：
+- BOOK_CACHE_SIZE: 进程内缓存的最大条目数（默认 2048）
+- BOOK_CACHE_TTL: 缓存过期时间（秒，默认 60）
+"""
+
+# 导入标准库
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+# 导入项目模块
+from utils.cache import create_cache
+
+# ==================== 配置常量 ====================
+
+BOOK_CACHE_SIZE = int(os.getenv("BOOK_CACHE_SIZE", "2048"))
+BOOK_CACHE_TTL = int(os.getenv("BOOK_CACHE_TTL", "60"))
+
+# 目录版本号（影响列表和搜索）
+_CATALOG_VERSION = "catalog"
+
+# 缓存后端
+book_cache = create_cache("books", maxsize=BOOK_CACHE_SIZE, ttl=BOOK_CACHE_TTL)
+
+# 各类查询的命中统计
+_stats: Dict[str, Dict[str, int]] = {
+    "detail": {"hits": 0, "misses": 0},
+    "list": {"hits": 0, "misses": 0},
+    "search": {"hits": 0, "misses": 0},
+}
+
+
+def _normalize(params: Dict[str, Any]) -> str:
+    """规范化查询参数：字符串去除首尾空白，空值和空字符串视为未传，按参数名排序"""
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, str):
+            value = value.strip() or None
+        if value is not None:
+            normalized[name] = value
+    raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _book_version(book_id: int) -> str:
+    return f"book:{book_id}"
+
+
+async def detail_key(book_id: int) -> str:
+    """
+    图书详情的缓存键（在查询数据库之前调用）
+
+    参数：
+        book_id: 图书 ID
+    """
+    return f"detail:{book_id}:{await book_cache.counter(_book_version(book_id))}"
+
+
+async def query_key(kind: str, params: Dict[str, Any]) -> str:
+    """
+    图书列表 / 搜索的缓存键（在查询数据库之前调用）
+
+    参数：
+        kind: 查询类型（list / search）
+        params: 查询参数
+
+    返回：
+        str: 包含目录版本号和规范化参数的缓存键
+    """
+    if kind == "list" and params.get("cursor"):
+        # 游标分页时 skip 不生效
+        params = {**params, "skip": None}
+    return f"{kind}:{await book_cache.counter(_CATALOG_VERSION)}:{_normalize(params)}"
+
+
+async def get_cached(key: str) -> Optional[Any]:
+    """
+    读取缓存并记录命中统计
+
+    返回：
+        Optional[Any]: 缓存值；未命中返回 None
+    """
+    value = await book_cache.get(key)
+    _stats[key.split(":", 1)[0]]["hits" if value is not None else "misses"] += 1
+    return value
+
+
+async def set_cached(key: str, value: Any):
+    """写入缓存（值必须可 JSON 序列化）"""
+    await book_cache.set(key, value)
+
+
+async def invalidate_book(book_id: Optional[int] = None):
+    """
+    图书数据修改后使相关缓存失效（在事务提交后调用）
+
+    参数：
+        book_id: 被修改的图书 ID；为 None 时只使列表和搜索失效（如新增图书）
+    """
+    keys = [_CATALOG_VERSION] if book_id is None else [_book_version(book_id), _CATALOG_VERSION]
+    await book_cache.incr_many(keys)
+
+
+async def invalidate_books(book_ids: Iterable[int]):
+    """
+    批量修改图书后使相关缓存失效（在事务提交后调用）
+
+    每本图书的详情版本号各递增一次，目录版本号只递增一次（共享缓存上一次往返完成）
+
+    参数：
+        book_ids: 被修改的图书 ID（新增的图书没有详情缓存，无需传入）
+    """
+    await book_cache.incr_many([_book_version(book_id) for book_id in book_ids] + [_CATALOG_VERSION])
+
+
+def book_cache_stats() -> dict:
+    """缓存命中统计"""
+    result = {"backend": book_cache.stats()}
+    for kind, counts in _stats.items():
+        total = counts["hits"] + counts["misses"]
+        result[kind] = {**counts, "hit_rate": round(counts["hits"] / total, 4) if total else None}
+    return result
@@ -0,0 +1,293 @@
+"""
+图书批量导入模块
+
+从 CSV 或 JSONL 文件批量导入图书目录，供 POST /api/v1/books/import 和 import_books.py 命令行工具共用
+
+技术要点：
+- 文件逐行读取、分批处理，内存占用只与批次大小有关，与文件大小无关
+- 每行使用 BookCreate 校验，解析和校验在线程池中执行，不阻塞事件循环
+- 每批使用一条多行 INSERT ... ON CONFLICT(isbn) 写入并提交，
+  一批失败（或服务中断）不影响已提交的批次
+- 单行错误（格式错误、字段校验失败）记录行号和原因后跳过，不中断整个导入
+- ISBN 已存在时按 on_conflict 更新或跳过：
+  - 书名、作者总是更新；可选字段为空时保留原值
+  - 提供了 total_copies 时按差值调整 available_copies（与 PUT /books/{id} 相同，不覆盖已借出的数量）
+- 同一批次中重复的 ISBN 以最后一行为准，前面的行计为跳过
+- 每批提交后使被修改图书的详情缓存和列表 / 搜索缓存失效
+
+配置（环境变量）：
+- BOOK_IMPORT_BATCH_SIZE: 每批（每条 INSERT、每次提交）的行数（默认 1000）
+- BOOK_IMPORT_MAX_ERRORS: 结果中最多返回的错误明细条数（默认 1000，错误总数始终准确）
+"""
+
+# 导入标准库
+import csv
+import json
+import os
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 导入第三方库
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 导入项目模块
+from models.book import Book
+from schemas.book import BookCreate
+from utils.book_cache import invalidate_books
+
+# ==================== 配置常量 ====================
+
+BOOK_IMPORT_BATCH_SIZE = int(os.getenv("BOOK_IMPORT_BATCH_SIZE", "1000"))
+BOOK_IMPORT_MAX_ERRORS = int(os.getenv("BOOK_IMPORT_MAX_ERRORS", "1000"))
+
+# 支持的文件格式（按扩展名识别）
+IMPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# ISBN 冲突时的处理方式
+ON_CONFLICT_UPDATE = "update"
+ON_CONFLICT_SKIP = "skip"
+
+# 可选字段：ISBN 已存在且导入值为空时保留原值
+_OPTIONAL_FIELDS = ("publisher", "publish_year", "category", "description", "location", "cover_image")
+
+
+class ImportFormatError(ValueError):
+    """导入文件无法继续读取（编码错误等），已提交的批次保留"""
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    """
+    确定导入文件格式
+
+    参数：
+        filename: 文件名（按扩展名识别）
+        fmt: 显式指定的格式（csv / jsonl），优先于扩展名
+
+    返回：
+        str: csv 或 jsonl
+
+    异常：
+        ValueError: 无法识别文件格式
+    """
+    if fmt:
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError("格式只能是 csv 或 jsonl")
+        return fmt
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in IMPORT_FORMATS:
+        raise ValueError("无法识别文件格式，请使用 .csv / .jsonl 文件或指定 format")
+    return IMPORT_FORMATS[ext]
+
+
+def _decode_lines(stream: BinaryIO) -> Iterator[str]:
+    """逐行解码 UTF-8（兼容带 BOM 的 Excel 导出文件）"""
+    for number, line in enumerate(stream, start=1):
+        try:
+            text = line.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ImportFormatError(f"第 {number} 行不是有效的 UTF-8 编码")
+        yield text.lstrip("\ufeff") if number == 1 else text
+
+
+def read_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    逐行读取导入文件
+
+    参数：
+        stream: 二进制文件对象
+        fmt: csv（首行为表头，列名与 BookCreate 字段相同）或 jsonl（每行一个 JSON 对象）
+
+    返回：
+        Iterator[Tuple[int, object]]: (行号, 字段字典)；该行无法解析时为 (行号, 错误描述字符串)
+    """
+    lines = _decode_lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # 空单元格视为未提供（使用默认值或保留原值）
+            yield reader.line_num, {
+                name.strip(): value for name, value in row.items()
+                if name and value is not None and value.strip() != ""
+            }
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, f"JSON 格式错误: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield number, "每行必须是一个 JSON 对象"
+            continue
+        yield number, row
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def _next_batch(rows: Iterator[Tuple[int, object]], size: int) -> Tuple[List[Tuple[int, BookCreate]], List[dict], bool]:
+    """
+    读取并校验下一批数据（在线程池中执行）
+
+    返回：
+        Tuple: (有效行 [(行号, BookCreate)], 错误明细, 文件是否已读完)
+    """
+    valid, errors = [], []
+    for number, row in rows:
+        if isinstance(row, str):
+            errors.append({"line": number, "isbn": None, "error": row})
+        else:
+            try:
+                valid.append((number, BookCreate.model_validate(row)))
+            except ValidationError as e:
+                errors.append({"line": number, "isbn": row.get("isbn"), "error": _format_validation_error(e)})
+        if len(valid) + len(errors) >= size:
+            return valid, errors, False
+    return valid, errors, True
+
+
+def _upsert_statement(dialect_name: str, on_conflict: str, update_copies: bool):
+    """
+    多行 INSERT ... ON CONFLICT(isbn) 语句
+
+    参数：
+        dialect_name: 数据库方言（sqlite / postgresql）
+        on_conflict: update 或 skip
+        update_copies: ISBN 已存在时是否更新 total_copies（该批中的行提供了 total_copies）
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(Book.__table__)
+    if on_conflict == ON_CONFLICT_SKIP:
+        statement = statement.on_conflict_do_nothing(index_elements=[Book.isbn])
+    else:
+        excluded = statement.excluded
+        values = {
+            "title": excluded.title,
+            "author": excluded.author,
+            "updated_at": excluded.updated_at,
+        }
+        for name in _OPTIONAL_FIELDS:
+            values[name] = func.coalesce(excluded[name], Book.__table__.c[name])
+        if update_copies:
+            # 按总数量的差值调整可用数量，已借出的数量不变
+            values["total_copies"] = excluded.total_copies
+            values["available_copies"] = Book.available_copies + excluded.total_copies - Book.total_copies
+        statement = statement.on_conflict_do_update(index_elements=[Book.isbn], set_=values)
+    # 带 RETURNING 时 SQLAlchemy 将整批参数合并为多行 VALUES（insertmanyvalues）
+    return statement.returning(Book.id, Book.isbn)
+
+
+async def _write_batch(
+    db: AsyncSession,
+    books: List[Tuple[int, BookCreate]],
+    on_conflict: str
+) -> Tuple[int, List[int], int]:
+    """
+    写入并提交一批图书
+
+    返回：
+        Tuple[int, List[int], int]: (新增数量, 被更新的图书 ID, 跳过数量)
+    """
+    # 同一批次中重复的 ISBN 以最后一行为准（同一条语句不能两次更新同一行）
+    latest: Dict[str, BookCreate] = {}
+    for _, book in books:
+        latest.pop(book.isbn, None)
+        latest[book.isbn] = book
+    skipped = len(books) - len(latest)
+
+    existing = dict((await db.execute(
+        select(Book.isbn, Book.id).where(Book.isbn.in_(list(latest)))
+    )).all())
+
+    now = datetime.now()
+    groups: Dict[bool, List[dict]] = {True: [], False: []}
+    for book in latest.values():
+        row = book.model_dump()
+        row.update(available_copies=book.total_copies, created_at=now, updated_at=now)
+        groups["total_copies" in book.model_fields_set].append(row)
+
+    written = set()
+    for update_copies, rows in groups.items():
+        if rows:
+            statement = _upsert_statement(db.bind.dialect.name, on_conflict, update_copies)
+            result = await db.execute(statement, rows)
+            written.update(isbn for _, isbn in result.all())
+    await db.commit()
+
+    created = len(written - set(existing))
+    updated = [existing[isbn] for isbn in written if isbn in existing]
+    skipped += len(latest) - len(written)
+    return created, updated, skipped
+
+
+async def import_books(
+    db: AsyncSession,
+    stream: BinaryIO,
+    fmt: str,
+    batch_size: int = BOOK_IMPORT_BATCH_SIZE,
+    on_conflict: str = ON_CONFLICT_UPDATE,
+    max_errors: int = BOOK_IMPORT_MAX_ERRORS
+) -> dict:
+    """
+    批量导入图书
+
+    参数：
+        db: 数据库会话（每批提交一次）
+        stream: 二进制文件对象
+        fmt: csv 或 jsonl
+        batch_size: 每批行数
+        on_conflict: ISBN 已存在时更新（update）或跳过（skip）
+        max_errors: 最多返回的错误明细条数
+
+    返回：
+        dict: {"total", "created", "updated", "skipped", "failed", "errors", "aborted"}；
+        errors 为 [{"line", "isbn", "error"}]，aborted 为文件无法继续读取的原因（正常结束时为 None）
+    """
+    summary = {"total": 0, "created": 0, "updated": 0, "skipped": 0, "failed": 0, "errors": [], "aborted": None}
+
+    def record_errors(errors: Iterable[dict]):
+        for error in errors:
+            summary["failed"] += 1
+            if len(summary["errors"]) < max_errors:
+                summary["errors"].append(error)
+
+    rows = read_rows(stream, fmt)
+    done = False
+    while not done:
+        try:
+            books, errors, done = await run_in_threadpool(_next_batch, rows, batch_size)
+        except (ImportFormatError, csv.Error) as e:
+            summary["aborted"] = str(e)
+            break
+        summary["total"] += len(books) + len(errors)
+        record_errors(errors)
+        if not books:
+            continue
+
+        try:
+            created, updated, skipped = await _write_batch(db, books, on_conflict)
+        except (IntegrityError, DataError) as e:
+            # 数据库拒绝了这一批（如字段超出数据库限制）：整批记为失败，继续后面的批次
+            await db.rollback()
+            reason = str(e.orig) if e.orig is not None else str(e)
+            record_errors({"line": number, "isbn": book.isbn, "error": reason} for number, book in books)
+            continue
+
+        summary["created"] += created
+        summary["updated"] += len(updated)
+        summary["skipped"] += skipped
+        if created or updated:
+            await invalidate_books(updated)
+
+    return summary
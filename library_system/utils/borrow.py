@@ -0,0 +1,407 @@
+"""
+借阅规则 SQL 表达式模块
+
+将逾期判断和罚款计算表达为 SQL 表达式，使筛选、分页、统计都在数据库中完成
+
+与 routers/borrows.py 中 check_overdue / calculate_fine 的规则保持一致：
+- 逾期：状态已标记为 OVERDUE，或借阅中/续借状态且已超过应还日期
+- 罚款：借阅中/续借/逾期状态且已超过应还日期，按逾期天数每天 1 元（100 分）
+
+技术要点：
+- 当前时间作为绑定参数传入，同一请求内所有表达式使用同一时间点
+- 日期差使用自定义 SQL 函数 days_since，按数据库方言分别编译
+- 借阅记录总数由触发器（SQLite，迁移 0003 创建）维护在 borrow_counters 表中，统计时无需全表 COUNT(*)
+- 逾期标记和罚款累计使用分批的集合式 UPDATE，每批提交一次，批次之间释放写锁
+"""
+
+# 导入标准库
+import logging
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+# 导入 SQLAlchemy 组件
+from sqlalchemy import Integer, and_, case, func, inspect, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+# 导入项目模块
+from models.book import Book
+from models.borrow import BorrowRecord, BorrowStatus, BorrowCounter, UNRETURNED_STATUSES
+
+# 借出中的状态（可能逾期）
+ACTIVE_STATUSES = (BorrowStatus.BORROWED, BorrowStatus.RENEWED)
+
+# 需要计算罚款的状态
+FINE_STATUSES = (BorrowStatus.BORROWED, BorrowStatus.RENEWED, BorrowStatus.OVERDUE)
+
+# 每逾期一天的罚款（分）
+FINE_PER_DAY = 100
+
+# 逾期标记每批更新的记录数
+OVERDUE_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+# 同一用户对同一图书最多一条未归还记录的部分唯一索引（迁移 0002 创建）
+ACTIVE_BORROW_INDEX = "uq_borrow_active_user_book"
+
+# 借阅计数表是否由触发器维护（由 init_borrow_counter 在启动时设置）
+_counter_enabled = False
+
+class days_since(FunctionElement):
+    """
+    计算从某个时间点到 now 经过的整天数（向下取整）
+
+    与 Python 中 (now - value).days 的结果一致（value <= now 时）
+
+    使用方式：
+        days_since(BorrowRecord.due_date, now)
+    """
+    type = Integer()
+    name = "days_since"
+    inherit_cache = True
+
+
+@compiles(days_since)
+def _days_since_default(element, compiler, **kw):
+    value, now = list(element.clauses)
+    return "CAST(FLOOR(EXTRACT(EPOCH FROM (%s - %s)) / 86400) AS INTEGER)" % (
+        compiler.process(now, **kw), compiler.process(value, **kw)
+    )
+
+
+@compiles(days_since, "sqlite")
+def _days_since_sqlite(element, compiler, **kw):
+    value, now = list(element.clauses)
+    return "CAST(julianday(%s) - julianday(%s) AS INTEGER)" % (
+        compiler.process(now, **kw), compiler.process(value, **kw)
+    )
+
+
+@compiles(days_since, "mysql")
+def _days_since_mysql(element, compiler, **kw):
+    value, now = list(element.clauses)
+    return "TIMESTAMPDIFF(DAY, %s, %s)" % (
+        compiler.process(value, **kw), compiler.process(now, **kw)
+    )
+
+
+def overdue_condition(now: datetime):
+    """
+    逾期判断条件（对应 check_overdue，并包含已标记为 OVERDUE 的记录）
+
+    参数：
+        now: 当前时间
+
+    返回：
+        SQL 布尔表达式
+    """
+    return or_(
+        BorrowRecord.status == BorrowStatus.OVERDUE,
+        and_(BorrowRecord.status.in_(ACTIVE_STATUSES), BorrowRecord.due_date < now)
+    )
+
+
+def _has_overdue(user_id: int, now: datetime):
+    """用户是否有逾期未还的图书（EXISTS 子查询，由 (user_id, status, due_date) 索引定位）"""
+    return select(BorrowRecord.id).where(
+        BorrowRecord.user_id == user_id,
+        # 冗余的状态条件使索引按 (user_id, status) 定位，只扫描该用户未归还的记录
+        BorrowRecord.status.in_(UNRETURNED_STATUSES),
+        overdue_condition(now)
+    ).exists()
+
+
+def borrow_eligibility_query(user_id: int, book_id: int, now: datetime):
+    """
+    借阅资格检查查询：一次查询返回图书可用数量、用户是否有逾期未还、是否已借阅该图书
+
+    两个 EXISTS 子查询分别由 (user_id, status, due_date) 和 (user_id, book_id, status) 索引定位
+
+    参数：
+        user_id: 借阅用户 ID
+        book_id: 图书 ID
+        now: 判断逾期使用的当前时间
+
+    返回：
+        Select: 结果行包含 available_copies / has_overdue / already_borrowed；图书不存在时无结果行
+    """
+    already_borrowed = select(BorrowRecord.id).where(
+        BorrowRecord.user_id == user_id,
+        BorrowRecord.book_id == book_id,
+        BorrowRecord.status.in_(UNRETURNED_STATUSES)
+    ).exists()
+    return select(
+        Book.available_copies,
+        _has_overdue(user_id, now).label("has_overdue"),
+        already_borrowed.label("already_borrowed")
+    ).where(Book.id == book_id)
+
+
+def overdue_check_query(user_id: int, now: datetime):
+    """
+    逾期检查查询：用户是否有逾期未还的图书（与借阅的图书无关，每位读者只检查一次）
+
+    参数：
+        user_id: 借阅用户 ID
+        now: 判断逾期使用的当前时间
+
+    返回：
+        Select: 单个布尔值
+    """
+    return select(_has_overdue(user_id, now))
+
+
+def batch_borrow_eligibility_query(user_id: int, book_ids: Sequence[int], now: datetime):
+    """
+    批量借阅资格检查查询：一次查询返回每本图书的可用数量和是否已借阅
+
+    是否已借阅为按图书关联的 EXISTS 子查询，由 (user_id, book_id, status) 索引定位；
+    是否有逾期未还与图书无关，由 overdue_check_query 单独检查
+
+    参数：
+        user_id: 借阅用户 ID
+        book_ids: 图书 ID 列表
+        now: 判断逾期使用的当前时间
+
+    返回：
+        Select: 每本存在的图书一行，包含 id / available_copies / already_borrowed
+    """
+    already_borrowed = select(BorrowRecord.id).where(
+        BorrowRecord.user_id == user_id,
+        BorrowRecord.book_id == Book.id,
+        BorrowRecord.status.in_(UNRETURNED_STATUSES)
+    ).exists()
+    return select(
+        Book.id,
+        Book.available_copies,
+        already_borrowed.label("already_borrowed")
+    ).where(Book.id.in_(book_ids))
+
+
+def effective_status(now: datetime):
+    """
+    实际借阅状态：逾期的记录显示为 OVERDUE，其余保持原状态
+
+    参数：
+        now: 当前时间
+
+    返回：
+        SQL 表达式，结果类型与 BorrowRecord.status 相同
+    """
+    return case(
+        (overdue_condition(now), literal(BorrowStatus.OVERDUE, BorrowRecord.status.type)),
+        else_=BorrowRecord.status
+    )
+
+
+def fine_expression(now: datetime):
+    """
+    罚款金额表达式（对应 calculate_fine，单位：分）
+
+    参数：
+        now: 当前时间
+
+    返回：
+        SQL 整数表达式
+    """
+    return case(
+        (
+            and_(BorrowRecord.status.in_(FINE_STATUSES), BorrowRecord.due_date < now),
+            days_since(BorrowRecord.due_date, now) * FINE_PER_DAY
+        ),
+        else_=0
+    )
+
+
+async def init_borrow_counter(engine: AsyncEngine) -> bool:
+    """
+    检测借阅计数触发器是否存在
+
+    触发器由迁移创建；计数行缺失时（如被手动删除）按当前记录数补建一次
+
+    参数：
+        engine: 数据库引擎
+
+    返回：
+        bool: 计数表可用返回 True（非 SQLite 或触发器不存在时返回 False，统计回退到 COUNT(*)）
+    """
+    global _counter_enabled
+
+    if engine.dialect.name != "sqlite":
+        _counter_enabled = False
+        return False
+
+    async with engine.begin() as conn:
+        triggers = (await conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' "
+            "AND name IN ('borrow_counters_ai', 'borrow_counters_ad')"
+        )).scalar()
+        if triggers == 2:
+            # 与触发器在同一写事务中补建，避免漏计
+            await conn.exec_driver_sql(
+                "INSERT OR IGNORE INTO borrow_counters (id, total_borrows) "
+                "SELECT 1, COUNT(*) FROM borrow_records"
+            )
+
+    _counter_enabled = triggers == 2
+    if not _counter_enabled:
+        logger.warning("借阅计数触发器不存在（未执行迁移），借阅统计将使用 COUNT(*)")
+    return _counter_enabled
+
+
+async def check_active_borrow_index(engine: AsyncEngine) -> bool:
+    """
+    检查防止重复借阅的部分唯一索引是否存在
+
+    已有数据存在重复的未归还记录时迁移无法创建该索引；此时并发请求可能重复借阅同一图书，
+    启动时记录警告并给出重复记录的数量
+
+    参数：
+        engine: 数据库引擎
+
+    返回：
+        bool: 索引存在返回 True
+    """
+    async with engine.connect() as conn:
+        indexes = await conn.run_sync(
+            lambda sync_conn: {index["name"] for index in inspect(sync_conn).get_indexes("borrow_records")}
+        )
+        if ACTIVE_BORROW_INDEX in indexes:
+            return True
+        duplicates = (
+            select(func.count().label("records"))
+            .where(BorrowRecord.status.in_(UNRETURNED_STATUSES))
+            .group_by(BorrowRecord.user_id, BorrowRecord.book_id)
+            .having(func.count() > 1)
+            .subquery()
+        )
+        groups, records = (await conn.execute(
+            select(func.count(), func.coalesce(func.sum(duplicates.c.records), 0))
+        )).one()
+
+    logger.warning(
+        "唯一索引 %s 不存在，并发请求可能重复借阅同一图书：%d 组（用户, 图书）共 %d 条未归还记录重复；"
+        "清理后执行 alembic stamp 0001 && alembic upgrade head 补建索引",
+        ACTIVE_BORROW_INDEX, groups, records
+    )
+    return False
+
+
+def total_borrows_expression():
+    """
+    借阅记录总数表达式
+
+    返回：
+        SQL 标量子查询：计数表可用时读取计数行，否则执行 COUNT(*)
+    """
+    if _counter_enabled:
+        return select(BorrowCounter.total_borrows).where(BorrowCounter.id == 1).scalar_subquery()
+    return select(func.count(BorrowRecord.id)).scalar_subquery()
+
+
+async def _execute_in_batches(
+    db: AsyncSession,
+    statement,
+    batch_size: int,
+    label: str,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    重复执行一条带 LIMIT 子查询的 UPDATE，直到某一批更新数不足 batch_size
+
+    每批执行后立即提交，SQLite 写锁只在单批更新期间持有
+
+    返回：
+        int: 更新的记录总数
+    """
+    updated = 0
+    batches = 0
+    while True:
+        rowcount = (await db.execute(statement)).rowcount
+        await db.commit()  # 每批提交，释放写锁
+
+        updated += rowcount
+        batches += 1
+        logger.info("%s进度：第 %d 批，本批 %d 条，累计 %d 条", label, batches, rowcount, updated)
+        if progress:
+            progress(batches, updated)
+
+        if rowcount < batch_size:
+            break
+
+    return updated
+
+
+async def mark_overdue_records(
+    db: AsyncSession,
+    now: datetime,
+    batch_size: int = OVERDUE_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    将已过应还日期的借阅中/续借记录标记为 OVERDUE
+
+    每批执行一条 UPDATE ... WHERE id IN (SELECT id ... LIMIT batch_size) 并立即提交，
+    不把记录加载为 ORM 对象，且 SQLite 写锁只在单批更新期间持有
+
+    参数：
+        db: 数据库会话
+        now: 判断逾期使用的当前时间
+        batch_size: 每批更新的最大记录数
+        progress: 进度回调（可选），每批完成后以 (已完成批次数, 累计更新数) 调用
+
+    返回：
+        int: 更新的记录总数
+    """
+    # 待更新记录由 (status, due_date) 索引定位
+    pending_ids = select(BorrowRecord.id).where(
+        BorrowRecord.status.in_(ACTIVE_STATUSES),
+        BorrowRecord.due_date < now
+    ).limit(batch_size)
+
+    statement = (
+        update(BorrowRecord)
+        .where(BorrowRecord.id.in_(pending_ids))
+        .values(status=BorrowStatus.OVERDUE)
+        .execution_options(synchronize_session=False)
+    )
+    return await _execute_in_batches(db, statement, batch_size, "逾期标记", progress)
+
+
+async def accrue_fines(
+    db: AsyncSession,
+    now: datetime,
+    batch_size: int = OVERDUE_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    将未归还逾期记录的 fine_amount 更新为截至 now 的应缴罚款
+
+    增量执行：只更新已存罚款与应缴罚款不一致的记录，
+    同一天内重复运行不会重复写入
+
+    参数：
+        db: 数据库会话
+        now: 计算罚款使用的当前时间
+        batch_size: 每批更新的最大记录数
+        progress: 进度回调（可选），每批完成后以 (已完成批次数, 累计更新数) 调用
+
+    返回：
+        int: 更新的记录总数
+    """
+    fine = fine_expression(now)
+    pending_ids = select(BorrowRecord.id).where(
+        BorrowRecord.status.in_(FINE_STATUSES),
+        BorrowRecord.due_date < now,
+        func.coalesce(BorrowRecord.fine_amount, 0) != fine
+    ).limit(batch_size)
+
+    statement = (
+        update(BorrowRecord)
+        .where(BorrowRecord.id.in_(pending_ids))
+        .values(fine_amount=fine)
+        .execution_options(synchronize_session=False)
+    )
+    return await _execute_in_batches(db, statement, batch_size, "罚款累计", progress)
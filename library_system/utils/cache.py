@@ -0,0 +1,265 @@
+"""
+缓存工具模块
+
+提供键值缓存的实现：
+- LocalCache: 进程内 LRU 缓存，支持过期时间（TTL），同步接口（只缓存本进程的数据时直接使用）
+- AsyncLocalCache: LocalCache 的协程接口，与 RedisCache 接口一致
+- RedisCache: 基于 Redis 的共享缓存（redis.asyncio），多 worker / 多节点部署时保持一致
+
+技术要点：
+- create_cache 返回的缓存所有操作都是协程（await cache.get(...)），
+  访问 Redis 时不阻塞事件循环；进程内实现直接在内存中完成
+- 缓存值必须可 JSON 序列化（共享后端需要跨进程传输）
+- 配置了 CACHE_REDIS_URL 环境变量时使用 Redis，否则使用进程内缓存
+- redis 为可选依赖，仅在启用共享后端时导入
+- 计数器（incr / counter）不参与 LRU 淘汰也不过期，可用作缓存键中的版本号；
+  incr_many 批量递增多个计数器（Redis 上通过一次管道往返完成）
+"""
+
+# 导入标准库
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+# 共享缓存地址（如 redis://localhost:6379/0），为空时使用进程内缓存
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+# 清空缓存时每次删除的键数量
+_CLEAR_BATCH = 500
+
+
+class LocalCache:
+    """
+    进程内 LRU + TTL 缓存
+
+    超过容量时淘汰最久未使用的条目，条目超过 TTL 后视为不存在；
+    使用锁保护，可在线程池中的同步路由里安全使用
+
+    参数：
+        namespace: 缓存名称（用于统计展示）
+        maxsize: 最大条目数
+        ttl: 默认过期时间（秒）
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 60):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，不存在或已过期返回 None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存值"""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        """删除缓存值"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def delete_prefix(self, prefix: str):
+        """删除键以 prefix 开头的全部缓存值"""
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+    def incr(self, key: str) -> int:
+        """计数器加一并返回新值"""
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+    def incr_many(self, keys: Iterable[str]) -> List[int]:
+        """多个计数器各加一，返回新值列表"""
+        return [self.incr(key) for key in keys]
+
+    def counter(self, key: str) -> int:
+        """读取计数器（不存在时为 0）"""
+        return self._counters.get(key, 0)
+
+    def stats(self) -> dict:
+        """命中统计"""
+        return {
+            "backend": "local",
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class AsyncLocalCache:
+    """
+    进程内缓存的协程接口
+
+    与 RedisCache 的接口一致，使调用方不必区分后端；
+    所有操作都在内存中完成，不会阻塞事件循环
+
+    参数：
+        namespace: 缓存名称（用于统计展示）
+        maxsize: 最大条目数
+        ttl: 默认过期时间（秒）
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 60):
+        self._cache = LocalCache(namespace, maxsize=maxsize, ttl=ttl)
+        self.namespace = namespace
+
+    async def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，不存在或已过期返回 None"""
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存值"""
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, key: str):
+        """删除缓存值"""
+        self._cache.delete(key)
+
+    async def clear(self):
+        """清空缓存"""
+        self._cache.clear()
+
+    async def incr(self, key: str) -> int:
+        """计数器加一并返回新值"""
+        return self._cache.incr(key)
+
+    async def incr_many(self, keys: Iterable[str]) -> List[int]:
+        """多个计数器各加一，返回新值列表"""
+        return self._cache.incr_many(keys)
+
+    async def counter(self, key: str) -> int:
+        """读取计数器（不存在时为 0）"""
+        return self._cache.counter(key)
+
+    def stats(self) -> dict:
+        """命中统计"""
+        return self._cache.stats()
+
+
+class RedisCache:
+    """
+    Redis 共享缓存
+
+    所有 worker 读写同一份数据，失效操作对所有 worker 立即生效；
+    使用 redis.asyncio 客户端，等待 Redis 响应期间事件循环可以继续处理其他请求
+
+    参数：
+        namespace: 缓存名称（作为键前缀）
+        url: Redis 连接地址
+        ttl: 默认过期时间（秒）
+    """
+
+    def __init__(self, namespace: str, url: str, ttl: float = 60):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("启用共享缓存（CACHE_REDIS_URL）需要安装 redis: pip install redis") from e
+
+        self.namespace = namespace
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str) -> str:
+        return f"library:{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，不存在或已过期返回 None"""
+        raw = await self._client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存值"""
+        expires = self.ttl if ttl is None else ttl
+        await self._client.set(self._key(key), json.dumps(value, default=str), px=int(expires * 1000))
+
+    async def delete(self, key: str):
+        """删除缓存值"""
+        await self._client.delete(self._key(key))
+
+    async def clear(self):
+        """清空本命名空间下的缓存（UNLINK 批量删除，由 Redis 在后台释放内存）"""
+        batch = []
+        async for key in self._client.scan_iter(self._key("*"), count=_CLEAR_BATCH):
+            batch.append(key)
+            if len(batch) >= _CLEAR_BATCH:
+                await self._client.unlink(*batch)
+                batch = []
+        if batch:
+            await self._client.unlink(*batch)
+
+    async def incr(self, key: str) -> int:
+        """计数器加一并返回新值（原子操作，所有 worker 共享）"""
+        return await self._client.incr(self._key(f"counter:{key}"))
+
+    async def incr_many(self, keys: Iterable[str]) -> List[int]:
+        """多个计数器各加一，返回新值列表（一次管道往返）"""
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(self._key(f"counter:{key}"))
+            return await pipe.execute()
+
+    async def counter(self, key: str) -> int:
+        """读取计数器（不存在时为 0）"""
+        raw = await self._client.get(self._key(f"counter:{key}"))
+        return int(raw) if raw is not None else 0
+
+    def stats(self) -> dict:
+        """命中统计（本进程）"""
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def create_cache(namespace: str, maxsize: int = 1024, ttl: float = 60):
+    """
+    创建缓存实例
+
+    配置了 CACHE_REDIS_URL 时返回 RedisCache，否则返回 AsyncLocalCache（两者的操作均为协程）
+
+    参数：
+        namespace: 缓存名称
+        maxsize: 进程内缓存的最大条目数
+        ttl: 默认过期时间（秒）
+    """
+    if CACHE_REDIS_URL:
+        return RedisCache(namespace, CACHE_REDIS_URL, ttl=ttl)
+    return AsyncLocalCache(namespace, maxsize=maxsize, ttl=ttl)
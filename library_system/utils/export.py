@@ -0,0 +1,225 @@
+"""
+数据导出模块
+
+将图书目录、借阅记录等查询结果以 CSV / NDJSON / Parquet 格式流式导出，
+供 GET /api/v1/books/export 和 GET /api/v1/borrows/export 使用
+
+技术要点：
+- 查询使用服务端游标（AsyncSession.stream + yield_per），每次只从数据库取一批行
+- 每批行编码后立即通过 StreamingResponse 发送，内存占用只与批次大小有关，与表的行数无关
+- 只投影需要的列（Core 行），不构造 ORM 对象和 Pydantic 模型
+- 会话在响应生成器内部创建，整个导出在一个只读事务中完成（结果是一致的快照），导出结束或客户端断开时释放连接
+- Parquet 每批写入一个 row group，列类型由查询列的 SQL 类型决定；需要安装 pyarrow（可选依赖）
+
+配置（环境变量）：
+- EXPORT_CHUNK_SIZE: 每批从数据库读取并编码的行数（默认 1000）
+"""
+
+# 导入标准库
+import csv
+import enum
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import AsyncIterator, List, Sequence
+
+# 导入第三方库
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy import types as sqltypes
+
+# 导入项目模块
+from database import ReadSessionLocal
+
+# ==================== 配置常量 ====================
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+# 支持的导出格式：(媒体类型, 文件扩展名)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),  # Starlette 自动追加 charset=utf-8
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _plain(value):
+    """枚举转换为其取值（与 API 响应一致）"""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化 {type(value).__name__}")
+
+
+class _CsvEncoder:
+    """CSV：首行为列名，带 BOM 以便 Excel 正确识别 UTF-8（导入工具会忽略 BOM）"""
+
+    def __init__(self, columns: List[str], types: list):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow(columns)
+        self.header = True
+
+    def _drain(self) -> bytes:
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        if self.header:
+            self.header = False
+            text = "\ufeff" + text
+        return text.encode("utf-8")
+
+    def encode(self, rows: Sequence) -> bytes:
+        self.writer.writerows(
+            [["" if value is None else _plain(value) for value in row] for row in rows]
+        )
+        return self._drain()
+
+    def finish(self) -> bytes:
+        # 没有数据行时仍输出表头
+        return self._drain() if self.header else b""
+
+
+class _NdjsonEncoder:
+    """NDJSON：每行一个 JSON 对象，字段名与列表接口的响应一致"""
+
+    def __init__(self, columns: List[str], types: list):
+        self.columns = columns
+
+    def encode(self, rows: Sequence) -> bytes:
+        lines = [
+            json.dumps(
+                {name: _plain(value) for name, value in zip(self.columns, row)},
+                ensure_ascii=False, default=_json_default
+            )
+            for row in rows
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """接收 ParquetWriter 写出的字节，每批之后取出发送"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("导出 Parquet 需要安装 pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _arrow_type(pa, sql_type):
+    if isinstance(sql_type, sqltypes.Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, sqltypes.Integer):
+        return pa.int64()
+    if isinstance(sql_type, sqltypes.DateTime):
+        return pa.timestamp("us")
+    if isinstance(sql_type, sqltypes.Date):
+        return pa.date32()
+    if isinstance(sql_type, (sqltypes.Float, sqltypes.Numeric)):
+        return pa.float64()
+    return pa.string()
+
+
+class _ParquetEncoder:
+    """Parquet：每批一个 row group"""
+
+    def __init__(self, columns: List[str], types: list):
+        pa = _load_pyarrow()
+        self.pa = pa
+        self.schema = pa.schema([(name, _arrow_type(pa, sql_type)) for name, sql_type in zip(columns, types)])
+        self.sink = _ChunkSink()
+        self.writer = pa.parquet.ParquetWriter(self.sink, self.schema, compression="zstd")
+
+    def encode(self, rows: Sequence) -> bytes:
+        arrays = [
+            self.pa.array([_plain(row[index]) for row in rows], type=field.type)
+            for index, field in enumerate(self.schema)
+        ]
+        self.writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+_ENCODERS = {"csv": _CsvEncoder, "ndjson": _NdjsonEncoder, "parquet": _ParquetEncoder}
+
+
+def check_export_format(fmt: str):
+    """
+    检查导出格式是否可用（在开始发送响应之前调用）
+
+    异常：
+        RuntimeError: 导出 Parquet 但未安装 pyarrow
+    """
+    if fmt == "parquet":
+        _load_pyarrow()
+
+
+async def _export_chunks(statement: Select, fmt: str, chunk_size: int) -> AsyncIterator[bytes]:
+    columns = [column.name for column in statement.selected_columns]
+    types = [column.type for column in statement.selected_columns]
+    encoder = _ENCODERS[fmt](columns, types)
+
+    async with ReadSessionLocal() as db:
+        result = await db.stream(statement.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            data = encoder.encode(rows)
+            if data:
+                yield data
+    data = encoder.finish()
+    if data:
+        yield data
+
+
+def export_response(
+    statement: Select,
+    fmt: str,
+    filename: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> StreamingResponse:
+    """
+    流式导出查询结果
+
+    参数：
+        statement: 查询语句（列名即导出的字段名，需自带排序）
+        fmt: csv / ndjson / parquet
+        filename: 下载文件名（不含扩展名）
+        chunk_size: 每批行数
+
+    返回：
+        StreamingResponse: 带 Content-Disposition 的下载响应
+    """
+    media_type, extension = EXPORT_FORMATS[fmt]
+    return StreamingResponse(
+        _export_chunks(statement, fmt, chunk_size),
+        media_type=media_type,
+        headers={"content-disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
@@ -0,0 +1,242 @@
+"""
+文件 HTTP 缓存响应模块
+
+封面文件按上传内容的 SHA-256 命名（内容寻址，缩略图追加宽度后缀），写入后内容不再变化，
+可以让浏览器和 CDN 长期缓存，并用条件请求避免重复下载
+
+技术要点：
+- 内容寻址的文件直接以文件名作为强 ETag（同一文件名对应的内容不会改变），无需读取整个文件计算摘要；
+  其他文件（如引入内容寻址之前的旧封面）的 ETag 为文件内容的 SHA-256 摘要；同时返回 Last-Modified
+- Cache-Control: public, max-age=31536000, immutable（文件内容不可变）
+- 支持 If-None-Match / If-Modified-Since 条件请求，命中时返回 304（无响应体）
+- 支持单区间 Range 请求（206），If-Range 不匹配时返回完整内容，区间无效时返回 416
+- 文件元数据和小文件内容缓存在进程内 LRU 中，热门文件无需访问磁盘或对象存储
+- 文件通过存储后端（utils.storage）流式读取，大文件不进入内存
+
+配置（环境变量）：
+- FILE_CACHE_SIZE: 进程内缓存的最大文件数（默认 1024）
+- FILE_CACHE_MAX_BYTES: 缓存内容的单个文件大小上限（默认 256KB，更大的文件只缓存元数据）
+"""
+
+# 导入标准库
+import hashlib
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+from typing import Mapping, Optional
+
+# 导入第三方库
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+# 导入项目模块
+from utils.cache import LocalCache
+
+# ==================== 配置常量 ====================
+
+FILE_CACHE_SIZE = int(os.getenv("FILE_CACHE_SIZE", "1024"))
+FILE_CACHE_MAX_BYTES = int(os.getenv("FILE_CACHE_MAX_BYTES", str(256 * 1024)))
+
+# 文件内容不可变，缓存条目只在被 LRU 淘汰或主动失效时移除
+FILE_CACHE_TTL = 24 * 3600
+
+# 不可变文件的缓存策略
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 单区间 Range 请求：bytes=start-end / bytes=start- / bytes=-suffix
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# 内容寻址的文件名：SHA-256 十六进制摘要，缩略图追加 _<宽度>w，后接扩展名
+_CONTENT_ADDRESSED_KEY = re.compile(r"^[0-9a-f]{64}(?:_\d+w)?\.[A-Za-z0-9]+$")
+
+# 文件元数据和小文件内容（始终为进程内缓存：内容为 bytes，不适合共享后端）
+file_cache = LocalCache("files", maxsize=FILE_CACHE_SIZE, ttl=FILE_CACHE_TTL)
+
+
+def _key_etag(key: str) -> Optional[str]:
+    """内容寻址文件的 ETag（由文件名得到，包含扩展名以区分同一封面的不同格式）；其他文件返回 None"""
+    name = os.path.basename(key)
+    return f'"{name}"' if _CONTENT_ADDRESSED_KEY.match(name) else None
+
+
+def _load(storage, key: str) -> Optional[dict]:
+    """读取文件元数据和小文件内容（在线程池中执行），文件不存在时返回 None"""
+    etag = _key_etag(key)
+    # 非内容寻址的文件需要读取全部内容计算摘要
+    digest = None if etag else hashlib.sha256()
+    chunks = []
+    try:
+        meta = storage.stat(key)
+        if meta is None:
+            return None
+        keep = meta["size"] <= FILE_CACHE_MAX_BYTES
+        if keep or digest is not None:
+            for chunk in storage.iter_chunks(key):
+                if digest is not None:
+                    digest.update(chunk)
+                if keep:
+                    chunks.append(chunk)
+    except (FileNotFoundError, ValueError):
+        # 文件在读取过程中被删除，或键无效
+        return None
+
+    return {
+        "etag": etag or f'"{digest.hexdigest()}"',
+        "last_modified": meta["last_modified"],
+        "size": meta["size"],
+        "media_type": guess_type(key)[0] or "application/octet-stream",
+        "content": b"".join(chunks) if keep else None,
+    }
+
+
+async def get_file_entry(storage, key: str) -> Optional[dict]:
+    """
+    获取文件的缓存条目（未缓存时从存储读取并写入缓存）
+
+    参数：
+        storage: 存储后端
+        key: 文件在存储中的键
+
+    返回：
+        Optional[dict]: {"etag", "last_modified", "size", "media_type", "content"}；
+        文件不存在时返回 None。content 仅在文件不超过 FILE_CACHE_MAX_BYTES 时存在
+    """
+    entry = file_cache.get(key)
+    if entry is None:
+        entry = await run_in_threadpool(_load, storage, key)
+        if entry is not None:
+            file_cache.set(key, entry)
+    return entry
+
+
+def forget_file(key: str):
+    """文件被删除或替换后清除其缓存条目"""
+    file_cache.delete(key)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 使用弱比较：忽略 W/ 前缀"""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+def _not_modified(request: Request, entry: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # 同时存在时 If-None-Match 优先，忽略 If-Modified-Since
+        return _etag_matches(if_none_match, entry["etag"])
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return entry["last_modified"] <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_range(request: Request, entry: dict):
+    """
+    解析 Range 请求头
+
+    返回：
+        None: 返回完整内容
+        (start, end): 返回 [start, end] 区间（含 end）
+        False: 区间无法满足（416）
+    """
+    range_header = request.headers.get("range")
+    if not range_header:
+        return None
+
+    # If-Range 只接受强 ETag 或 Last-Modified 精确匹配，不匹配时返回完整内容
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != entry["etag"] and if_range != formatdate(entry["last_modified"], usegmt=True):
+        return None
+
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        # 多区间或无法识别的单位：忽略 Range，返回完整内容
+        return None
+
+    size = entry["size"]
+    first, last = match.groups()
+    if not first and not last:
+        return False
+    if not first:
+        # bytes=-N：最后 N 个字节
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+async def cached_file_response(
+    request: Request,
+    storage,
+    key: str,
+    headers: Optional[Mapping[str, str]] = None
+) -> Optional[Response]:
+    """
+    返回支持 HTTP 缓存的不可变文件响应
+
+    参数：
+        request: 当前请求（读取条件请求头和 Range）
+        storage: 存储后端
+        key: 文件在存储中的键
+        headers: 额外的响应头（如 Vary）
+
+    返回：
+        Optional[Response]: 200 / 206 / 304 / 416 响应；文件不存在时返回 None
+    """
+    entry = await get_file_entry(storage, key)
+    if entry is None:
+        return None
+
+    response_headers = {
+        "etag": entry["etag"],
+        "last-modified": formatdate(entry["last_modified"], usegmt=True),
+        "cache-control": IMMUTABLE_CACHE_CONTROL,
+        "accept-ranges": "bytes",
+        **(headers or {}),
+    }
+
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=response_headers)
+
+    byte_range = _parse_range(request, entry)
+    if byte_range is False:
+        response_headers["content-range"] = f"bytes */{entry['size']}"
+        return Response(status_code=416, headers=response_headers)
+
+    content = entry["content"]
+    if byte_range is not None:
+        start, end = byte_range
+        response_headers["content-range"] = f"bytes {start}-{end}/{entry['size']}"
+        if content is not None:
+            return Response(
+                content[start:end + 1], status_code=206, headers=response_headers, media_type=entry["media_type"]
+            )
+        response_headers["content-length"] = str(end - start + 1)
+        return StreamingResponse(
+            storage.iter_chunks(key, start, end), status_code=206,
+            headers=response_headers, media_type=entry["media_type"]
+        )
+
+    if content is not None:
+        return Response(content, headers=response_headers, media_type=entry["media_type"])
+    # 大文件分块流式读取（同步迭代器由 Starlette 在线程池中执行），不进入内存缓存
+    response_headers["content-length"] = str(entry["size"])
+    return StreamingResponse(storage.iter_chunks(key), headers=response_headers, media_type=entry["media_type"])
@@ -0,0 +1,499 @@
+"""
+封面图片处理模块
+
+上传的封面先以分块方式写入临时文件，再交给独立的进程池解码和缩放，
+请求处理过程中既不把整个文件读入内存，也不在事件循环所在进程中执行 CPU 密集的图片运算
+
+技术要点：
+- 上传内容按 COVER_CHUNK_SIZE 分块写入临时文件，超过 MAX_COVER_UPLOAD_BYTES 立即中止（413）
+- JPEG 使用 Image.draft 在解码阶段按 1/2、1/4、1/8 缩小（DCT 缩放），大图无需完整解码
+- 使用 thumbnail 缩放到目标尺寸（保持宽高比，不放大小图）
+- 结果先写入临时文件再原子重命名，读取封面时不会看到写了一半的文件
+- 每次上传对应一个处理任务，任务状态保存在缓存中（配置 CACHE_REDIS_URL 时多 worker 共享），
+  可以等待任务完成，也可以立即返回任务 ID 再轮询状态
+- 排队任务数有上限（背压），超出时返回 503
+- 封面按原始上传内容的 SHA-256 命名（内容寻址），相同图片只存储、处理一次；
+  目标文件已存在时刷新其修改时间后直接返回，同一图片正在处理时复用同一个任务
+- 不再被图书引用的封面在最后一次上传 COVER_ORPHAN_GRACE 秒后才删除：
+  上传后尚未保存到图书的封面（包括复用了其他图书封面的上传）在宽限期内不会被删除，
+  从未保存到图书的上传由定时清理任务（sweep_orphan_covers）回收
+- 处理结果写入封面存储后端（utils.storage：本地目录或 S3 兼容对象存储），本地目录只用于暂存
+- 同一次处理中生成多个宽度（COVER_WIDTHS）的缩略图，每个宽度输出 AVIF/WebP（Pillow 支持时）和 JPEG，
+  读取封面时按 ?w= 和 Accept 请求头选择最合适的版本
+
+配置（环境变量）：
+- COVER_POOL_SIZE: 图片处理进程池大小（默认 CPU 核数，最多 4）
+- COVER_QUEUE_DEPTH: 允许同时排队/执行的处理任务数（默认进程池大小的 4 倍）
+- MAX_COVER_UPLOAD_BYTES: 上传文件大小上限（默认 10MB）
+- COVER_JOB_TTL: 任务状态保留时间（秒，默认 3600）
+- COVER_WIDTHS: 缩略图宽度列表（逗号分隔，默认 80,200,400）
+- COVER_ORPHAN_GRACE: 未引用封面的保留时间（秒，默认 86400）
+"""
+
+# 导入标准库
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# 导入第三方库
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+# 导入项目模块
+from utils.cache import LocalCache, create_cache
+from utils.http_cache import forget_file
+from utils.process_pool import BoundedProcessPool
+from utils.storage import cover_storage
+
+# ==================== 配置常量 ====================
+
+COVER_POOL_SIZE = int(os.getenv("COVER_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+COVER_QUEUE_DEPTH = int(os.getenv("COVER_QUEUE_DEPTH", str(COVER_POOL_SIZE * 4)))
+MAX_COVER_UPLOAD_BYTES = int(os.getenv("MAX_COVER_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+COVER_JOB_TTL = int(os.getenv("COVER_JOB_TTL", "3600"))
+COVER_WIDTHS = sorted({int(w) for w in os.getenv("COVER_WIDTHS", "80,200,400").split(",") if w.strip()})
+COVER_ORPHAN_GRACE = int(os.getenv("COVER_ORPHAN_GRACE", "86400"))
+
+# 封面访问 URL 前缀
+COVER_URL_PREFIX = "/api/v1/books/covers/"
+
+# 分块读写大小
+COVER_CHUNK_SIZE = 1024 * 1024
+
+# 缩略图格式 (MIME 类型, Pillow 格式名, 扩展名)，按优先级排列，JPEG 为兜底格式
+_RENDITION_FORMATS = (
+    ("image/avif", "AVIF", ".avif"),
+    ("image/webp", "WEBP", ".webp"),
+    ("image/jpeg", "JPEG", ".jpg"),
+)
+
+# 旧版本 Python 的 mimetypes 不认识 .avif/.webp，读取封面时需要正确的 Content-Type
+for _media_type, _, _ext in _RENDITION_FORMATS:
+    mimetypes.add_type(_media_type, _ext)
+
+# 缩略图存储键的后缀（如 _200w.webp），去掉后为原封面的文件名（不含扩展名）
+_RENDITION_SUFFIX = re.compile(r"_\d+w\.[A-Za-z0-9]+$")
+
+# 各格式的编码质量
+_RENDITION_QUALITY = {"AVIF": 60, "WEBP": 80, "JPEG": 85}
+
+# 任务状态
+JOB_PENDING = "pending"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+# 图片处理进程池（在应用生命周期中启动和关闭）
+image_pool = BoundedProcessPool(COVER_POOL_SIZE, COVER_QUEUE_DEPTH)
+
+# 任务状态缓存
+cover_jobs = create_cache("cover_jobs", maxsize=10000, ttl=COVER_JOB_TTL)
+
+# 缩略图选择结果（按 文件名/宽度/可接受格式 缓存，避免每次请求检查文件是否存在）；
+# 只缓存找到缩略图的结果：后台处理完成前的请求不会把封面固定为原图，写入或删除封面时清除该封面的条目
+_rendition_choices = LocalCache("cover_renditions", maxsize=10000, ttl=3600)
+
+# 处理中的任务：封面路径 -> (任务状态, 任务)，同一封面并发上传时共享同一个任务
+_inflight: Dict[str, Tuple[dict, asyncio.Future]] = {}
+
+
+# ==================== 进程池中执行的函数 ====================
+
+
+def _available_formats() -> List[Tuple[str, str, str]]:
+    """返回当前 Pillow 可以编码的缩略图格式（未安装 PIL 时为空）"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return []
+    Image.init()
+    return [f for f in _RENDITION_FORMATS if f[1] in Image.SAVE]
+
+
+# 可生成的缩略图格式（启动时检测一次）
+COVER_FORMATS = _available_formats()
+
+
+def rendition_path(path: str, width: int, ext: str) -> str:
+    """
+    缩略图文件名：在原文件名后追加宽度并替换扩展名（如 abc.png -> abc_200w.webp）
+
+    参数：
+        path: 封面文件名或路径
+        width: 缩略图宽度
+        ext: 缩略图扩展名
+    """
+    return f"{os.path.splitext(path)[0]}_{width}w{ext}"
+
+
+def _save_atomic(img, path: str, fmt: str, quality: int) -> None:
+    partial = f"{path}.{uuid.uuid4().hex[:8]}.part"
+    try:
+        img.save(partial, format=fmt, quality=quality)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def process_cover(
+    source: str,
+    target: str,
+    max_width: int,
+    max_height: int,
+    widths: Sequence[int] = (),
+    formats: Sequence[Tuple[str, str]] = ()
+) -> None:
+    """
+    解码、缩放并保存封面图片及其缩略图（在进程池中执行）
+
+    参数：
+        source: 上传内容的临时文件路径
+        target: 封面保存路径（扩展名决定保存格式）
+        max_width: 最大宽度
+        max_height: 最大高度
+        widths: 缩略图宽度列表（高度按 max_width:max_height 的比例计算）
+        formats: 缩略图格式列表 [(Pillow 格式名, 扩展名)]
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        # 如果没有安装 PIL，直接保存原始文件
+        partial = f"{target}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            shutil.copyfile(source, partial)
+            os.replace(partial, target)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return
+
+    with Image.open(source) as img:
+        # 保存格式由目标扩展名决定，未知扩展名时沿用原格式
+        fmt = Image.registered_extensions().get(os.path.splitext(target)[1].lower(), img.format)
+        scaled = img.width > max_width or img.height > max_height
+
+        # JPEG 在解码阶段按 DCT 缩放到不小于目标尺寸的最小比例，其他格式忽略
+        img.draft("RGB", (max_width, max_height))
+        # thumbnail 保持宽高比，只缩小不放大
+        img.thumbnail((max_width, max_height), Image.LANCZOS)
+
+        # 缩略图从大到小依次在上一个尺寸的基础上缩小，避免重复处理大图
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        current = img.convert("RGBA" if has_alpha else "RGB")
+        for width in sorted(widths, reverse=True):
+            current = current.copy()
+            current.thumbnail((width, width * max_height // max_width), Image.LANCZOS)
+            for rendition_fmt, ext in formats:
+                out = current.convert("RGB") if rendition_fmt == "JPEG" and has_alpha else current
+                _save_atomic(out, rendition_path(target, width, ext), rendition_fmt, _RENDITION_QUALITY[rendition_fmt])
+
+        # 最后写入原封面：原封面存在时缩略图已全部生成
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        _save_atomic(img, target, fmt, 90 if scaled else 95)
+
+
+def rendition_urls(url: Optional[str]) -> Optional[Dict[int, str]]:
+    """
+    根据封面 URL 生成各宽度缩略图的 URL（格式由服务端按 Accept 协商）
+
+    参数：
+        url: 封面 URL（Book.cover_image）
+
+    返回：
+        Optional[Dict[int, str]]: {宽度: URL}；不是本服务上传的封面或无法生成缩略图时返回 None
+    """
+    if not url or not url.startswith(COVER_URL_PREFIX) or not COVER_FORMATS:
+        return None
+    return {width: f"{url}?w={width}" for width in COVER_WIDTHS}
+
+
+def _accepted_types(accept: Optional[str]) -> Set[str]:
+    accepted = set()
+    for part in (accept or "").split(","):
+        media_type, _, params = part.partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(media_type.strip().lower())
+    return accepted
+
+
+async def select_rendition(
+    filename: str,
+    width: Optional[int] = None,
+    accept: Optional[str] = None
+) -> Tuple[str, bool]:
+    """
+    按请求宽度和 Accept 请求头选择封面文件
+
+    宽度取不小于请求宽度的最小缩略图（未指定或超过最大宽度时取最大的缩略图），
+    格式按 AVIF > WebP > JPEG 选择客户端接受的第一个；
+    缩略图不存在时（如缩略图功能上线前上传的封面）返回原封面
+
+    参数：
+        filename: 原封面文件名
+        width: 请求宽度（可选）
+        accept: Accept 请求头
+
+    返回：
+        Tuple[str, bool]: (存储键, 是否经过格式协商)
+    """
+    if not COVER_FORMATS or not COVER_WIDTHS:
+        return filename, False
+
+    candidates = [w for w in COVER_WIDTHS if width is not None and w >= width]
+    chosen = candidates[0] if candidates else COVER_WIDTHS[-1]
+
+    accepted = _accepted_types(accept)
+    # JPEG 作为兜底格式总是可用
+    exts = [ext for media_type, _, ext in COVER_FORMATS if media_type in accepted or ext == ".jpg"]
+
+    key = f"{filename}:{chosen}:{','.join(exts)}"
+    cached = _rendition_choices.get(key)
+    if cached is not None:
+        return cached
+
+    for ext in exts:
+        rendition = rendition_path(filename, chosen, ext)
+        if await run_in_threadpool(cover_storage.exists, rendition):
+            result = (rendition, True)
+            _rendition_choices.set(key, result)
+            return result
+    # 缩略图可能仍在生成，不缓存
+    return filename, False
+
+
+def _forget_renditions(filename: str) -> None:
+    """清除封面的缩略图选择结果（封面写入或删除后调用）"""
+    _rendition_choices.delete_prefix(f"{filename}:")
+
+
+# ==================== 上传与任务管理 ====================
+
+
+async def save_upload(file: UploadFile, directory: str) -> Tuple[str, str]:
+    """
+    将上传文件分块写入临时文件，同时计算内容摘要
+
+    参数：
+        file: 上传的文件
+        directory: 临时文件所在目录（与封面目录相同，便于原子重命名）
+
+    返回：
+        Tuple[str, str]: (临时文件路径, 内容的 SHA-256 十六进制摘要)
+
+    异常：
+        HTTPException(413): 文件超过 MAX_COVER_UPLOAD_BYTES
+    """
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".upload")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(COVER_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_COVER_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"图片大小不能超过 {MAX_COVER_UPLOAD_BYTES // (1024 * 1024)}MB"
+                    )
+                digest.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+
+async def get_cover_job(job_id: str) -> Optional[dict]:
+    """
+    获取封面处理任务状态
+
+    返回：
+        Optional[dict]: {"job_id", "status", "url", "error"}；任务不存在或已过期时返回 None
+    """
+    return await cover_jobs.get(job_id)
+
+
+async def _run_job(job: dict, source: str, target: str, max_width: int, max_height: int) -> dict:
+    try:
+        await image_pool.execute(
+            process_cover, source, target, max_width, max_height,
+            COVER_WIDTHS, [(fmt, ext) for _, fmt, ext in COVER_FORMATS]
+        )
+        await run_in_threadpool(_store_outputs, target)
+        job = {**job, "status": JOB_DONE}
+    except Exception as e:
+        logger.warning("封面处理失败（任务 %s）: %s", job["job_id"], e)
+        # 错误信息中不暴露服务器上的临时文件路径
+        job = {**job, "status": JOB_FAILED, "url": None, "error": str(e).replace(source, "upload")}
+    finally:
+        image_pool.release()
+        _inflight.pop(target, None)
+        if os.path.exists(source):
+            os.remove(source)
+    await cover_jobs.set(job["job_id"], job)
+    return job
+
+
+def _store_outputs(target: str) -> None:
+    """将处理结果写入封面存储（缩略图在前、原封面最后，原封面存在即表示全部写入完成）"""
+    paths = [rendition_path(target, w, ext) for w in COVER_WIDTHS for _, _, ext in COVER_FORMATS] + [target]
+    for path in paths:
+        if os.path.exists(path):
+            cover_storage.put_file(path, os.path.basename(path), move=True)
+    _forget_renditions(os.path.basename(target))
+
+
+async def _wait_job(job: dict, task: asyncio.Future, wait: float) -> dict:
+    if wait > 0:
+        try:
+            # shield：等待超时只放弃等待，不取消处理任务
+            return await asyncio.wait_for(asyncio.shield(task), wait)
+        except asyncio.TimeoutError:
+            pass
+    return job
+
+
+async def submit_cover_job(
+    source: str,
+    target: str,
+    url: str,
+    max_width: int,
+    max_height: int,
+    wait: float = 0
+) -> dict:
+    """
+    提交封面处理任务
+
+    target 已存在时（相同内容之前上传过）不再处理，直接返回已完成的任务；
+    target 正在处理时返回同一个任务
+
+    参数：
+        source: save_upload 返回的临时文件路径（处理完成后删除）
+        target: 封面暂存路径（文件名即存储键）
+        url: 封面访问 URL
+        max_width: 最大宽度
+        max_height: 最大高度
+        wait: 等待任务完成的最长秒数（0 表示不等待，立即返回）
+
+    返回：
+        dict: 任务状态 {"job_id", "status", "url", "error"}，超时未完成时 status 为 pending
+
+    异常：
+        HTTPException(503): 排队任务数已达上限
+    """
+    if target in _inflight:
+        os.remove(source)
+        job, task = _inflight[target]
+        return await _wait_job(job, task, wait)
+
+    # 刷新修改时间：宽限期内即使引用该封面的图书被删除，封面也不会被清理
+    if await run_in_threadpool(cover_storage.touch, os.path.basename(target)):
+        # 内容相同的封面已处理过，跳过解码和缩放
+        os.remove(source)
+        job = {"job_id": uuid.uuid4().hex, "status": JOB_DONE, "url": url, "error": None}
+        await cover_jobs.set(job["job_id"], job)
+        return job
+
+    # 排队名额在后台任务结束时归还
+    try:
+        image_pool.acquire()
+    except HTTPException:
+        os.remove(source)
+        raise
+
+    job = {"job_id": uuid.uuid4().hex, "status": JOB_PENDING, "url": url, "error": None}
+    await cover_jobs.set(job["job_id"], job)
+
+    # _inflight 同时保持任务引用，避免后台任务被垃圾回收
+    task = asyncio.ensure_future(_run_job(job, source, target, max_width, max_height))
+    _inflight[target] = (job, task)
+    return await _wait_job(job, task, wait)
+
+
+def remove_cover(filename: str) -> None:
+    """
+    从封面存储中删除封面及其全部缩略图（封面不再被任何图书引用时调用）
+
+    参数：
+        filename: 封面文件名
+    """
+    keys = [filename] + [rendition_path(filename, w, ext) for w in COVER_WIDTHS for _, _, ext in _RENDITION_FORMATS]
+    for key in keys:
+        forget_file(key)
+        cover_storage.delete(key)
+    _forget_renditions(filename)
+
+
+def release_cover(filename: str) -> bool:
+    """
+    删除不再被引用的封面（引用计数为 0 时调用）
+
+    封面在宽限期内（最后一次上传后 COVER_ORPHAN_GRACE 秒）可能被尚未保存的上传复用，
+    此时不删除，由 sweep_orphan_covers 在宽限期过后回收
+
+    参数：
+        filename: 封面文件名
+
+    返回：
+        bool: 封面已删除（或不存在）返回 True，仍在宽限期内返回 False
+    """
+    stat = cover_storage.stat(filename)
+    if stat is not None and time.time() - stat["last_modified"] < COVER_ORPHAN_GRACE:
+        return False
+    remove_cover(filename)
+    return True
+
+
+def sweep_orphan_covers(referenced: Set[str], grace: int = COVER_ORPHAN_GRACE) -> int:
+    """
+    删除没有图书引用且超过宽限期的封面（由定时任务调用）
+
+    回收上传后从未保存到图书的封面、宽限期内未能删除的封面，
+    以及原封面不存在的缩略图（如处理中断）
+
+    参数：
+        referenced: 被图书引用的封面文件名
+        grace: 宽限期（秒），最后一次上传后未超过宽限期的封面不删除
+
+    返回：
+        int: 删除的封面（及孤立缩略图）数量
+    """
+    now = time.time()
+    keys = list(cover_storage.list_keys())
+    originals = {os.path.splitext(key)[0] for key in keys if not _RENDITION_SUFFIX.search(key)}
+    removed = 0
+    for key in keys:
+        is_rendition = _RENDITION_SUFFIX.search(key) is not None
+        # 缩略图随原封面一起删除
+        if key in referenced or (is_rendition and _RENDITION_SUFFIX.sub("", key) in originals):
+            continue
+        stat = cover_storage.stat(key)
+        if stat is None or now - stat["last_modified"] < grace:
+            continue
+        if is_rendition:
+            forget_file(key)
+            cover_storage.delete(key)
+        else:
+            remove_cover(key)
+        removed += 1
+    return removed
@@ -0,0 +1,73 @@
+"""
+数据库迁移模块
+
+表结构和索引由 Alembic 版本化迁移（migrations/versions）维护，服务启动时自动升级到最新版本，
+已有的数据库也能获得后续新增的索引（create_all 不会修改已存在的表）
+
+技术要点：
+- 启动时在 engine.begin() 打开的连接上执行迁移（通过 run_sync 调用同步的 Alembic API）
+- 迁移只创建缺失的表和索引：升级前由 create_all 创建、没有版本记录的数据库会被直接接管
+- SQLite 的图书全文索引和借阅计数触发器同样由迁移创建，utils.search / utils.borrow 在启动时只检测是否可用
+- 全文索引虚拟表及其影子表不在模型中，比较表结构时由 include_name 排除
+- 多 worker 部署时建议关闭自动迁移，在发布流程中执行一次 alembic upgrade head
+
+配置（环境变量）：
+- DB_AUTO_MIGRATE: 启动时是否自动执行迁移（默认 true）
+"""
+
+# 导入标准库
+import os
+
+# 导入第三方库
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# alembic.ini 位于项目根目录（与 main.py 同级）
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(_PROJECT_DIR, "alembic.ini")
+
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """比较迁移与模型时忽略全文索引虚拟表（books_fts）及 FTS5 自动创建的影子表"""
+    if type_ == "table":
+        return not (name or "").startswith("books_fts")
+    return True
+
+
+def alembic_config() -> Config:
+    """
+    创建 Alembic 配置
+
+    script_location 使用绝对路径，服务从任意工作目录启动都能找到迁移脚本
+    """
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(_PROJECT_DIR, "migrations"))
+    return config
+
+
+def run_migrations(connection, revision: str = "head"):
+    """
+    在给定的同步连接上升级数据库
+
+    参数：
+        connection: SQLAlchemy 同步连接（异步引擎中通过 run_sync 获得）
+        revision: 目标版本（默认最新）
+    """
+    config = alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, revision)
+
+
+async def upgrade_database(engine: AsyncEngine, revision: str = "head"):
+    """
+    将数据库升级到目标版本（迁移失败时抛出异常，服务不会在表结构不完整的情况下启动）
+
+    参数：
+        engine: 数据库引擎
+        revision: 目标版本（默认最新）
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations, revision)
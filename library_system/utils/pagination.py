@@ -0,0 +1,144 @@
+"""
+游标分页（Keyset Pagination）工具模块
+
+offset 分页在翻到深页时，数据库需要先扫描并丢弃前面 skip 行，页码越大越慢；
+游标分页记住上一页最后一行的排序键，下一页直接从索引中定位到该位置继续读取，
+任意页的耗时都与第一页相同
+
+技术要点：
+- 排序键为 (sort_key, id)，id 作为唯一的决胜列，保证排序稳定、不重不漏
+- 使用行值比较 (sort_key, id) > (:v1, :v2)，可以直接利用对应的复合索引
+- 游标是排序键值的 JSON 经 URL 安全 Base64 编码后的字符串，对客户端不透明
+- 下一页游标通过响应头 X-Next-Cursor 返回，响应体保持原来的列表结构，兼容 offset 分页的调用方
+"""
+
+# 导入标准库
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+# 导入第三方库
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+# 下一页游标的响应头名称
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    将排序键值编码为游标字符串
+
+    参数：
+        values: 排序键值（与排序列一一对应）
+
+    返回：
+        str: URL 安全的游标字符串
+    """
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[ColumnElement]) -> List[Any]:
+    """
+    将游标字符串解码为排序键值，并按列类型还原（如日期时间）
+
+    参数：
+        cursor: 游标字符串
+        columns: 排序列
+
+    返回：
+        List[Any]: 排序键值
+
+    异常：
+        HTTPException(400): 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        result = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type in (datetime, date):
+                value = python_type.fromisoformat(value)
+            elif value is not None and not isinstance(value, python_type):
+                raise ValueError(cursor)
+            result.append(value)
+        return result
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
+def paginate(
+    query: Select,
+    columns: Sequence[ColumnElement],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False
+) -> Select:
+    """
+    为查询添加排序和分页条件
+
+    传入 cursor 时使用游标分页（忽略 skip），否则使用 offset 分页；
+    两种模式都多取一行，用于判断是否还有下一页
+
+    参数：
+        query: 查询语句
+        columns: 排序列，最后一列必须唯一（通常为主键 id）
+        limit: 每页条数
+        cursor: 上一页返回的游标（可选）
+        skip: offset 分页的跳过条数
+        descending: 是否倒序
+
+    返回：
+        Select: 添加排序和分页后的查询语句
+    """
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, columns))
+        query = query.where(key < values if descending else key > values)
+    elif skip:
+        query = query.offset(skip)
+
+    order = [c.desc() for c in columns] if descending else list(columns)
+    return query.order_by(*order).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], keys: Sequence[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    截取当前页数据并生成下一页游标
+
+    参数：
+        rows: paginate 查询返回的结果（最多 limit + 1 行）
+        keys: 排序列在结果对象上的属性名（与 paginate 的 columns 一一对应）
+        limit: 每页条数
+
+    返回：
+        Tuple[List, Optional[str]]: (当前页数据, 下一页游标；已是最后一页时为 None)
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key) for key in keys])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """
+    在响应头中返回下一页游标（已是最后一页时不设置）
+
+    参数：
+        response: FastAPI 响应对象
+        next_cursor: 下一页游标
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,93 @@
+"""
+密码哈希进程池模块
+
+bcrypt 每次哈希/校验约消耗 250ms CPU，直接在请求线程中执行会在登录高峰时
+占满线程池，导致其他接口无法响应
+
+技术要点：
+- 哈希和校验在独立的、大小固定的进程池中执行，不占用 Web 进程的 CPU 和 GIL
+- 事件循环通过 run_in_executor 等待进程池结果，哈希期间可以继续处理其他请求
+- 排队深度有上限（背压），超出时立即返回 503，而不是让请求无限堆积
+- 进程池在应用启动时（处理请求的线程创建之前）预先启动全部子进程
+- 进程池的创建、排队上限和 503 处理由 utils.process_pool.BoundedProcessPool 提供
+
+配置（环境变量）：
+- PASSWORD_POOL_SIZE: 进程池大小（默认 CPU 核数，最多 4）
+- PASSWORD_QUEUE_DEPTH: 允许同时排队/执行的任务数（默认进程池大小的 4 倍）
+"""
+
+# 导入标准库
+import asyncio
+import os
+from typing import List
+
+# 导入第三方库
+from passlib.context import CryptContext
+
+# 导入项目模块
+from utils.process_pool import BoundedProcessPool
+
+# ==================== 配置常量 ====================
+
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+PASSWORD_QUEUE_DEPTH = int(os.getenv("PASSWORD_QUEUE_DEPTH", str(PASSWORD_POOL_SIZE * 4)))
+
+# 创建密码上下文，使用 bcrypt 算法
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# 密码进程池（在应用生命周期中启动和关闭）
+password_pool = BoundedProcessPool(PASSWORD_POOL_SIZE, PASSWORD_QUEUE_DEPTH)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    验证密码是否正确（在进程池中执行）
+
+    参数：
+        plain_password: 用户输入的明文密码
+        hashed_password: 数据库中存储的哈希密码
+
+    返回：
+        bool: 密码匹配返回 True，否则返回 False
+
+    异常：
+        HTTPException(503): 进程池已饱和
+    """
+    return await password_pool.run(_verify, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    """
+    生成密码的哈希值（在进程池中执行）
+
+    参数：
+        password: 明文密码
+
+    返回：
+        str: 哈希后的密码字符串
+
+    异常：
+        HTTPException(503): 进程池已饱和
+    """
+    return await password_pool.run(_hash, password)
+
+
+async def get_password_hashes(*passwords: str) -> List[str]:
+    """
+    并行生成多个密码的哈希值（用于启动时初始化账号，不受排队上限限制）
+
+    参数：
+        *passwords: 明文密码
+
+    返回：
+        List[str]: 与参数顺序一致的哈希值列表
+    """
+    return list(await asyncio.gather(*[password_pool.execute(_hash, p) for p in passwords]))
@@ -0,0 +1,104 @@
+"""
+有界进程池模块
+
+CPU 密集的任务（密码哈希、图片缩放）在独立的、大小固定的进程池中执行，
+不占用 Web 进程的 CPU 和 GIL；排队任务数有上限，超出时立即返回 503，而不是让请求无限堆积
+
+技术要点：
+- 进程池在首次使用时创建，也可以在应用启动时（处理请求的线程创建之前）预先启动全部子进程
+- 事件循环通过 run_in_executor 等待进程池结果，等待期间可以继续处理其他请求
+- 排队名额使用非阻塞的信号量：获取不到说明进程池已饱和
+"""
+
+# 导入标准库
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# 导入第三方库
+from fastapi import HTTPException, status
+
+
+def _noop() -> None:
+    return None
+
+
+class BoundedProcessPool:
+    """
+    大小固定、排队数有上限的进程池
+
+    使用方式：
+        pool = BoundedProcessPool(size=4, queue_depth=16)
+        pool.start()                        # 在 lifespan 启动阶段调用
+        result = await pool.run(fn, *args)  # 进程池饱和时抛出 503
+        pool.shutdown()                     # 在 lifespan 关闭阶段调用
+
+    任务在请求返回后继续执行时（如后台图片处理），使用 acquire / execute / release 自行管理名额
+
+    参数：
+        size: 进程数
+        queue_depth: 允许同时排队/执行的任务数
+    """
+
+    def __init__(self, size: int, queue_depth: int):
+        self.size = size
+        self.queue_depth = queue_depth
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(queue_depth)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.size)
+        return self._executor
+
+    def acquire(self):
+        """
+        占用一个排队名额（任务完成后必须调用 release）
+
+        异常：
+            HTTPException(503): 排队任务数已达上限
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="服务繁忙，请稍后重试",
+                headers={"Retry-After": "1"},
+            )
+
+    def release(self):
+        """归还排队名额"""
+        self._slots.release()
+
+    async def execute(self, fn, *args):
+        """在进程池中执行任务并等待结果（不占用排队名额）"""
+        return await asyncio.get_event_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    async def run(self, fn, *args):
+        """
+        占用排队名额，在进程池中执行任务并等待结果
+
+        异常：
+            HTTPException(503): 排队任务数已达上限
+        """
+        self.acquire()
+        try:
+            return await self.execute(fn, *args)
+        finally:
+            self.release()
+
+    def start(self):
+        """预先启动进程池的全部子进程，避免第一个任务承担启动子进程的开销"""
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.size)]:
+            future.result()
+
+    def shutdown(self):
+        """关闭进程池"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,260 @@
+"""
+后台定时任务模块
+
+在应用生命周期内周期性执行：
+- 逾期检查：逾期标记和罚款累计，无需管理员手动调用 POST /api/v1/borrows/check-overdue
+- 封面清理：删除没有图书引用且超过宽限期的封面文件
+
+技术要点：
+- 使用 asyncio 后台任务按固定间隔调度，通过 AsyncSession 访问数据库，不阻塞事件循环
+- 逾期检查通过 scheduler_leases 表中的租约行保证多 worker 部署时每个周期只运行一次
+- 最近一次逾期检查的时间、耗时和更新行数记录在租约行中，由 /metrics 接口展示
+- 封面清理是幂等的（删除不存在的文件被忽略），多个 worker 同时运行无需租约
+
+配置（环境变量）：
+- OVERDUE_SCHEDULER_ENABLED: 是否启用逾期检查（默认 true）
+- OVERDUE_SWEEP_INTERVAL: 逾期检查间隔秒数（默认 300）
+- OVERDUE_SWEEP_BATCH_SIZE: 每批更新的记录数（默认 1000）
+- COVER_SWEEP_INTERVAL: 封面清理间隔秒数（默认 3600，0 表示不启用）
+"""
+
+# 导入标准库
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+# 导入第三方库
+from fastapi.concurrency import run_in_threadpool
+
+# 导入 SQLAlchemy 组件
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# 导入项目模块
+from database import SessionLocal
+from models.book import Book
+from models.scheduler import SchedulerLease
+from utils.borrow import OVERDUE_BATCH_SIZE, mark_overdue_records, accrue_fines
+from utils.images import COVER_ORPHAN_GRACE, COVER_URL_PREFIX, sweep_orphan_covers
+
+# ==================== 配置常量 ====================
+
+OVERDUE_SCHEDULER_ENABLED = os.getenv("OVERDUE_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+OVERDUE_SWEEP_INTERVAL = int(os.getenv("OVERDUE_SWEEP_INTERVAL", "300"))
+OVERDUE_SWEEP_BATCH_SIZE = int(os.getenv("OVERDUE_SWEEP_BATCH_SIZE", str(OVERDUE_BATCH_SIZE)))
+COVER_SWEEP_INTERVAL = int(os.getenv("COVER_SWEEP_INTERVAL", "3600"))
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    按固定间隔运行 run_once 的后台任务（子类实现 run_once）
+
+    使用方式：
+        task.start()      # 在 lifespan 启动阶段调用
+        await task.stop() # 在 lifespan 关闭阶段调用
+    """
+
+    # 运行失败时日志中的任务名称
+    description = "定时任务"
+
+    def __init__(self, session_factory: async_sessionmaker, interval: int):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """启动后台调度任务"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        """停止后台调度任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("%s运行失败", self.description)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        raise NotImplementedError
+
+
+class OverdueScheduler(PeriodicTask):
+    """
+    逾期检查定时任务
+
+    使用方式：
+        scheduler = OverdueScheduler(SessionLocal, interval=300)
+        scheduler.start()      # 在 lifespan 启动阶段调用
+        await scheduler.stop() # 在 lifespan 关闭阶段调用
+    """
+
+    description = "逾期检查定时任务"
+    lease_name = "overdue_sweep"
+
+    def __init__(self, session_factory: async_sessionmaker, interval: int, batch_size: int = OVERDUE_BATCH_SIZE):
+        super().__init__(session_factory, interval)
+        self.batch_size = batch_size
+        # worker 标识：主机名 + 进程号 + 随机后缀
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # 本进程的运行计数
+        self.runs = 0
+        self.skipped = 0
+
+    async def _acquire_lease(self, db: AsyncSession, now: datetime) -> bool:
+        """
+        尝试获取本周期的租约
+
+        租约到期时间设为 now + interval，到期前其他 worker 都无法再次获取，
+        因此无论启动了多少个 worker，每个周期只会运行一次
+
+        返回：
+            bool: 获取成功返回 True
+        """
+        # 首次运行时创建租约行（并发创建时忽略主键冲突）
+        if await db.get(SchedulerLease, self.lease_name) is None:
+            try:
+                db.add(SchedulerLease(name=self.lease_name))
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+
+        # 条件更新：只有租约已过期时才能抢到（由数据库保证原子性）
+        result = await db.execute(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == self.lease_name,
+                or_(SchedulerLease.expires_at.is_(None), SchedulerLease.expires_at <= now)
+            )
+            .values(owner=self.owner, expires_at=now + timedelta(seconds=self.interval))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def run_once(self) -> bool:
+        """
+        执行一次逾期标记和罚款累计
+
+        返回：
+            bool: 本 worker 实际执行了任务返回 True，租约被其他 worker 持有返回 False
+        """
+        async with self.session_factory() as db:
+            now = datetime.now()
+            if not await self._acquire_lease(db, now):
+                self.skipped += 1
+                return False
+
+            started = time.perf_counter()
+            overdue = fined = 0
+            error = None
+            try:
+                overdue = await mark_overdue_records(db, now, batch_size=self.batch_size)
+                fined = await accrue_fines(db, now, batch_size=self.batch_size)
+            except Exception as e:
+                await db.rollback()
+                error = str(e)[:255]
+                raise
+            finally:
+                # 记录运行结果，供 /metrics 展示
+                await db.execute(
+                    update(SchedulerLease)
+                    .where(SchedulerLease.name == self.lease_name)
+                    .values(
+                        last_run_at=now,
+                        last_duration_ms=int((time.perf_counter() - started) * 1000),
+                        last_rows_overdue=overdue,
+                        last_rows_fined=fined,
+                        last_error=error
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                self.runs += 1
+
+            logger.info("逾期检查完成：标记逾期 %d 条，更新罚款 %d 条", overdue, fined)
+            return True
+
+    async def metrics(self, db: AsyncSession) -> dict:
+        """
+        获取定时任务运行指标
+
+        参数：
+            db: 数据库会话
+
+        返回：
+            dict: 最近一次运行信息（来自租约行，所有 worker 一致）及本进程计数
+        """
+        lease = await db.get(SchedulerLease, self.lease_name)
+        return {
+            "enabled": self._task is not None,
+            "interval_seconds": self.interval,
+            "lease_owner": lease.owner if lease else None,
+            "lease_expires_at": lease.expires_at if lease else None,
+            "last_run_at": lease.last_run_at if lease else None,
+            "last_duration_ms": lease.last_duration_ms if lease else None,
+            "last_rows_overdue": lease.last_rows_overdue if lease else None,
+            "last_rows_fined": lease.last_rows_fined if lease else None,
+            "last_error": lease.last_error if lease else None,
+            "worker": self.owner,
+            "worker_runs": self.runs,
+            "worker_skipped": self.skipped,
+        }
+
+
+class CoverSweeper(PeriodicTask):
+    """
+    未引用封面清理任务
+
+    查询全部被图书引用的封面，删除存储中其余超过宽限期的封面（详见 utils.images.sweep_orphan_covers）
+    """
+
+    description = "封面清理定时任务"
+
+    def __init__(self, session_factory: async_sessionmaker, interval: int, grace: int = COVER_ORPHAN_GRACE):
+        super().__init__(session_factory, interval)
+        self.grace = grace
+
+    async def run_once(self) -> int:
+        """
+        执行一次封面清理
+
+        返回：
+            int: 删除的封面数量
+        """
+        async with self.session_factory() as db:
+            urls = await db.scalars(
+                select(Book.cover_image).distinct().where(Book.cover_image.startswith(COVER_URL_PREFIX))
+            )
+            referenced = {os.path.basename(url) for url in urls}
+        removed = await run_in_threadpool(sweep_orphan_covers, referenced, self.grace)
+        if removed:
+            logger.info("封面清理完成：删除 %d 个未引用的封面", removed)
+        return removed
+
+
+# 全局调度器实例
+overdue_scheduler = OverdueScheduler(
+    SessionLocal,
+    interval=OVERDUE_SWEEP_INTERVAL,
+    batch_size=OVERDUE_SWEEP_BATCH_SIZE
+)
+cover_sweeper = CoverSweeper(SessionLocal, interval=COVER_SWEEP_INTERVAL)
@@ -0,0 +1,134 @@
+"""
+图书全文检索模块
+
+基于 SQLite FTS5 为 books 表建立全文索引，替代 LIKE '%q%' 全表扫描
+
+技术要点：
+- books_fts 为外部内容（external content）虚拟表，不重复存储图书数据
+- 使用 trigram 分词器，子串匹配语义与原 LIKE 查询一致，且支持中文
+- 通过触发器在 INSERT / UPDATE / DELETE 时自动同步索引
+- 虚拟表和触发器由迁移 0003 创建，启动时只检测索引是否存在
+- 查询结果按 bm25 相关度排序（书名 > 作者 > ISBN > 简介）
+- 关键词不足 3 个字符（trigram 无法索引）或数据库不支持 FTS5 时，回退到 LIKE 查询
+"""
+
+# 导入标准库
+import logging
+from typing import Optional, Sequence
+
+# 导入 SQLAlchemy 组件
+from sqlalchemy import Select, func, literal_column, or_, select, table, column
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 导入项目模块
+from models.book import Book
+
+logger = logging.getLogger(__name__)
+
+# 全文索引虚拟表名
+FTS_TABLE = "books_fts"
+
+# 参与全文索引的列（顺序与 bm25 权重一一对应）
+FTS_COLUMNS = ("title", "author", "isbn", "description")
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# trigram 分词器要求关键词至少 3 个字符
+MIN_FTS_QUERY_LENGTH = 3
+
+# 全文索引是否可用（由 init_search_index 在启动时设置）
+_fts_enabled = False
+
+# 用于拼接查询的虚拟表对象
+books_fts = table(FTS_TABLE, column("rowid"))
+
+
+async def init_search_index(engine: AsyncEngine) -> bool:
+    """
+    检测全文索引是否可用
+
+    虚拟表和同步触发器由迁移创建；数据库未升级或 SQLite 不支持 FTS5 时搜索回退到 LIKE 查询
+
+    参数：
+        engine: 数据库引擎
+
+    返回：
+        bool: 全文索引可用返回 True（非 SQLite 或索引不存在时返回 False）
+    """
+    global _fts_enabled
+
+    if engine.dialect.name != "sqlite":
+        _fts_enabled = False
+        return False
+
+    async with engine.connect() as conn:
+        exists = (await conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        )).first()
+
+    _fts_enabled = exists is not None
+    if not _fts_enabled:
+        logger.warning("全文索引 %s 不存在（未执行迁移或 SQLite 不支持 FTS5），搜索将回退到 LIKE 查询", FTS_TABLE)
+    return _fts_enabled
+
+
+def build_match_expression(keyword: str, columns: Optional[Sequence[str]] = None) -> Optional[str]:
+    """
+    将用户输入转换为 FTS5 MATCH 表达式
+
+    整个关键词作为一个短语匹配（与 LIKE '%keyword%' 语义相同），
+    双引号转义后不会被解析为 FTS5 查询语法
+
+    参数：
+        keyword: 搜索关键词
+        columns: 限定匹配的列（可选，默认匹配全部索引列）
+
+    返回：
+        Optional[str]: MATCH 表达式；关键词过短无法使用全文索引时返回 None
+    """
+    keyword = keyword.strip()
+    if len(keyword) < MIN_FTS_QUERY_LENGTH:
+        return None
+
+    phrase = '"' + keyword.replace('"', '""') + '"'
+    if columns:
+        return "{" + " ".join(columns) + "} : " + phrase
+    return phrase
+
+
+def filter_by_keyword(
+    query: Select,
+    keyword: str,
+    columns: Sequence[str] = FTS_COLUMNS,
+    rank: bool = True
+) -> Select:
+    """
+    为图书查询添加关键词检索条件
+
+    优先使用全文索引并按 bm25 排序，不可用时回退到 LIKE 模糊匹配
+
+    参数：
+        query: 图书查询语句（select(Book)）
+        keyword: 搜索关键词
+        columns: 参与匹配的列（需为 FTS_COLUMNS 的子集）
+        rank: 是否按相关度排序
+
+    返回：
+        Select: 添加检索条件后的查询语句
+    """
+    match = build_match_expression(keyword, columns) if _fts_enabled else None
+
+    if match is None:
+        # 回退：模糊匹配（ILIKE，PostgreSQL 下与 SQLite LIKE 一样不区分大小写）
+        search = f"%{keyword}%"
+        return query.where(or_(*[getattr(Book, name).ilike(search) for name in columns]))
+
+    condition = literal_column(FTS_TABLE).op("MATCH")(match)
+    if not rank:
+        # 只筛选不排序：全文检索作为子查询只执行一次；
+        # 使用 JOIN 时 SQLite 可能先按其他条件（如分类索引）取出图书，再对每一行单独执行一次 MATCH
+        return query.where(Book.id.in_(select(books_fts.c.rowid).where(condition)))
+
+    # 全文索引：通过 rowid 关联 books 表，bm25 分值越小越相关
+    return query.join(books_fts, books_fts.c.rowid == Book.id).where(condition).order_by(
+        func.bm25(literal_column(FTS_TABLE), *FTS_WEIGHTS)
+    )
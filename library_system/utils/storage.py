@@ -0,0 +1,314 @@
+"""
+封面存储后端模块
+
+封面文件通过统一的存储接口读写，API 节点本地磁盘只作为上传和处理的暂存目录：
+- LocalStorage: 本地目录（默认，单节点部署）
+- S3Storage: S3 兼容的对象存储（AWS S3、MinIO 等），多个 API 节点共享封面
+
+技术要点：
+- 读写均为流式：写入时从本地文件分块上传，读取时按块迭代（支持字节区间）
+- 对象存储可以生成预签名 URL，读取封面时重定向到对象存储，图片字节不再经过 API 进程
+- boto3 为可选依赖，仅在启用 S3 后端时导入
+- 接口为同步方法，在异步路由中通过线程池调用
+
+配置（环境变量）：
+- COVER_STORAGE: 存储后端，local（默认）或 s3
+- COVER_STORAGE_DIR: 本地存储目录 / 暂存目录（默认 uploads/covers）
+- COVER_S3_BUCKET: 存储桶名称
+- COVER_S3_ENDPOINT_URL: S3 兼容服务地址（如 http://localhost:9000，使用 AWS S3 时留空）
+- COVER_S3_REGION: 区域（可选）
+- COVER_S3_PREFIX: 对象键前缀（默认 covers/）
+- 访问密钥使用 boto3 的标准配置（AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY 等）
+"""
+
+# 导入标准库
+import os
+import shutil
+import uuid
+from mimetypes import guess_type
+from typing import Iterator, Optional
+
+# 读取时每块的大小
+STORAGE_CHUNK_SIZE = 64 * 1024
+
+COVER_STORAGE = os.getenv("COVER_STORAGE", "local")
+COVER_STORAGE_DIR = os.getenv(
+    "COVER_STORAGE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads", "covers")
+)
+COVER_S3_BUCKET = os.getenv("COVER_S3_BUCKET")
+COVER_S3_ENDPOINT_URL = os.getenv("COVER_S3_ENDPOINT_URL")
+COVER_S3_REGION = os.getenv("COVER_S3_REGION")
+COVER_S3_PREFIX = os.getenv("COVER_S3_PREFIX", "covers/")
+
+
+class LocalStorage:
+    """
+    本地目录存储
+
+    参数：
+        directory: 存储目录（不存在时自动创建）
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # 键只能是文件名，防止访问目录以外的文件
+        if not key or os.path.basename(key) != key or key in (".", ".."):
+            raise ValueError(f"无效的存储键: {key}")
+        return os.path.join(self.directory, key)
+
+    def exists(self, key: str) -> bool:
+        """对象是否存在"""
+        return os.path.isfile(self._path(key))
+
+    def stat(self, key: str) -> Optional[dict]:
+        """
+        获取对象元数据
+
+        返回：
+            Optional[dict]: {"size", "last_modified"}（last_modified 为 Unix 时间戳）；不存在时返回 None
+        """
+        try:
+            stat_result = os.stat(self._path(key))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return {"size": stat_result.st_size, "last_modified": int(stat_result.st_mtime)}
+
+    def iter_chunks(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        分块读取对象内容
+
+        参数：
+            key: 对象键
+            start: 起始字节
+            end: 结束字节（含），为 None 时读到末尾
+        """
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(STORAGE_CHUNK_SIZE if remaining is None else min(STORAGE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def put_file(self, path: str, key: str, move: bool = False):
+        """
+        将本地文件写入存储
+
+        参数：
+            path: 本地文件路径
+            key: 对象键
+            move: 是否移动（写入后本地文件不再保留）；否则复制
+        """
+        target = self._path(key)
+        if os.path.abspath(path) == os.path.abspath(target):
+            return
+        if move:
+            shutil.move(path, target)
+            return
+        partial = f"{target}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            shutil.copyfile(path, partial)
+            os.replace(partial, target)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def get_file(self, key: str, path: str):
+        """将对象内容保存到本地文件"""
+        shutil.copyfile(self._path(key), path)
+
+    def touch(self, key: str) -> bool:
+        """
+        将对象的修改时间更新为当前时间
+
+        返回：
+            bool: 对象存在返回 True，不存在返回 False
+        """
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete(self, key: str):
+        """删除对象（不存在时忽略）"""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list_keys(self) -> Iterator[str]:
+        """列出全部对象键（忽略处理中的临时文件）"""
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith((".part", ".upload")) and os.path.isfile(os.path.join(self.directory, name)):
+                yield name
+
+    def presigned_url(self, key: str, expires: int) -> Optional[str]:
+        """本地存储不支持预签名 URL"""
+        return None
+
+
+class S3Storage:
+    """
+    S3 兼容对象存储
+
+    参数：
+        bucket: 存储桶名称
+        endpoint_url: S3 兼容服务地址（可选）
+        region: 区域（可选）
+        prefix: 对象键前缀
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        prefix: str = ""
+    ):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("启用对象存储（COVER_STORAGE=s3）需要安装 boto3: pip install boto3") from e
+        if not bucket:
+            raise RuntimeError("启用对象存储（COVER_STORAGE=s3）需要配置 COVER_S3_BUCKET")
+
+        self.bucket = bucket
+        self.prefix = prefix
+        # boto3 客户端是线程安全的，可在线程池中共享
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self._client_error = ClientError
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _not_found(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def exists(self, key: str) -> bool:
+        """对象是否存在"""
+        return self.stat(key) is not None
+
+    def stat(self, key: str) -> Optional[dict]:
+        """
+        获取对象元数据
+
+        返回：
+            Optional[dict]: {"size", "last_modified"}（last_modified 为 Unix 时间戳）；不存在时返回 None
+        """
+        try:
+            head = self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self._client_error as e:
+            if self._not_found(e):
+                return None
+            raise
+        return {"size": head["ContentLength"], "last_modified": int(head["LastModified"].timestamp())}
+
+    def iter_chunks(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        分块读取对象内容（使用 HTTP Range，只下载需要的区间）
+
+        参数：
+            key: 对象键
+            start: 起始字节
+            end: 结束字节（含），为 None 时读到末尾
+        """
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        body = self._client.get_object(**params)["Body"]
+        try:
+            for chunk in body.iter_chunks(STORAGE_CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def put_file(self, path: str, key: str, move: bool = False):
+        """
+        将本地文件上传到存储（大文件自动分段上传）
+
+        参数：
+            path: 本地文件路径
+            key: 对象键
+            move: 上传后是否删除本地文件
+        """
+        self._client.upload_file(
+            path, self.bucket, self._key(key),
+            ExtraArgs={"ContentType": guess_type(key)[0] or "application/octet-stream"}
+        )
+        if move:
+            os.remove(path)
+
+    def get_file(self, key: str, path: str):
+        """将对象内容下载到本地文件"""
+        self._client.download_file(self.bucket, self._key(key), path)
+
+    def touch(self, key: str) -> bool:
+        """
+        将对象的修改时间更新为当前时间（原地复制对象，不经过本地）
+
+        返回：
+            bool: 对象存在返回 True，不存在返回 False
+        """
+        try:
+            self._client.copy_object(
+                Bucket=self.bucket, Key=self._key(key),
+                CopySource={"Bucket": self.bucket, "Key": self._key(key)},
+                MetadataDirective="REPLACE",
+                ContentType=guess_type(key)[0] or "application/octet-stream",
+            )
+        except self._client_error as e:
+            if self._not_found(e):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str):
+        """删除对象（不存在时忽略）"""
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list_keys(self) -> Iterator[str]:
+        """列出前缀下的全部对象键（不含前缀）"""
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix):]
+
+    def presigned_url(self, key: str, expires: int) -> Optional[str]:
+        """
+        生成带签名的临时下载地址（本地计算，不访问对象存储）
+
+        参数：
+            key: 对象键
+            expires: 有效期（秒）
+        """
+        return self._client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._key(key)}, ExpiresIn=expires
+        )
+
+
+def create_storage(kind: Optional[str] = None):
+    """
+    创建封面存储后端
+
+    参数：
+        kind: local 或 s3（默认取 COVER_STORAGE）
+    """
+    kind = (kind or COVER_STORAGE).lower()
+    if kind == "local":
+        return LocalStorage(COVER_STORAGE_DIR)
+    if kind == "s3":
+        return S3Storage(COVER_S3_BUCKET, COVER_S3_ENDPOINT_URL, COVER_S3_REGION, COVER_S3_PREFIX)
+    raise RuntimeError(f"不支持的封面存储后端: {kind}")
+
+
+# 封面存储实例
+cover_storage = create_storage()